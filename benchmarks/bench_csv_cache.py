@@ -0,0 +1,50 @@
+# Load time of a scaled-up demo csv, parsed from text versus served from the columnar CsvCache.
+# Run from the repo root with `python benchmarks/bench_csv_cache.py`.
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from my_little_snake_helpers.file_data_processor import FileDataProcessor
+from my_little_snake_helpers.csv_cache import CsvCache
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'demo_data', 'sample_csv_data.csv')
+
+
+def scale_csv(path: str, copies: int) -> None:
+    # Repeat the sample's data rows under a single header.
+    with open(SAMPLE_CSV, 'r', encoding = 'utf-8') as file:
+        header, *rows = file.read().splitlines()
+    with open(path, 'w', encoding = 'utf-8') as file:
+        file.write(header + "\n")
+        block = "\n".join(rows) + "\n"
+        for _ in range(copies):
+            file.write(block)
+
+
+def main(copies: int = 20_000) -> None:
+    processor = FileDataProcessor()
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'scaled.csv')
+        scale_csv(csv_path, copies)
+        print(f"{os.path.getsize(csv_path) / 1024 ** 2:.1f} MB csv, {copies * 30} rows")
+
+        start = time.perf_counter()
+        processor.load_csv_to_dataframe(csv_path)
+        print(f"{'load_csv_to_dataframe (no cache)':<40} {time.perf_counter() - start:8.3f} s")
+
+        for file_format in ('feather', 'parquet', 'pickle'):
+            cache = CsvCache(os.path.join(directory, f"cache_{file_format}"), file_format = file_format)
+            start = time.perf_counter()
+            processor.load_csv_to_dataframe(csv_path, cache = cache)
+            miss_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            processor.load_csv_to_dataframe(csv_path, cache = cache)
+            hit_seconds = time.perf_counter() - start
+            print(f"{'cache ' + file_format + ' miss (parse + store)':<40} {miss_seconds:8.3f} s")
+            print(f"{'cache ' + file_format + ' hit':<40} {hit_seconds:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
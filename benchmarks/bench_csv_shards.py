@@ -0,0 +1,46 @@
+# Ingest time of a directory of csv shards, a serial loop over load_csv_to_dataframe versus
+# load_csvs_to_dataframe with thread and process pools. Run from the repo root with
+# `python benchmarks/bench_csv_shards.py`. Process pool speedup is bounded by the core count.
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from my_little_snake_helpers.file_data_processor import FileDataProcessor
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'demo_data', 'sample_csv_data.csv')
+
+
+def write_shards(directory: str, shards: int, copies: int) -> None:
+    # Each shard repeats the sample's data rows under a single header.
+    with open(SAMPLE_CSV, 'r', encoding = 'utf-8') as file:
+        header, *rows = file.read().splitlines()
+    block = "\n".join(rows) + "\n"
+    for shard in range(shards):
+        with open(os.path.join(directory, f"shard_{shard:03d}.csv"), 'w', encoding = 'utf-8') as file:
+            file.write(header + "\n")
+            for _ in range(copies):
+                file.write(block)
+
+
+def main(shards: int = 16, copies: int = 2_000) -> None:
+    processor = FileDataProcessor()
+    with tempfile.TemporaryDirectory() as directory:
+        write_shards(directory, shards, copies)
+        print(f"{shards} shards of {copies * 30} rows, {os.cpu_count()} cores")
+
+        start = time.perf_counter()
+        paths = processor.list_csv_files(directory)
+        serial = [processor.load_csv_to_dataframe(path) for path in paths]
+        print(f"{'serial load_csv_to_dataframe loop':<40} {time.perf_counter() - start:8.3f} s")
+
+        for label, use_processes in (('load_csvs_to_dataframe (threads)', False), ('load_csvs_to_dataframe (processes)', True)):
+            start = time.perf_counter()
+            df = processor.load_csvs_to_dataframe(directory, use_processes = use_processes)
+            print(f"{label:<40} {time.perf_counter() - start:8.3f} s")
+        assert len(df) == sum(len(frame) for frame in serial)
+
+
+if __name__ == "__main__":
+    main()
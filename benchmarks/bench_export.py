@@ -0,0 +1,48 @@
+# Export time, peak traced memory and file size of a scaled-up demo frame, naive DataFrame.to_csv
+# versus the chunked writers of FileDataProcessor.export_dataframe. Run from the repo root with
+# `python benchmarks/bench_export.py`.
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from my_little_snake_helpers.file_data_processor import FileDataProcessor, pd
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'demo_data', 'sample_csv_data.csv')
+
+
+def measure(label: str, write) -> None:
+    # Time the write, then repeat it under tracemalloc for the peak of the Python allocations
+    # (Arrow and the C csv writer allocate outside of what tracemalloc sees).
+    start = time.perf_counter()
+    path = write()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    write()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<32} {seconds:8.3f} s {peak / 1024 ** 2:9.1f} MB peak {os.path.getsize(path) / 1024 ** 2:9.1f} MB file")
+
+
+def main(copies: int = 5_000) -> None:
+    processor = FileDataProcessor()
+    df = pd.concat([processor.load_csv_to_dataframe(SAMPLE_CSV)] * copies, ignore_index = True)
+    print(f"{len(df)} rows, {processor.dataframe_memory_usage(df) / 1024 ** 2:.1f} MB in memory")
+
+    with tempfile.TemporaryDirectory() as directory:
+        def naive():
+            path = os.path.join(directory, 'naive.csv')
+            df.to_csv(path, index = False)
+            return path
+        measure('DataFrame.to_csv', naive)
+
+        for extension in ('csv', 'csv.gz', 'parquet', 'feather'):
+            def chunked(extension = extension):
+                return processor.export_dataframe(df, os.path.join(directory, f"export.{extension}"))['path']
+            measure(f"export_dataframe ({extension})", chunked)
+
+
+if __name__ == "__main__":
+    main()
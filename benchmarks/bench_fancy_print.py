@@ -0,0 +1,46 @@
+# Microbenchmark comparing the compiled tag-template engine against the old per-call regex path.
+# Run from the repo root with `python -m benchmarks.bench_fancy_print` or `python benchmarks/bench_fancy_print.py`.
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from my_little_snake_helpers.console import Console
+
+
+def legacy_render(console: Console, text: str) -> str:
+    # The rendering path fancy_print used before the template engine (regex rebuilt on every call).
+    def replacer(match: re.Match) -> str:
+        closing, tag = match.group(1), match.group(2)
+        if closing:
+            return console.RESET
+        return console.TAG_MAP.get(tag, "")
+
+    pattern = re.compile(r'<(/?)(\w+)>')
+    return pattern.sub(replacer, text) + console.RESET
+
+
+def main(number: int = 100_000) -> None:
+    console = Console()
+    static = "<MENU_KEY>[07]</MENU_KEY> - <MENU_ITEM>drop columns</MENU_ITEM>"
+    dynamic = "<INFO>rows:</INFO> <DATA>{}</DATA> <GOOD>ok:</GOOD> <DATA>{}</DATA>"
+
+    # Sanity check, both paths must produce identical output.
+    assert legacy_render(console, static) == console.fancy_format(static)
+    assert legacy_render(console, dynamic.format(1, 2)) == console.fancy_format(dynamic, 1, 2)
+
+    cases = {
+        'static legacy regex': lambda: legacy_render(console, static),
+        'static compiled': lambda: console.fancy_format(static),
+        'placeholder legacy regex': lambda: legacy_render(console, dynamic.format(12345, True)),
+        'placeholder compiled': lambda: console.fancy_format(dynamic, 12345, True),
+    }
+
+    for name, func in cases.items():
+        seconds = min(timeit.repeat(func, number=number, repeat=5))
+        print(f"{name:<28} {seconds / number * 1e6:8.3f} us/call")
+
+
+if __name__ == "__main__":
+    main()
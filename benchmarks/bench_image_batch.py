@@ -0,0 +1,46 @@
+# Benchmark of the parallel batch image loader against a serial loop over load_image_to_array.
+# Run from the repo root with `python benchmarks/bench_image_batch.py`.
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+from my_little_snake_helpers.file_data_processor import FileDataProcessor
+
+SAMPLE_JPG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'demo_data', 'sample_jpg.jpg')
+
+
+def main(copies: int = 64) -> None:
+    processor = FileDataProcessor()
+    directory = tempfile.mkdtemp()
+    try:
+        # A directory full of copies of the sample image.
+        for i in range(copies):
+            shutil.copyfile(SAMPLE_JPG, os.path.join(directory, f"image_{i:04}.jpg"))
+
+        start = time.perf_counter()
+        serial = np.stack([processor.load_image_to_array(path) for path in processor.list_image_files(directory)])
+        serial_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        threaded = processor.load_images_to_array(directory)
+        threaded_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        processed = processor.load_images_to_array(directory, use_processes = True)
+        process_seconds = time.perf_counter() - start
+
+        assert np.array_equal(serial, threaded) and np.array_equal(serial, processed)
+        print(f"{copies} images, batch shape {threaded.shape}")
+        print(f"serial load_image_to_array + np.stack  {serial_seconds:8.3f} s")
+        print(f"load_images_to_array (threads)         {threaded_seconds:8.3f} s  ({serial_seconds / threaded_seconds:.1f}x)")
+        print(f"load_images_to_array (processes)       {process_seconds:8.3f} s  ({serial_seconds / process_seconds:.1f}x)")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Startup-time check based on `python -X importtime`. Fails (exit code 1) if importing the light-weight
+# modules pulls in a heavy dependency or takes longer than the budget.
+# Run from the repo root with `python benchmarks/bench_import_time.py`.
+import os
+import sys
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay cheap to import, and the dependencies they must not load at import time.
+LIGHT_MODULES = ['my_little_snake_helpers', 'my_little_snake_helpers.console', 'my_little_snake_helpers.file_data_processor', 'my_little_snake_helpers.menu_csv', 'my_little_snake_helpers.menu_image']
+HEAVY_DEPENDENCIES = ['pandas', 'numpy', 'PIL', 'matplotlib', 'tkinter']
+
+# Cumulative import time budget per module, in microseconds.
+BUDGET_US = 50_000
+
+
+def measure_import(module: str) -> tuple[int, set[str]]:
+    """
+    Imports a module in a fresh interpreter with -X importtime.
+
+    Parameters:
+        module (str): The module to import.
+
+    Returns:
+        tuple[int, set[str]]: Cumulative import time of the module in microseconds, and the top-level
+            names of every module imported along the way.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd = REPO_ROOT, capture_output = True, text = True, check = True)
+
+    cumulative_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        # Lines look like: "import time:       123 |        456 |   package.module"
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        imported.add(name.strip().split('.')[0])
+        if name.strip() == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us, imported
+
+
+def main() -> int:
+    failed = False
+    for module in LIGHT_MODULES:
+        cumulative_us, imported = measure_import(module)
+        heavy = sorted(set(HEAVY_DEPENDENCIES) & imported)
+        status = 'ok'
+        if heavy:
+            status = f"FAIL imports {', '.join(heavy)}"
+            failed = True
+        elif cumulative_us > BUDGET_US:
+            status = f"FAIL over {BUDGET_US} us budget"
+            failed = True
+        print(f"{module:<45} {cumulative_us:>8} us  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# Throughput (records/sec) of remove_keys_from_json and its streaming variant. Fails (exit code 1) if a
+# case with a target rate falls below it.
+# Run from the repo root with `python benchmarks/bench_remove_keys.py`.
+import os
+import sys
+import json
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from my_little_snake_helpers.file_data_processor import FileDataProcessor
+
+# Minimum records per second of the cases that have one: plain top-level removal must stay a tight
+# loop, and streaming must keep up with exports of a few million records.
+TARGETS = {
+    'remove_keys_from_json in place (top)': 100_000,
+    'stream_remove_keys_from_json .json': 10_000,
+    'stream_remove_keys_from_json .jsonl': 10_000,
+}
+
+
+def make_records(count: int) -> list[dict]:
+    # Export-like records: a dozen flat fields and a nested object.
+    return [{'id': i, 'name': f"user {i}", 'email': f"user{i}@example.com", 'phone': "555-0100", 'city': "Springfield",
+             'score': i * 0.5, 'active': i % 2 == 0, 'tags': ["a", "b"], 'notes': "", 'created': "2025-06-02",
+             'updated': "2025-06-03", 'meta': {'source': "import", 'ip': "10.0.0.1", 'agent': "cli"}} for i in range(count)]
+
+
+def legacy_remove(data, keys_to_remove):
+    # The original nested loop.
+    for item in data:
+        for key in keys_to_remove:
+            item.pop(key, None)
+    return data
+
+
+def report(name: str, count: int, seconds: float) -> bool:
+    # Prints the rate of a case and whether it meets its target. Returns False if it falls below it.
+    records_per_second = count / seconds
+    status = ''
+    if name in TARGETS:
+        status = 'ok' if records_per_second >= TARGETS[name] else f"FAIL below {TARGETS[name]:,} records/s"
+    print(f"{name:<40} {records_per_second:>12,.0f} records/s  {status}")
+    return not status.startswith('FAIL')
+
+
+def main(count: int = 200_000) -> int:
+    processor = FileDataProcessor()
+    drop = ['email', 'phone', 'notes', 'created', 'updated', 'meta.ip']
+    keep = ['id', 'name']
+
+    cases = {
+        'legacy nested loop (top-level only)': lambda data: legacy_remove(data, drop[:-1]),
+        'remove_keys_from_json in place (top)': lambda data: processor.remove_keys_from_json(data, drop[:-1]),
+        'remove_keys_from_json in place': lambda data: processor.remove_keys_from_json(data, drop),
+        'remove_keys_from_json copy': lambda data: processor.remove_keys_from_json(data, drop, in_place = False),
+        'remove_keys_from_json keep_keys': lambda data: processor.remove_keys_from_json(data, [], keep_keys = keep),
+    }
+    passed = True
+    for name, func in cases.items():
+        data = make_records(count)
+        start = time.perf_counter()
+        func(data)
+        passed &= report(name, count, time.perf_counter() - start)
+
+    # Streaming, file to file, for both formats.
+    with tempfile.TemporaryDirectory() as directory:
+        records = make_records(count)
+        array_path = os.path.join(directory, 'records.json')
+        lines_path = os.path.join(directory, 'records.jsonl')
+        with open(array_path, 'w') as file:
+            json.dump(records, file)
+        with open(lines_path, 'w') as file:
+            file.writelines(json.dumps(record) + "\n" for record in records)
+
+        for path in (array_path, lines_path):
+            start = time.perf_counter()
+            written = processor.stream_remove_keys_from_json(path, path + '.out', drop)
+            passed &= report(f"stream_remove_keys_from_json {os.path.splitext(path)[1]}", written, time.perf_counter() - start)
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# Benchmark suite for the helpers' hot paths. Generates synthetic inputs (scaled-up demo csv and image,
+# JSON record lists), times each case and writes the results as JSON, optionally comparing them against
+# the JSON of an earlier run and flagging cases that got slower.
+# Run from the repo root with `python benchmarks/run.py`, e.g.
+#   python benchmarks/run.py --output baseline.json
+#   python benchmarks/run.py --baseline baseline.json --output current.json
+# The exit code is 1 when a regression is flagged.
+import io
+import os
+import re
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from my_little_snake_helpers.console import Console
+from my_little_snake_helpers.page_formatter import PageFormatter
+from my_little_snake_helpers.file_data_processor import FileDataProcessor
+from synthetic_data import make_csv, make_image, make_records
+
+SETUP_PY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'setup.py')
+
+# Input sizes of a full run and of a --quick run.
+SIZES = {
+    'full': {'csv_rows': 500_000, 'image_scale': 3, 'records': 200_000, 'print_lines': 20_000, 'pages': 200},
+    'quick': {'csv_rows': 50_000, 'image_scale': 1, 'records': 20_000, 'print_lines': 2_000, 'pages': 50},
+}
+
+
+def measure(function, setup = None, repeat: int = 5) -> list[float]:
+    # Seconds of each run of function(*setup()), setup isn't timed (it gives every run fresh input).
+    seconds = []
+    for _ in range(repeat):
+        args = setup() if setup is not None else ()
+        start = time.perf_counter()
+        function(*args)
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def result(seconds: list[float], items: int, unit: str) -> dict:
+    # One case's entry in the JSON output. The median is what comparisons use.
+    median = statistics.median(seconds)
+    return {
+        'median_seconds': median,
+        'min_seconds': min(seconds),
+        'runs': len(seconds),
+        'items': items,
+        'unit': unit,
+        'per_second': items / median if median > 0 else None,
+    }
+
+
+def bench_fancy_print(sizes: dict, repeat: int, directory: str) -> dict:
+    # Styled output of menu-like lines, with stdout captured so the terminal isn't part of the timing.
+    console = Console()
+    lines = sizes['print_lines']
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(lines):
+                console.fancy_print("<MENU_KEY>[{}]</MENU_KEY> - <MENU_ITEM>{}</MENU_ITEM> <DATA>{}</DATA>", i, "drop columns", i * 0.5)
+
+    return result(measure(run, repeat = repeat), lines, 'lines')
+
+
+def bench_paginated_print(sizes: dict, repeat: int, directory: str) -> dict:
+    # Page formatting of paginated_print (the layout and every page's lines), without the prompt.
+    df = FileDataProcessor().load_csv_to_dataframe(os.path.join(directory, 'data.csv'))
+    pages = sizes['pages']
+    page_size = 20
+
+    def run():
+        formatter = PageFormatter(df, page_size = page_size, line_width = 200)
+        for page in range(pages):
+            start = page * page_size
+            formatter.format_page(df.iloc[start:start + page_size], start)
+
+    return result(measure(run, repeat = repeat), pages, 'pages')
+
+
+def bench_load_csv(sizes: dict, repeat: int, directory: str) -> dict:
+    # Parsing the synthetic csv, without the on-disk cache.
+    processor = FileDataProcessor()
+    path = os.path.join(directory, 'data.csv')
+    return result(measure(lambda: processor.load_csv_to_dataframe(path, cache = False), repeat = repeat), sizes['csv_rows'], 'rows')
+
+
+def bench_load_csv_optimized(sizes: dict, repeat: int, directory: str) -> dict:
+    # Parsing plus the memory optimizer (smaller numeric types, categoricals, dates).
+    processor = FileDataProcessor()
+    path = os.path.join(directory, 'data.csv')
+    return result(measure(lambda: processor.load_csv_to_dataframe(path, cache = False, optimize_memory = True), repeat = repeat), sizes['csv_rows'], 'rows')
+
+
+def bench_load_image(sizes: dict, repeat: int, directory: str) -> dict:
+    # Decoding the scaled-up jpg at full resolution.
+    processor = FileDataProcessor()
+    path = os.path.join(directory, 'image.jpg')
+    array = processor.load_image_to_array(path)
+    seconds = measure(lambda: processor.load_image_to_array(path), repeat = repeat)
+    return result(seconds, array.shape[0] * array.shape[1], 'pixels')
+
+
+def bench_remove_keys(sizes: dict, repeat: int, directory: str) -> dict:
+    # Removing top-level and nested keys in place, each run gets fresh records.
+    processor = FileDataProcessor()
+    count = sizes['records']
+    drop = ['email', 'phone', 'notes', 'created', 'updated', 'meta.ip']
+    seconds = measure(lambda records: processor.remove_keys_from_json(records, drop), setup = lambda: (make_records(count),), repeat = repeat)
+    return result(seconds, count, 'records')
+
+
+BENCHMARKS = {
+    'fancy_print': bench_fancy_print,
+    'paginated_print_format': bench_paginated_print,
+    'load_csv_to_dataframe': bench_load_csv,
+    'load_csv_to_dataframe_optimized': bench_load_csv_optimized,
+    'load_image_to_array': bench_load_image,
+    'remove_keys_from_json': bench_remove_keys,
+}
+
+
+def package_version():
+    # The version in setup.py, so runs of different versions can be told apart.
+    try:
+        with open(SETUP_PY) as file:
+            match = re.search(r"version\s*=\s*['\"]([^'\"]+)['\"]", file.read())
+        return match.group(1) if match else None
+    except OSError:
+        return None
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[dict]:
+    # Median time of every case present in both runs, flagged when it grew by more than threshold.
+    rows = []
+    for name, entry in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        ratio = entry['median_seconds'] / previous['median_seconds'] if previous['median_seconds'] > 0 else float('inf')
+        rows.append({'name': name, 'baseline_seconds': previous['median_seconds'], 'current_seconds': entry['median_seconds'], 'ratio': ratio, 'regression': ratio > 1 + threshold})
+    return rows
+
+
+def main(argv = None) -> int:
+    parser = argparse.ArgumentParser(description = "Times the helpers' hot paths on synthetic data.")
+    parser.add_argument('--quick', action = 'store_true', help = "smaller inputs, for a fast check")
+    parser.add_argument('--repeat', type = int, default = 5, help = "runs per case (the median is reported)")
+    parser.add_argument('--only', help = "comma separated case names to run")
+    parser.add_argument('--output', help = "write the results JSON to this file (printed to stdout otherwise)")
+    parser.add_argument('--baseline', help = "results JSON of an earlier run to compare against")
+    parser.add_argument('--threshold', type = float, default = 0.2, help = "slowdown ratio flagged as a regression (0.2 = 20%% slower)")
+    args = parser.parse_args(argv)
+
+    sizes = SIZES['quick' if args.quick else 'full']
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+
+    report = {
+        'version': package_version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'sizes': sizes,
+        'results': {},
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Generate the inputs once, every case reads them from the temporary directory.
+        if any(name.startswith(('load_csv', 'paginated')) for name in names):
+            make_csv(os.path.join(directory, 'data.csv'), sizes['csv_rows'])
+        if 'load_image_to_array' in names:
+            make_image(os.path.join(directory, 'image.jpg'), sizes['image_scale'])
+
+        for name in names:
+            entry = BENCHMARKS[name](sizes, args.repeat, directory)
+            report['results'][name] = entry
+            print(f"{name:<34} {entry['median_seconds']:9.4f} s  {entry['per_second']:>14,.0f} {entry['unit']}/s", file = sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent = 2)
+    else:
+        print(json.dumps(report, indent = 2))
+
+    if not args.baseline:
+        return 0
+
+    # Compare against the baseline run.
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    rows = compare(report, baseline, args.threshold)
+    print(f"\ncompared with {args.baseline} (version {baseline.get('version')}):", file = sys.stderr)
+    if baseline.get('sizes') != sizes:
+        print("note: the baseline used different input sizes, the times aren't comparable", file = sys.stderr)
+    for row in rows:
+        flag = "  REGRESSION" if row['regression'] else ""
+        print(f"{row['name']:<34} {row['baseline_seconds']:9.4f} s -> {row['current_seconds']:9.4f} s  ({row['ratio']:.2f}x){flag}", file = sys.stderr)
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
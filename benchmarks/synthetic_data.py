@@ -0,0 +1,42 @@
+# Synthetic inputs for the benchmark suite: scaled-up copies of the demo csv and image, and JSON
+# record lists. Used by benchmarks/run.py.
+import os
+import uuid
+import random
+import pandas as pd
+
+DEMO_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'demo_data')
+SAMPLE_CSV = os.path.join(DEMO_DATA, 'sample_csv_data.csv')
+SAMPLE_JPG = os.path.join(DEMO_DATA, 'sample_jpg.jpg')
+
+
+def make_csv(path: str, rows: int, seed: int = 0) -> str:
+    # Writes a csv shaped like the demo csv with the given number of rows. Every column's values are drawn
+    # from the demo file's values (numbers are jittered), and TransactionID stays unique.
+    sample = pd.read_csv(SAMPLE_CSV)
+    rng = random.Random(seed)
+    positions = [rng.randrange(len(sample)) for _ in range(rows)]
+    df = sample.iloc[positions].reset_index(drop = True)
+    df['TransactionID'] = [str(uuid.UUID(int = rng.getrandbits(128), version = 4)) for _ in range(rows)]
+    df['Quantity'] = [rng.randint(1, 10) for _ in range(rows)]
+    df['UnitPrice'] = [round(rng.uniform(5, 1500), 2) for _ in range(rows)]
+    df['Discount'] = [round(rng.uniform(0, 0.3), 2) for _ in range(rows)]
+    df.to_csv(path, index = False)
+    return path
+
+
+def make_image(path: str, scale: int = 3) -> str:
+    # Writes the demo jpg resized by scale (3 turns the 1280x853 sample into a 3840x2559 image).
+    from PIL import Image
+    with Image.open(SAMPLE_JPG) as image:
+        image.resize((image.width * scale, image.height * scale), Image.Resampling.BICUBIC).save(path, quality = 90)
+    return path
+
+
+def make_records(count: int, seed: int = 0) -> list[dict]:
+    # Returns export-like JSON records: a dozen flat fields and a nested object.
+    rng = random.Random(seed)
+    return [{'id': i, 'name': f"user {i}", 'email': f"user{i}@example.com", 'phone': f"555-{rng.randrange(10_000):04}",
+             'city': rng.choice(("Springfield", "Shelbyville", "Ogdenville")), 'score': rng.random() * 100, 'active': i % 2 == 0,
+             'tags': ["a", "b"], 'notes': "", 'created': "2025-06-02", 'updated': "2025-06-03",
+             'meta': {'source': "import", 'ip': f"10.0.{rng.randrange(256)}.{rng.randrange(256)}", 'agent': "cli"}} for i in range(count)]
@@ -0,0 +1,29 @@
+import importlib
+
+# Public classes and the modules they live in. They are imported on first access (PEP 562) so
+# `import my_little_snake_helpers` never pulls in pandas, numpy, PIL, matplotlib or tkinter.
+_EXPORTS = {
+    'Console': '.console',
+    'FileDataProcessor': '.file_data_processor',
+    'CsvRowIndex': '.csv_row_index',
+    'MenuCSV': '.menu_csv',
+    'MenuImage': '.menu_image',
+    'BackgroundLoader': '.background_loader',
+    'DataFrameFilter': '.dataframe_filter',
+    'SummaryEngine': '.dataframe_summary',
+    'CursesMenu': '.curses_menu',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,250 @@
+import time
+import threading
+
+class LoadCancelled(Exception):
+    """
+    Raised inside a load whose LoadJob has been cancelled, to unwind it at its next progress report.
+    """
+
+
+class LoadJob():
+    """
+    One load submitted to a BackgroundLoader. The worker reports progress through report(), which the
+    UI reads back through the attributes and describe(). Every field is written by a single thread, so
+    they are read without locking.
+
+    Attributes:
+        label (str): Short name shown in progress views (usually the file name).
+        path (str): The path being loaded.
+        state (str): 'queued', 'running', 'done', 'failed' or 'cancelled'.
+        done (int): Units processed so far (bytes or files, see unit).
+        total (int | None): Total units, None if unknown.
+        unit (str): 'bytes' or 'files'.
+        rows (int): Rows parsed so far (csv loads).
+        result: The return value of the load function once state is 'done'.
+        error (Exception | None): The error of a failed load.
+    """
+
+    def __init__(self, label: str, path: str, unit: str = 'bytes', total: int = None):
+        """
+        Parameters:
+            label (str): Short name shown in progress views.
+            path (str): The path being loaded.
+            unit (str): 'bytes' or 'files'.
+            total (int): Total units, if known up front.
+        """
+        self.label = label
+        self.path = path
+        self.state = 'queued'
+        self.done = 0
+        self.total = total
+        self.unit = unit
+        self.rows = 0
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self._cancel_event = threading.Event()
+        self._future = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in ('queued', 'running')
+
+    def cancel(self) -> None:
+        """
+        Asks the load to stop. A queued load never starts, a running one stops at its next progress report.
+        """
+        self._cancel_event.set()
+        if self._future is not None and self._future.cancel():
+            self.state = 'cancelled'
+
+    def check_cancelled(self) -> None:
+        """
+        Raises:
+            LoadCancelled: If cancel() has been called.
+        """
+        if self._cancel_event.is_set():
+            raise LoadCancelled(self.label)
+
+    def report(self, done: int = None, total: int = None, rows: int = None) -> None:
+        """
+        Records progress. Called from the load, it is also where a cancelled load is stopped.
+
+        Parameters:
+            done (int): Units processed so far.
+            total (int): Total units.
+            rows (int): Rows parsed so far.
+
+        Raises:
+            LoadCancelled: If cancel() has been called.
+        """
+        if done is not None: self.done = done
+        if total is not None: self.total = total
+        if rows is not None: self.rows = rows
+        self.check_cancelled()
+
+    def elapsed(self) -> float:
+        """
+        Returns:
+            float: Seconds the load has been running (or ran), 0 while queued.
+        """
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def fraction(self):
+        """
+        Returns:
+            float | None: Share of the work done, None if the total is unknown.
+        """
+        if not self.total:
+            return 1.0 if self.state == 'done' else None
+        return min(1.0, self.done / self.total)
+
+    def describe(self) -> str:
+        """
+        Returns:
+            str: One line summary of the progress, e.g. "12.3 / 27.0 MB, 45%, 180,000 rows, 95,000 rows/s, 1.9 s".
+        """
+        if self.state == 'queued':
+            return "queued"
+        parts = []
+        if self.unit == 'bytes' and self.total:
+            parts.append(f"{self.done / 1024 ** 2:.1f} / {self.total / 1024 ** 2:.1f} MB")
+        elif self.unit == 'files' and self.total:
+            parts.append(f"{self.done} / {self.total} files")
+        if self.total:
+            parts.append(f"{self.fraction() * 100:.0f}%")
+        if self.rows:
+            parts.append(f"{self.rows:,} rows")
+            if self.elapsed() > 0: parts.append(f"{self.rows / self.elapsed():,.0f} rows/s")
+        parts.append(f"{self.elapsed():.1f} s")
+        return ", ".join(parts)
+
+
+class BackgroundLoader():
+    """
+    Runs loads on worker threads so a menu can keep taking input (and queue more loads) while files
+    are parsed. pandas and PIL release the GIL for most of their parsing and decoding, so the UI thread
+    stays responsive. Finished jobs are collected with pop_finished().
+    """
+
+    def __init__(self, max_workers: int = 2):
+        """
+        Parameters:
+            max_workers (int): Loads running at the same time, later ones wait in the queue.
+        """
+        self.max_workers = max_workers
+        self.jobs = []
+        self._executor = None
+
+    def submit(self, job: LoadJob, function, *args, **kwargs) -> LoadJob:
+        """
+        Queues function(*args, job = job, **kwargs) on a worker thread. The function reports progress
+        through job.report(), and its return value becomes job.result.
+
+        Parameters:
+            job (LoadJob): The job describing the load.
+            function (callable): The load to run.
+            *args: Positional arguments for function.
+            **kwargs: Keyword arguments for function.
+
+        Returns:
+            LoadJob: The job.
+        """
+        if self._executor is None:
+            # Imported on first use, concurrent.futures pulls in multiprocessing and logging.
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers = self.max_workers, thread_name_prefix = "BackgroundLoader")
+        self.jobs.append(job)
+        job._future = self._executor.submit(self._run, job, function, args, kwargs)
+        return job
+
+    @staticmethod
+    def _run(job, function, args, kwargs):
+        # Worker side of a job, records the outcome on the job instead of raising it.
+        if job._cancel_event.is_set():
+            job.state = 'cancelled'
+            return
+        job.started = time.perf_counter()
+        job.state = 'running'
+        try:
+            job.result = function(*args, job = job, **kwargs)
+            state = 'done'
+        except LoadCancelled:
+            state = 'cancelled'
+        except Exception as e:
+            job.error = e
+            state = 'failed'
+
+        # The state is set last, the UI thread treats a finished state as "every field is final".
+        job.finished = time.perf_counter()
+        job.state = state
+
+    def active_jobs(self) -> list[LoadJob]:
+        """
+        Returns:
+            list[LoadJob]: Jobs that are queued or running.
+        """
+        return [job for job in self.jobs if job.is_active]
+
+    def pop_finished(self) -> list[LoadJob]:
+        """
+        Removes and returns the jobs that have finished (done, failed or cancelled), in submission order.
+
+        Returns:
+            list[LoadJob]: The finished jobs.
+        """
+        finished = [job for job in self.jobs if not job.is_active]
+        self.jobs = [job for job in self.jobs if job.is_active]
+        return finished
+
+    def cancel_all(self) -> None:
+        """
+        Cancels every queued and running job.
+        """
+        for job in self.active_jobs():
+            job.cancel()
+
+    def shutdown(self) -> None:
+        """
+        Cancels every job and waits for the workers to stop.
+        """
+        self.cancel_all()
+        if self._executor is not None:
+            self._executor.shutdown(wait = True)
+            self._executor = None
+
+    def monitor(self, console, refresh_seconds: float = 0.25) -> None:
+        """
+        Shows a live view of the active jobs until the user presses ENTER or every job has finished.
+        Pressing a job's number cancels it, 'c' cancels all of them.
+
+        Parameters:
+            console (Console): The console to draw on.
+            refresh_seconds (float): Time between redraws.
+        """
+        while True:
+            jobs = self.active_jobs()
+            if not jobs:
+                return
+
+            # Draw every job with its progress bar as one frame.
+            with console.frame():
+                console.clear()
+                console.fancy_print("<MENU_TITLE>loads in progress</MENU_TITLE>")
+                for number, job in enumerate(jobs, start = 1):
+                    console.fancy_print("<OPTION>{}.</OPTION> <MENU_ITEM>{}</MENU_ITEM> <DATA>{} {}</DATA>", number, job.label, console.progress_bar(job.fraction()), job.describe())
+                console.fancy_print("<INPUT_PROMPT>press a number to cancel that load, </INPUT_PROMPT><KEYBOARD_KEY>c</KEYBOARD_KEY><INPUT_PROMPT> to cancel all, </INPUT_PROMPT><KEYBOARD_KEY>ENTER</KEYBOARD_KEY><INPUT_PROMPT> to return</INPUT_PROMPT>")
+
+            # Wait for a key or the next refresh.
+            key = console.poll_key(refresh_seconds)
+            if key is None:
+                continue
+            if key in ('\n', '\r'):
+                return
+            if key.lower() == 'c':
+                self.cancel_all()
+            elif key.isdigit() and 1 <= int(key) <= len(jobs):
+                jobs[int(key) - 1].cancel()
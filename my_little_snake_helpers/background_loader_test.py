@@ -0,0 +1,84 @@
+import threading
+import unittest
+from my_little_snake_helpers.background_loader import BackgroundLoader, LoadJob, LoadCancelled
+
+
+def wait_for(job: LoadJob, timeout: float = 5.0) -> None:
+    # Wait until the job's worker has finished with it.
+    job._future.result(timeout = timeout)
+
+
+class LoadJobTest(unittest.TestCase):
+
+    def test_report_and_describe(self):
+        job = LoadJob("data.csv", "/tmp/data.csv", total = 4 * 1024 ** 2)
+        self.assertEqual(job.describe(), "queued")
+        self.assertIsNone(LoadJob("x", "x").fraction())
+
+        job.state = 'running'
+        job.report(1024 ** 2, rows = 1000)
+        self.assertEqual(job.fraction(), 0.25)
+        self.assertTrue(job.describe().startswith("1.0 / 4.0 MB, 25%, 1,000 rows"))
+
+    def test_report_raises_once_cancelled(self):
+        job = LoadJob("x", "x")
+        job.report(1)
+        job.cancel()
+        with self.assertRaises(LoadCancelled):
+            job.report(2)
+
+
+class BackgroundLoaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loader = BackgroundLoader(max_workers = 1)
+        self.addCleanup(self.loader.shutdown)
+
+    def test_result_and_progress(self):
+        def load(path, job = None):
+            for done in range(1, 4):
+                job.report(done, 3, rows = done * 10)
+            return path.upper()
+
+        job = self.loader.submit(LoadJob("a", "a", unit = 'files'), load, "a.csv")
+        wait_for(job)
+        self.assertEqual((job.state, job.result, job.done, job.rows), ('done', "A.CSV", 3, 30))
+        self.assertEqual(job.fraction(), 1.0)
+        self.assertGreaterEqual(job.elapsed(), 0.0)
+        self.assertEqual(self.loader.pop_finished(), [job])
+        self.assertEqual(self.loader.jobs, [])
+
+    def test_failure_is_recorded(self):
+        def load(job = None):
+            raise RuntimeError("an error occurred while reading the csv")
+
+        job = self.loader.submit(LoadJob("a", "a"), load)
+        wait_for(job)
+        self.assertEqual(job.state, 'failed')
+        self.assertIsInstance(job.error, RuntimeError)
+
+    def test_cancel_running_and_queued(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow(job = None):
+            started.set()
+            while True:
+                release.wait(0.01)
+                job.report()
+
+        running = self.loader.submit(LoadJob("running", "a"), slow)
+        queued = self.loader.submit(LoadJob("queued", "b"), slow)
+        self.assertTrue(started.wait(5))
+        self.assertEqual([job.label for job in self.loader.active_jobs()], ["running", "queued"])
+
+        # The queued job never starts, the running one stops at its next report.
+        self.loader.cancel_all()
+        wait_for(running)
+        self.assertEqual((running.state, queued.state), ('cancelled', 'cancelled'))
+        self.assertIsNone(queued.started)
+        self.assertEqual(len(self.loader.pop_finished()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,40 @@
 import os
 import re
-import pandas as pd
+import sys
+import time
+import select
+import shutil
+import fnmatch
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+from .tag_template import TemplateEngine, TAG_PATTERN
+from .menu_index import MenuIndex
+from .page_formatter import PageFormatter
+from . import instrumentation
+from .lazy_import import lazy_import
+
+# pandas is only needed for type hints here, importing it at runtime would cost every CLI using Console.
+if TYPE_CHECKING:
+    import pandas as pd
+
+# numpy is only needed to render images, it is imported on first use.
+np = lazy_import('numpy')
+
+# Screen control sequences. Kept at module level so they don't end up in Console.TAG_MAP.
+_CURSOR_HOME = "\033[H"
+_ERASE_SCREEN = "\033[2J"
+_ERASE_SCROLLBACK = "\033[3J"
+_ERASE_LINE_END = "\033[K"
+_ERASE_BELOW = "\033[J"
+_ANSI_SEQUENCE = re.compile(r'\033\[[0-9;?]*[A-Za-z]')
+
+# One terminal cell of an image preview: foreground (top pixel) and background (bottom pixel) colors as
+# fixed-width zero-padded decimals, then the upper half block. The digits are filled in vectorized.
+_IMAGE_CELL = "\033[38;2;000;000;000m\033[48;2;000;000;000m\u2580".encode('utf-8')
+_IMAGE_CELL_DIGITS = (7, 11, 15, 26, 30, 34)
+
+# The cell of a last, unpaired pixel row: the top pixel over the terminal's default background.
+_IMAGE_TOP_CELL = "\033[38;2;000;000;000m\033[49m\u2580".encode('utf-8')
 
 class Console():
 
@@ -70,14 +104,24 @@ class Console():
     OPTION = GREEN
     INPUT_PROMPT = CYAN
 
-    def __init__(self):
+    # Whether the terminal understands ANSI screen control, resolved once per process (see _screen_control).
+    _screen_control_mode = None
+
+    def __init__(self, differential_redraw: bool = False):
         """
         Initializes the tag mapping dictionary by collecting all class-level constants 
         (attributes with uppercase names and string values). These are assumed to be 
         ANSI escape code tags used for styling terminal output.
 
+        Parameters:
+            differential_redraw (bool): If True, full-screen frames (frames that start with clear()) only
+                rewrite the lines that changed since the previous frame instead of repainting the screen.
+
         Attributes:
             TAG_MAP (Dict[str, str]): Mapping of tag names (e.g., 'RED') to ANSI codes.
+            template_engine (TemplateEngine): Compiles and caches tagged strings for fancy_print / fancy_input.
+            stream (TextIO): The stream styled output is written to (sys.stdout at the time of each write if None).
+            differential_redraw (bool): See parameters.
         """      
         # Initialize an empty dictionary to store tag mappings.
         tag_map = {}
@@ -94,145 +138,450 @@ class Console():
         # Assign the resulting dictionary to the instance variable.
         self.TAG_MAP = tag_map
 
+        # Create the template engine, tagged strings are parsed once and then served from its cache.
+        self.template_engine = TemplateEngine(self.TAG_MAP, self.RESET)
+
+        # Output stream and frame buffer state (see begin_frame / end_frame).
+        self.stream = None
+        self._frame_depth = 0
+        self._frame_buffer = []
+
+        # Differential redraw state, _last_frame_lines is None whenever the screen contents are unknown.
+        self.differential_redraw = differential_redraw
+        self._frame_fullscreen = False
+        self._last_frame_lines = None
+
+        # Search index of the last filtered menu, as (item list, MenuIndex).
+        self._menu_index = None
+
+
+    def begin_frame(self) -> None:
+        """
+        Starts collecting styled output instead of writing it immediately. Everything printed until the
+        matching end_frame() is sent to the terminal in a single write. Frames can be nested, only the
+        outermost end_frame() writes.
+        """
+        self._frame_depth += 1
+
+
+    def flush_frame(self) -> None:
+        """
+        Writes everything collected in the current frame with one write call and empties the buffer.
+        The frame stays open.
+        """
+        if not self._frame_buffer:
+            return
+        text = "".join(self._frame_buffer)
+        self._frame_buffer.clear()
+
+        # A full-screen frame in differential mode only rewrites what changed.
+        if self._frame_fullscreen:
+            self._frame_fullscreen = False
+            text = self._differential_text(text)
+        else:
+            self._last_frame_lines = None
+
+        with instrumentation.timer('Console.flush_frame') as timing:
+            stream = self.stream or sys.stdout
+            stream.write(text)
+            stream.flush()
+            timing.add(characters = len(text))
+
+
+    def end_frame(self) -> None:
+        """
+        Closes the current frame, flushing the collected output if this was the outermost frame.
+        """
+        if self._frame_depth > 0:
+            self._frame_depth -= 1
+        if self._frame_depth == 0:
+            self.flush_frame()
+
 
+    @contextmanager
+    def frame(self):
+        """
+        Context manager wrapping begin_frame() / end_frame().
+
+        Example:
+            with console.frame():
+                console.fancy_print("<MENU_TITLE>title</MENU_TITLE>")
+                console.fancy_print("<MENU_ITEM>item</MENU_ITEM>")
+        """
+        self.begin_frame()
+        try:
+            yield self
+        finally:
+            self.end_frame()
+
+
+    def write(self, text: str) -> None:
+        """
+        Writes already styled text, buffering it if a frame is open.
+
+        Parameters:
+            text (str): The text to write (no newline is added).
+        """
+        if self._frame_depth:
+            self._frame_buffer.append(text)
+            return
+        self._last_frame_lines = None
+        stream = self.stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+
+
+    @instrumentation.timed('Console.clear')
     def clear(self) -> None:
         """
-        Clears the terminal screen using an OS-specific command.
-        Works on both Windows and Unix-like systems.
+        Clears the terminal screen in-process using ANSI escape sequences (no shell is spawned).
+        Falls back to the 'cls' command on Windows consoles without ANSI support and to scrolling
+        the old contents away on dumb terminals. Inside a frame the clear is buffered with the frame.
+        """
+        mode = self._screen_control()
+
+        # In differential mode a clear at the start of a frame marks it as a full-screen frame,
+        # the flush then decides which lines actually need rewriting.
+        if self._frame_depth and self.differential_redraw and mode == 'ansi':
+            self._frame_buffer.clear()
+            self._frame_fullscreen = True
+            return
+
+        if mode == 'ansi':
+            self.write(_CURSOR_HOME + _ERASE_SCREEN + _ERASE_SCROLLBACK)
+        elif mode == 'cls':
+            self.flush_frame()
+            os.system('cls')
+            self._last_frame_lines = None
+        else:
+            self.write("\n" * shutil.get_terminal_size().lines)
+
+
+    def home(self) -> None:
         """
-        os.system('cls' if os.name == 'nt' else 'clear')
+        Moves the cursor to the top left corner of the screen (no-op on dumb terminals).
+        """
+        if self._screen_control() == 'ansi':
+            self.write(_CURSOR_HOME)
 
 
-    def paginated_print(self, df: pd.DataFrame, page_size: int = 10):
+    def erase_line(self) -> None:
+        """
+        Erases from the cursor to the end of the current line (no-op on dumb terminals).
         """
-        Pretty prints a DataFrame in chunks, with row numbers, prompting the user to press Enter to continue.
+        if self._screen_control() == 'ansi':
+            self.write(_ERASE_LINE_END)
+
+
+    def erase_below(self) -> None:
+        """
+        Erases from the cursor to the end of the screen (no-op on dumb terminals).
+        """
+        if self._screen_control() == 'ansi':
+            self.write(_ERASE_BELOW)
+
+
+    def _screen_control(self) -> str:
+        # Resolve (once per process) how the screen can be controlled: 'ansi', 'cls' or 'dumb'.
+        if Console._screen_control_mode is not None:
+            return Console._screen_control_mode
+
+        stream = self.stream or sys.stdout
+        is_tty = hasattr(stream, 'isatty') and stream.isatty()
+
+        if os.name == 'nt':
+            mode = 'ansi' if is_tty and self._enable_windows_ansi() else 'cls'
+        elif not is_tty or os.environ.get('TERM', '') in ('', 'dumb'):
+            mode = 'dumb'
+        else:
+            mode = 'ansi'
+
+        Console._screen_control_mode = mode
+        return mode
+
+
+    @staticmethod
+    def _enable_windows_ansi() -> bool:
+        # Turn on virtual terminal processing for the Windows console (Windows 10+).
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+            console_mode = ctypes.c_uint32()
+            if not kernel32.GetConsoleMode(handle, ctypes.byref(console_mode)):
+                return False
+            return bool(kernel32.SetConsoleMode(handle, console_mode.value | 0x0004))  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        except Exception:
+            return False
+
+
+    def _differential_text(self, text: str) -> str:
+        # Build the output for a full-screen frame, rewriting only the lines that differ from the last frame.
+        lines = text.split("\n")
+        previous = self._last_frame_lines
+        self._last_frame_lines = lines
+        columns, rows = shutil.get_terminal_size()
+
+        # Unknown screen contents, a frame that would scroll, or wrapped lines all need a full repaint.
+        if previous is None or len(lines) >= rows or any(len(_ANSI_SEQUENCE.sub("", line)) >= columns for line in lines):
+            return _CURSOR_HOME + _ERASE_SCREEN + _ERASE_SCROLLBACK + text
+
+        # The last line of the previous frame held the prompt (and whatever the user typed after it),
+        # so everything from there down is always rewritten. The new last line is always rewritten so
+        # the cursor ends up where the frame ends.
+        first_forced = min(len(previous), len(lines)) - 1
+        parts = []
+        for row, line in enumerate(lines):
+            if row >= first_forced or row >= len(previous) or previous[row] != line:
+                parts.append(f"\033[{row + 1};1H{line}{_ERASE_LINE_END}")
+        parts.append(_ERASE_BELOW)
+        return "".join(parts)
+
+
+    def paginated_print(self, df: 'pd.DataFrame', page_size: int = 10):
+        """
+        Pretty prints a DataFrame in chunks, with row numbers. The user presses Enter for the next page,
+        or jumps with 'p' (previous page), a page number, or 'r' followed by a row number. Column widths
+        are worked out once (see PageFormatter) so every page lines up, and frames wider than the terminal
+        are shown a window of columns at a time, changed with '<' and '>'.
 
         Args:
-            df (pd.DataFrame): The DataFrame to print.
+            df (pd.DataFrame | CsvRowIndex): The DataFrame to print, or any row source with __len__ and
+                read_rows(start, stop) (such as a CsvRowIndex over a csv file too large to load).
             page_size (int): Number of rows to display per page.
         """
         total_rows = len(df)
         pages = (total_rows + page_size - 1) // page_size  # Ceiling division
-        row_num_width = len(str(total_rows - 1))  # Zero-padding width
+        if pages == 0:
+            return
 
-        for page in range(pages):
-            start = page * page_size
-            end = start + page_size
-            chunk = df.iloc[start:end].copy()
+        # Row sources read pages straight from disk, DataFrames are sliced.
+        if hasattr(df, 'read_rows'): read_rows = df.read_rows
+        else: read_rows = lambda start, end: df.iloc[start:end]
 
-            # Create a row number column with zero-padded values
-            row_numbers = [str(i).zfill(row_num_width) for i in range(start, min(end, total_rows))]
-            chunk.insert(0, 'Row', row_numbers)
+        # Column widths and formats for every page, and the column windows of a wide frame.
+        formatter = PageFormatter(df, page_size = page_size)
+        windows = len(formatter.windows)
 
-            self.clear()
-            self.fancy_print(f"<DATA>Displaying rows {start+1} to {min(end, total_rows)} of {total_rows}\n</DATA>")
-            self.fancy_print(f"<DATA>{chunk.to_string(index=False)}</DATA>")
+        page = 0
+        window = 0
+        chunk_page = None
+        while page < pages:
+            start = page * page_size
+            end = min(start + page_size, total_rows)
+
+            # Only read the rows again when the page changes, not the column window.
+            if chunk_page != page:
+                chunk = read_rows(start, end)
+                chunk_page = page
+            lines = formatter.format_page(chunk, start, window)
+
+            # Render the page and its prompt as one frame (a single terminal write).
+            with self.frame():
+                self.clear()
+                self.fancy_print("<DATA>Displaying rows {} to {} of {} (page {} of {})</DATA>", start + 1, end, total_rows, page + 1, pages)
+                if windows > 1:
+                    columns = formatter.windows[window]
+                    self.fancy_print("<DATA>columns {} to {} of {} (window {} of {})</DATA>", columns.start + 1, columns.stop, len(formatter.columns), window + 1, windows)
+                self.fancy_print("")
+                self.fancy_print("<DATA>{}</DATA>", "\n".join(lines))
+                window_str = "<KEYBOARD_KEY><</KEYBOARD_KEY><INPUT_PROMPT> / </INPUT_PROMPT><KEYBOARD_KEY>></KEYBOARD_KEY><INPUT_PROMPT> for other columns, </INPUT_PROMPT>" if windows > 1 else ""
+                result = self.fancy_input("<INPUT_PROMPT>press </INPUT_PROMPT><KEYBOARD_KEY>ENTER</KEYBOARD_KEY><INPUT_PROMPT> for next, </INPUT_PROMPT><KEYBOARD_KEY>p</KEYBOARD_KEY><INPUT_PROMPT> for previous, a page number, </INPUT_PROMPT><KEYBOARD_KEY>r</KEYBOARD_KEY><INPUT_PROMPT> + row number, </INPUT_PROMPT>" + window_str + "<INPUT_PROMPT>or </INPUT_PROMPT><KEYBOARD_KEY>n</KEYBOARD_KEY><INPUT_PROMPT> to quit... </INPUT_PROMPT>")
+
+            # Work out which page (or column window) to show next.
+            command = result.strip().lower()
+            if command == 'n':
+                break
+            elif command == '':
+                page += 1
+            elif command == 'p':
+                page = max(page - 1, 0)
+            elif command == '<':
+                window = max(window - 1, 0)
+            elif command == '>':
+                window = min(window + 1, windows - 1)
+            elif command.isdigit():
+                page = min(max(int(command) - 1, 0), pages - 1)
+            elif command.startswith('r') and command[1:].strip().isdigit():
+                page = min(int(command[1:].strip()) // page_size, pages - 1)
+
+
+    def fancy_format(self, text: str, *args, **kwargs) -> str:
+        """
+        Returns the given text with tags like <TAG> and </TAG> replaced by their ANSI escape codes.
+        The tagged string is compiled once and cached, so repeated calls are cheap.
 
-            if end < total_rows:
-                result = self.fancy_input(f"<INPUT_PROMPT>type <KEYBOARD_KEY>n</KEYBOARD_KEY><INPUT_PROMPT> to quit or press </INPUT_PROMPT><KEYBOARD_KEY>ENTER</KEYBOARD_KEY><INPUT_PROMPT> to continue... </INPUT_PROMPT>")
-                if result.strip().lower() == 'n':
-                    break
-            else:
-                self.press_enter_pause()
+        Parameters:
+            text (str): The input string containing formatting tags and optional {} placeholders.
+            *args: Positional values for {} placeholders (inserted as-is, never parsed for tags).
+            **kwargs: Keyword values for {name} placeholders.
+
+        Returns:
+            str: The styled string, ending with the reset code.
+        """
+        return self.template_engine.render(text, *args, **kwargs)
 
 
-    def fancy_print(self, text: str) -> None:
+    @instrumentation.timed('Console.fancy_print')
+    def fancy_print(self, text: str, *args, **kwargs) -> None:
         """
         Prints the given text to the terminal, replacing tags like <TAG> and </TAG> 
         with corresponding ANSI escape codes defined in TAG_MAP.
 
         Parameters:
             text (str): The input string containing formatting tags to be styled and printed.
+            *args: Positional values for {} placeholders in text.
+            **kwargs: Keyword values for {name} placeholders in text.
         """
-        def replacer(match: re.Match) -> str:
-            closing, tag = match.group(1), match.group(2)
-            if closing:
-                return self.RESET
-            return self.TAG_MAP.get(tag, "")
+        self.write(self.template_engine.render(text, *args, **kwargs) + "\n")
 
-        pattern = re.compile(r'<(/?)(\w+)>')
-        styled_text = pattern.sub(replacer, text)
-        print(styled_text + self.RESET)
 
-
-    def fancy_input(self, text: str) -> str:
+    def fancy_input(self, text: str, *args, **kwargs) -> str:
         """
         Displays styled input prompt by replacing formatting tags with ANSI codes,
         and returns the raw input from the user.
 
         Parameters:
             text (str): The prompt string containing <TAG> and </TAG> formatting tags.
+            *args: Positional values for {} placeholders in text.
+            **kwargs: Keyword values for {name} placeholders in text.
 
         Returns:
             str: The user's raw input.
         """
-        def replacer(match: re.Match) -> str:
-            closing, tag = match.group(1), match.group(2)
-            if closing:
-                return self.RESET
-            return self.TAG_MAP.get(tag, "")
+        prompt = self.template_engine.render(text, *args, **kwargs)
+
+        # When readline is active it has to own the prompt to redraw the line correctly while editing.
+        if 'readline' in sys.modules:
+            self.flush_frame()
+            return input(prompt)
 
-        pattern = re.compile(r'<(/?)(\w+)>')
-        styled_text = pattern.sub(replacer, text)
-        return input(styled_text + self.RESET)
+        # Otherwise send any pending frame output together with the prompt in one write, then read the input.
+        self.write(prompt)
+        self.flush_frame()
+        return input()
 
 
-    def menu(self, title: str, item_list: list[str], input_message: str ='enter selection: ',  prepend_str: str = None, append_str: str = None) -> str:
+    def menu(self, title: str, item_list: list[str], input_message: str ='enter selection: ',  prepend_str: str = None, append_str: str = None, page_size: int = None, pinned_count: int = 0) -> str:
         """
         Creates a simple menu and returns the user's selection (input is not validated).
+
+        Lists longer than page_size are shown one page at a time and only the visible page is formatted.
+        In that case '<' and '>' change page, '/text' filters the items to those whose label contains text
+        ('/^text' to those starting with it) and '/' clears the filter. Items keep their numbers while
+        filtered, so the selection means the same thing on every page.
         
         Parameters:
             title (str): Title to be displayed on the menu.
             item_list (list[str]): Items to display in the menu.
             input_message (str): Prompt message for user input (default is 'enter selection: ').
+            prepend_str (str): Optional text shown above the items.
+            append_str (str): Optional text shown below the items.
+            page_size (int): Items shown per page. If None, fits the terminal height (at least 10).
+            pinned_count (int): Number of items at the end of item_list (e.g. navigation items) that are
+                always shown under the page and never filtered.
 
         Returns:
             str: Raw input entered by the user.
         """
 
-        # First clear the console.
-        self.clear()
-
-        # Print the menu title.
-        self.fancy_print(f"\n<MENU_TITLE>---{title}---</MENU_TITLE>")
-
         # Check that item_list is a list of strings.
         if not (isinstance(item_list, list) and all(isinstance(item, str) for item in item_list)): raise ValueError('item_list is not a list of strings.')
 
-        
-        if prepend_str is not None:
-            # If prepend_str is provided, print it.
-            self.fancy_print(prepend_str)
-        
-        self.fancy_print("")
+        if page_size is None: page_size = max(10, shutil.get_terminal_size().lines - 12)
+        pinned_count = min(max(pinned_count, 0), len(item_list))
+        body_count = len(item_list) - pinned_count
+
+        # Short lists are shown whole, long ones a page at a time.
+        windowed = body_count > page_size
+        page = 0
+        matches = None  # Positions of the items passing the filter, None when unfiltered.
+        filter_text = ""
 
-        # Iterator.
-        i = 1
+        while True:
+
+            # Work out which items are on the current page.
+            if windowed:
+                shown_count = body_count if matches is None else len(matches)
+                pages = max(1, (shown_count + page_size - 1) // page_size)
+                page = min(page, pages - 1)
+                first = page * page_size
+                last = min(first + page_size, shown_count)
+                positions = range(first, last) if matches is None else matches[first:last]
+            else:
+                positions = range(body_count)
 
-        # For each item in list...
-        for item in item_list:
+            # Render the whole menu as one frame so it reaches the terminal in a single write.
+            with self.frame():
 
-            # Print out the menu option.
-            self.fancy_print(f"<MENU_KEY>[{i:02}]</MENU_KEY> - <MENU_ITEM>{item}</MENU_ITEM>")
+                # First clear the console.
+                self.clear()
+
+                # Print the menu title.
+                self.fancy_print(f"\n<MENU_TITLE>---{title}---</MENU_TITLE>")
+
+                if prepend_str is not None:
+                    # If prepend_str is provided, print it.
+                    self.fancy_print(prepend_str)
+                
+                self.fancy_print("")
+
+                # Print out the menu options of this page.
+                for position in positions:
+                    self.fancy_print(f"<MENU_KEY>[{position + 1:02}]</MENU_KEY> - <MENU_ITEM>{item_list[position]}</MENU_ITEM>")
+
+                # Say where we are in a long list and how to move around it.
+                if windowed:
+                    filter_str = f", filtered by '{filter_text}'" if matches is not None else ""
+                    self.fancy_print("<DATA>page {} of {}, {} of {} items{}</DATA>", page + 1, pages, shown_count, body_count, filter_str)
+                    self.fancy_print("<INPUT_PROMPT>enter </INPUT_PROMPT><KEYBOARD_KEY><</KEYBOARD_KEY><INPUT_PROMPT> / </INPUT_PROMPT><KEYBOARD_KEY>></KEYBOARD_KEY><INPUT_PROMPT> to change page, </INPUT_PROMPT><KEYBOARD_KEY>/text</KEYBOARD_KEY><INPUT_PROMPT> to filter, </INPUT_PROMPT><KEYBOARD_KEY>/</KEYBOARD_KEY><INPUT_PROMPT> to clear the filter</INPUT_PROMPT>")
+
+                # Pinned items are on every page.
+                for position in range(body_count, len(item_list)):
+                    self.fancy_print(f"<MENU_KEY>[{position + 1:02}]</MENU_KEY> - <MENU_ITEM>{item_list[position]}</MENU_ITEM>")
+                
+                if append_str is not None:
+                    # If append_str is provided, print it.
+                    self.fancy_print(append_str)
+
+                # Get the users selection.
+                selection = self.fancy_input(f"\n<MENU_SELECTION_PROMPT>{input_message}</MENU_SELECTION_PROMPT>")
+
+            # Paging and filtering commands are handled here, anything else is the selection.
+            command = selection.strip()
+            if not windowed:
+                return selection
+            if command == '<':
+                page = max(page - 1, 0)
+            elif command == '>':
+                page += 1
+            elif command == '/':
+                matches = None
+                filter_text = ""
+                page = 0
+            elif command.startswith('/'):
+                filter_text = command[1:]
+                index = self._menu_index_for(item_list[:body_count])
+                matches = index.prefix(filter_text[1:]) if filter_text.startswith('^') else index.search(filter_text)
+                page = 0
+            else:
+                return selection
 
-            # Increment the iterator.
-            i += 1
-        
-        if append_str is not None:
-            # If append_str is provided, print it.
-            self.fancy_print(append_str)
 
-        # Get the users selection.
-        return self.fancy_input(f"\n<MENU_SELECTION_PROMPT>{input_message}</MENU_SELECTION_PROMPT>")
+    def _menu_index_for(self, item_list: list[str]) -> MenuIndex:
+        # The search index of the last filtered menu is kept, since validating menus show the same list again.
+        if self._menu_index is None or self._menu_index[0] != item_list:
+            self._menu_index = (list(item_list), MenuIndex(item_list))
+        return self._menu_index[1]
 
 
-    def integer_only_menu_with_validation(self, title: str, item_list: list[str], input_message: str ='enter selection: ', prepend_str: str = None, append_str: str = None) -> tuple[int, str]:
+    def integer_only_menu_with_validation(self, title: str, item_list: list[str], input_message: str ='enter selection: ', prepend_str: str = None, append_str: str = None, page_size: int = None, pinned_count: int = 0) -> tuple[int, str]:
 
         # Loop until we get a valid input.
         while True:
 
             # Call the menu function which renders the menu and input message without validating the input.
-            selection = self.menu(title, item_list, input_message, prepend_str, append_str)
+            selection = self.menu(title, item_list, input_message, prepend_str, append_str, page_size, pinned_count)
 
             # Try protect...
             try:
@@ -257,6 +606,282 @@ class Console():
                 self.press_enter_pause()
 
 
+    def parse_multi_selection(self, selection: str, item_list: list[str]) -> list[int]:
+        """
+        Parses a multi-selection such as "1-3, 5, Price*" into menu numbers.
+
+        Comma (or space) separated tokens can be a number, an inclusive range "a-b", or a glob pattern
+        (matched case-insensitively against the item labels with their tags removed, so a plain name
+        selects that item).
+
+        Parameters:
+            selection (str): The raw user input.
+            item_list (list[str]): The selectable items.
+
+        Returns:
+            list[int]: The selected 1-based menu numbers, in menu order, without duplicates.
+
+        Raises:
+            ValueError: If a token is out of range or matches nothing.
+        """
+        labels = None
+        selected = set()
+        for token in selection.replace(',', ' ').split():
+
+            # Single number.
+            if token.isdigit():
+                numbers = [int(token)]
+
+            # Inclusive range.
+            elif '-' in token and all(part.isdigit() for part in token.split('-', 1)):
+                first, last = (int(part) for part in token.split('-', 1))
+                numbers = list(range(min(first, last), max(first, last) + 1))
+
+            # Glob pattern (or plain name) against the untagged labels.
+            else:
+                if labels is None: labels = [TAG_PATTERN.sub("", item).lower() for item in item_list]
+                numbers = [i + 1 for i, label in enumerate(labels) if fnmatch.fnmatchcase(label, token.lower())]
+                if not numbers: raise ValueError(f"'{token}' does not match any item.")
+
+            if not all(0 < number <= len(item_list) for number in numbers):
+                raise ValueError(f"'{token}' is out of the menu range.")
+            selected.update(numbers)
+
+        return sorted(selected)
+
+
+    def multi_select_menu_with_validation(self, title: str, item_list: list[str], nav_list: list[str] = None, input_message: str = 'enter selection (e.g. 1-3,5,name*): ', prepend_str: str = None, append_str: str = None, page_size: int = None) -> tuple[list[tuple[int, str]], str]:
+        """
+        Shows a menu whose items can be selected several at a time (see parse_multi_selection), followed
+        by navigation items that are selected one at a time by number.
+
+        Parameters:
+            title (str): Title to be displayed on the menu.
+            item_list (list[str]): Selectable items.
+            nav_list (list[str]): Navigation items listed after item_list (e.g. 'apply', 'return').
+            input_message (str): Prompt message for user input.
+            prepend_str (str): Optional text shown above the items.
+            append_str (str): Optional text shown below the items.
+            page_size (int): Items shown per page of a long list (see menu), the navigation items are on every page.
+
+        Returns:
+            tuple[list[tuple[int, str]], str]: The selected (number, item) pairs and None, or an empty list
+                and the selected navigation item.
+        """
+        if nav_list is None: nav_list = []
+        menu_items = item_list + nav_list
+
+        # Loop until we get a valid input.
+        while True:
+            selection = self.menu(title, menu_items, input_message, prepend_str, append_str, page_size, len(nav_list)).strip()
+
+            # A single number in the navigation range selects that navigation item.
+            if selection.isdigit() and len(item_list) < int(selection) <= len(menu_items):
+                return [], menu_items[int(selection) - 1]
+
+            try:
+                if not selection: raise ValueError("nothing was selected.")
+                numbers = self.parse_multi_selection(selection, item_list)
+                return [(number, item_list[number - 1]) for number in numbers], None
+            except ValueError as e:
+                self.fancy_print("<BAD>\n{}</BAD>", e)
+                self.press_enter_pause()
+
+
+    def poll_key(self, timeout: float):
+        """
+        Waits up to timeout seconds for a key press without blocking longer, for views that keep
+        redrawing while they wait for input. When stdin is not a terminal a whole line is read instead.
+
+        Parameters:
+            timeout (float): Seconds to wait.
+
+        Returns:
+            str | None: The key pressed (ENTER is '\n'), or None if no key was pressed in time.
+        """
+        self.flush_frame()
+
+        # Windows consoles report key presses through msvcrt.
+        if os.name == 'nt':
+            import msvcrt
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if msvcrt.kbhit():
+                    key = msvcrt.getwch()
+                    return '\n' if key == '\r' else key
+                time.sleep(0.02)
+            return None
+
+        # Piped input, take the first character of the next line.
+        if not sys.stdin.isatty():
+            ready, _, _ = select.select([sys.stdin], [], [], timeout)
+            if not ready:
+                return None
+            line = sys.stdin.readline()
+            if not line:
+                raise EOFError("end of input")
+            return line.strip()[:1] or '\n'
+
+        # Terminal, switch to cbreak mode just long enough to read a single key without echo.
+        import tty
+        import termios
+        fd = sys.stdin.fileno()
+        attributes = termios.tcgetattr(fd)
+        try:
+            tty.setcbreak(fd)
+            ready, _, _ = select.select([fd], [], [], timeout)
+            if not ready:
+                return None
+            key = os.read(fd, 1).decode(errors = 'ignore')
+            return '\n' if key == '\r' else key
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, attributes)
+
+
+    def progress_bar(self, fraction, width: int = 30) -> str:
+        """
+        Returns a text progress bar such as [#########.....................]. An unknown fraction
+        (None) is drawn as a block bouncing across the bar.
+
+        Parameters:
+            fraction (float | None): Share of the work done, between 0 and 1.
+            width (int): Number of characters between the brackets.
+
+        Returns:
+            str: The bar.
+        """
+        if fraction is None:
+            position = int(time.monotonic() * 10) % (2 * width - 6)
+            if position > width - 3: position = 2 * width - 6 - position
+            return "[" + "." * position + "###" + "." * (width - 3 - position) + "]"
+        filled = int(round(max(0.0, min(1.0, fraction)) * width))
+        return "[" + "#" * filled + "." * (width - filled) + "]"
+
+
+    @instrumentation.timed('Console.render_image', lambda text, self, image, *args, **kwargs: {'pixels': image.shape[0] * image.shape[1]})
+    def render_image(self, image, width: int = None, height: int = None) -> str:
+        """
+        Renders an image array as 24-bit ANSI colored '\u2580' half blocks, two pixel rows per text line.
+        The image is area-averaged down to fit the terminal and the text is built with array operations
+        into a single string (no per-pixel Python code).
+
+        Parameters:
+            image (np.ndarray): (H, W), (H, W, 3) or (H, W, 4) array as returned by load_image_to_array.
+                uint8 is used as is, other integer types are scaled from their range, floats from 0..1.
+            width (int): Maximum width in characters. Defaults to the terminal width.
+            height (int): Maximum height in lines. Defaults to the terminal height minus two lines.
+
+        Returns:
+            str: The preview, one line per two pixel rows (an odd last row is drawn over the terminal's
+                background), each line ending with a reset.
+        """
+        terminal_size = shutil.get_terminal_size()
+        if width is None: width = terminal_size.columns
+        if height is None: height = max(1, terminal_size.lines - 2)
+
+        # Normalize to uint8 RGB.
+        pixels = np.asarray(image)
+        if pixels.ndim == 2: pixels = pixels[:, :, None]
+        if pixels.dtype != np.uint8:
+            if np.issubdtype(pixels.dtype, np.floating): pixels = np.clip(pixels * 255, 0, 255).astype(np.uint8)
+            else: pixels = (pixels.astype(np.float64) * 255 / max(1, np.iinfo(pixels.dtype).max)).astype(np.uint8)
+        if pixels.shape[2] == 1: pixels = np.repeat(pixels, 3, axis = 2)
+        pixels = pixels[:, :, :3]
+
+        # Integer block size fitting the image in width columns and 2 * height pixel rows.
+        image_height, image_width = pixels.shape[:2]
+        block = max(1, -(-image_width // width), -(-image_height // (2 * height)))
+        columns = image_width // block
+        rows = image_height // block
+        if columns == 0 or rows == 0:
+            return ""
+
+        # Area average of each block x block tile (the remainder is cropped). Summing the block's rows first
+        # runs over long contiguous rows, which is many times faster than reducing both tile axes at once.
+        pixels = pixels[:rows * block, :columns * block]
+        if block > 1:
+            row_sums = np.add.reduce(pixels.reshape(rows, block, columns * block * 3), axis = 1, dtype = np.uint16 if block <= 257 else np.uint32)
+            tile_sums = row_sums.reshape(rows, columns, block, 3).sum(axis = 2, dtype = np.uint32)
+            pixels = (tile_sums // (block * block)).astype(np.uint8)
+
+        # Three ASCII digits per channel value, looked up for every pixel.
+        digits = np.frombuffer(b"".join(b"%03d" % value for value in range(256)), dtype = np.uint8).reshape(256, 3)
+        pairs = rows // 2
+        top = digits[pixels[0:pairs * 2:2]]       # (lines, columns, 3 channels, 3 digits)
+        bottom = digits[pixels[1:pairs * 2:2]]
+
+        # Stamp the digits into copies of the cell template.
+        cells = np.empty((pairs, columns, len(_IMAGE_CELL)), dtype = np.uint8)
+        cells[:] = np.frombuffer(_IMAGE_CELL, dtype = np.uint8)
+        for channel, offset in enumerate(_IMAGE_CELL_DIGITS[:3]):
+            cells[:, :, offset:offset + 3] = top[:, :, channel]
+        for channel, offset in enumerate(_IMAGE_CELL_DIGITS[3:]):
+            cells[:, :, offset:offset + 3] = bottom[:, :, channel]
+
+        # An odd last pixel row gets a line of its own, its bottom halves are left to the terminal's background.
+        if rows % 2:
+            last = np.empty((1, columns, len(_IMAGE_TOP_CELL)), dtype = np.uint8)
+            last[:] = np.frombuffer(_IMAGE_TOP_CELL, dtype = np.uint8)
+            for channel, offset in enumerate(_IMAGE_CELL_DIGITS[:3]):
+                last[0, :, offset:offset + 3] = digits[pixels[-1, :, channel]]
+        else:
+            last = np.empty((0, columns, len(_IMAGE_TOP_CELL)), dtype = np.uint8)
+
+        # Append the reset and newline to each line, then decode everything at once.
+        line_end = np.frombuffer((self.RESET + "\n").encode('ascii'), dtype = np.uint8)
+        text = b""
+        for line_cells in (cells, last):
+            if len(line_cells):
+                text += np.concatenate((line_cells.reshape(len(line_cells), -1), np.broadcast_to(line_end, (len(line_cells), len(line_end)))), axis = 1).tobytes()
+        return text.decode('utf-8')
+
+
+    def print_image(self, image, width: int = None, height: int = None) -> None:
+        """
+        Prints an image array to the terminal (see render_image).
+
+        Parameters:
+            image (np.ndarray): The image array.
+            width (int): Maximum width in characters. Defaults to the terminal width.
+            height (int): Maximum height in lines. Defaults to the terminal height minus two lines.
+        """
+        self.write(self.render_image(image, width, height))
+
+
+    def print_timing_report(self, report: dict = None) -> None:
+        """
+        Prints a table of the instrumented operations (see the instrumentation module): calls, median and
+        95th percentile duration, total time and the amounts processed, slowest total first.
+
+        Parameters:
+            report (dict): A snapshot to print (e.g. loaded from an exported JSON report's 'operations').
+                If None, prints the current instrumentation.snapshot().
+        """
+        if report is None: report = instrumentation.snapshot()
+
+        with self.frame():
+            self.fancy_print("<MENU_TITLE>---timing report---</MENU_TITLE>")
+            if not report:
+                state = "enabled" if instrumentation.is_enabled() else f"disabled (set {instrumentation.ENV_VAR}=1 or call instrumentation.enable())"
+                self.fancy_print("<WARNING>nothing recorded, instrumentation is {}</WARNING>", state)
+                return
+
+            # Size the name column to the longest operation, the numbers have fixed widths.
+            name_width = max(len("operation"), max(len(name) for name in report))
+            self.fancy_print("<MENU_KEY>{}</MENU_KEY>", f"{'operation':<{name_width}} {'calls':>9} {'p50 ms':>10} {'p95 ms':>10} {'total s':>10}  processed")
+            for name, stats in report.items():
+                processed = ", ".join(self._format_counter(counter, amount) for counter, amount in stats['counters'].items())
+                self.fancy_print("<MENU_ITEM>{}</MENU_ITEM> <DATA>{}</DATA>  <INFO>{}</INFO>", f"{name:<{name_width}}", f"{stats['calls']:>9,} {stats['p50_seconds'] * 1000:>10.3f} {stats['p95_seconds'] * 1000:>10.3f} {stats['total_seconds']:>10.3f}", processed)
+
+
+    @staticmethod
+    def _format_counter(counter: str, amount) -> str:
+        # Byte counts are shown in KB or MB, everything else as a plain count.
+        if counter == 'bytes':
+            return f"{amount / 1024 ** 2:,.1f} MB" if amount >= 1024 ** 2 else f"{amount / 1024:,.1f} KB"
+        return f"{amount:,} {counter}"
+
+
     def press_enter_pause(self):
         """
         Pauses the program until the user presses Enter.
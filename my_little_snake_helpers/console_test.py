@@ -0,0 +1,211 @@
+import io
+import os
+import re
+import unittest
+import contextlib
+from unittest import mock
+import numpy as np
+from my_little_snake_helpers.console import Console
+
+# One cell of a preview: the top pixel's color, the bottom pixel's color (or the default background), the half block.
+CELL_PATTERN = re.compile(r'\033\[38;2;(\d{3});(\d{3});(\d{3})m\033\[(?:48;2;(\d{3});(\d{3});(\d{3})|49)m▀')
+
+
+def decode(text: str) -> list[list[tuple]]:
+    # The (top, bottom) pixel colors of every cell, line by line. bottom is None over the default background.
+    lines = []
+    for line in text.splitlines():
+        cells = []
+        for match in CELL_PATTERN.finditer(line):
+            values = match.groups()
+            top = tuple(int(value) for value in values[:3])
+            bottom = tuple(int(value) for value in values[3:]) if values[3] is not None else None
+            cells.append((top, bottom))
+        lines.append(cells)
+    return lines
+
+
+class FakeTerminal(io.StringIO):
+    # Captures output like a terminal would receive it, optionally claiming to be a tty.
+
+    def __init__(self, tty: bool = False):
+        super().__init__()
+        self.tty = tty
+
+    def isatty(self):
+        return self.tty
+
+
+class ScreenControlTest(unittest.TestCase):
+
+    def setUp(self):
+        # Every test resolves the screen mode again, and the terminal is 80 x 24.
+        for patcher in (mock.patch.object(Console, '_screen_control_mode', None), mock.patch('shutil.get_terminal_size', return_value = os.terminal_size((80, 24)))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def console(self, tty: bool, differential_redraw: bool = True) -> Console:
+        console = Console(differential_redraw = differential_redraw)
+        console.stream = FakeTerminal(tty)
+        return console
+
+    def draw(self, console: Console, lines: list[str]) -> str:
+        # One full-screen frame, returns what it wrote.
+        start = console.stream.tell()
+        with console.frame():
+            console.clear()
+            console.write("\n".join(lines))
+        return console.stream.getvalue()[start:]
+
+    def test_differential_redraw_rewrites_changed_lines_only(self):
+        console = self.console(tty = True)
+        with mock.patch.dict(os.environ, {'TERM': 'xterm-256color'}):
+            first = self.draw(console, ["title", "item one", "item two", "prompt: "])
+            second = self.draw(console, ["title", "item ONE", "item two", "prompt: "])
+            third = self.draw(console, ["title", "item ONE", "item two", "prompt: "])
+
+        # The first frame repaints the whole screen.
+        self.assertTrue(first.startswith("\033[H\033[2J"))
+        self.assertIn("title", first)
+
+        # Later frames move to the changed rows only, the last (prompt) line is always rewritten.
+        self.assertNotIn("\033[2J", second)
+        self.assertEqual(re.findall(r'\033\[(\d+);1H', second), ['2', '4'])
+        self.assertIn("item ONE", second)
+        self.assertNotIn("title", second)
+        self.assertNotIn("item two", second)
+        self.assertEqual(re.findall(r'\033\[(\d+);1H', third), ['4'])
+
+    def test_output_outside_frames_forces_a_repaint(self):
+        console = self.console(tty = True)
+        with mock.patch.dict(os.environ, {'TERM': 'xterm'}):
+            self.draw(console, ["a", "b"])
+            console.write("message\n")
+            self.assertTrue(self.draw(console, ["a", "b"]).startswith("\033[H\033[2J"))
+
+    def test_non_tty_never_writes_escapes(self):
+        for tty, term in ((False, 'xterm'), (True, 'dumb'), (True, '')):
+            with self.subTest(tty = tty, term = term):
+                Console._screen_control_mode = None
+                console = self.console(tty = tty)
+                with mock.patch.dict(os.environ, {'TERM': term}):
+                    self.draw(console, ["title", "item"])
+                    self.draw(console, ["title", "item 2"])
+                    console.clear()
+                    console.home()
+                    console.erase_line()
+                    console.erase_below()
+                output = console.stream.getvalue()
+                self.assertEqual(Console._screen_control_mode, 'dumb')
+                self.assertNotIn("\033", output)
+
+                # A dumb clear scrolls the old contents away with a screen of newlines.
+                self.assertTrue(output.startswith("\n" * 24 + "title\nitem"))
+
+
+class MultiSelectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.console = Console()
+        self.items = ["<DATA>TransactionID</DATA>", "Date", "Product", "Quantity", "UnitPrice", "Price Note"]
+
+    def test_numbers_and_ranges(self):
+        self.assertEqual(self.console.parse_multi_selection("1-3", self.items), [1, 2, 3])
+        self.assertEqual(self.console.parse_multi_selection("5", self.items), [5])
+        self.assertEqual(self.console.parse_multi_selection("6-6", self.items), [6])
+
+    def test_mixed_lists_and_duplicates(self):
+        self.assertEqual(self.console.parse_multi_selection("5, 1-2 4", self.items), [1, 2, 4, 5])
+        self.assertEqual(self.console.parse_multi_selection("2,2,1-3,3", self.items), [1, 2, 3])
+        self.assertEqual(self.console.parse_multi_selection("1-2,quantity", self.items), [1, 2, 4])
+
+    def test_reversed_ranges(self):
+        self.assertEqual(self.console.parse_multi_selection("4-2", self.items), [2, 3, 4])
+
+    def test_patterns_match_untagged_labels(self):
+        self.assertEqual(self.console.parse_multi_selection("transactionid", self.items), [1])
+        self.assertEqual(self.console.parse_multi_selection("*price*", self.items), [5, 6])
+        self.assertEqual(self.console.parse_multi_selection("", self.items), [])
+
+    def test_out_of_range(self):
+        for selection in ("0", "7", "5-7", "0-2", "1, 99"):
+            with self.subTest(selection = selection):
+                with self.assertRaises(ValueError):
+                    self.console.parse_multi_selection(selection, self.items)
+
+    def test_non_numeric(self):
+        for selection in ("abc", "1-x", "-", "1-2-3", "data"):
+            with self.subTest(selection = selection):
+                with self.assertRaises(ValueError):
+                    self.console.parse_multi_selection(selection, self.items)
+
+    def test_menu_retries_until_valid(self):
+        answers = ["", "9", "x*", "3-1", "8"]
+        with mock.patch.object(Console, 'menu', side_effect = answers), mock.patch.object(Console, 'press_enter_pause'), \
+             contextlib.redirect_stdout(io.StringIO()) as output:
+            selected, nav = self.console.multi_select_menu_with_validation("columns", self.items, ["apply", "return"])
+            self.assertEqual((selected, nav), ([(1, self.items[0]), (2, "Date"), (3, "Product")], None))
+
+            # A single number past the items selects a navigation item.
+            self.assertEqual(self.console.multi_select_menu_with_validation("columns", self.items, ["apply", "return"]), ([], "return"))
+        text = output.getvalue()
+        self.assertIn("nothing was selected.", text)
+        self.assertIn("'9' is out of the menu range.", text)
+        self.assertIn("'x*' does not match any item.", text)
+
+
+class RenderImageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.console = Console()
+
+    def test_pixel_pairs(self):
+        image = np.array([[[255, 0, 0], [0, 255, 0]], [[0, 0, 255], [1, 2, 3]]], dtype = np.uint8)
+        self.assertEqual(decode(self.console.render_image(image, width = 10, height = 10)), [[((255, 0, 0), (0, 0, 255)), ((0, 255, 0), (1, 2, 3))]])
+
+    def test_one_pixel_tall_image(self):
+        image = np.array([[[10, 20, 30], [40, 50, 60], [70, 80, 90]]], dtype = np.uint8)
+        text = self.console.render_image(image, width = 10, height = 10)
+        self.assertTrue(text.endswith(Console.RESET + "\n"))
+        self.assertEqual(decode(text), [[((10, 20, 30), None), ((40, 50, 60), None), ((70, 80, 90), None)]])
+
+    def test_odd_height_keeps_the_last_row(self):
+        image = np.zeros((5, 2, 3), dtype = np.uint8)
+        image[4] = (200, 100, 50)
+        lines = decode(self.console.render_image(image, width = 10, height = 10))
+        self.assertEqual(len(lines), 3)
+        self.assertEqual([len(line) for line in lines], [2, 2, 2])
+        self.assertEqual(lines[2][0], ((200, 100, 50), None))
+        self.assertEqual(lines[1][0], ((0, 0, 0), (0, 0, 0)))
+
+    def test_fits_the_size(self):
+        image = np.random.default_rng(0).integers(0, 256, (101, 300, 3), dtype = np.uint8)
+        lines = decode(self.console.render_image(image, width = 80, height = 20))
+        self.assertLessEqual(len(lines), 20)
+        self.assertTrue(all(0 < len(line) <= 80 for line in lines))
+
+    def test_block_average(self):
+        image = np.zeros((4, 4, 3), dtype = np.uint8)
+        image[0, 0] = 100
+        image[3, 3] = 60
+        lines = decode(self.console.render_image(image, width = 2, height = 1))
+        self.assertEqual(lines, [[((25, 25, 25), (0, 0, 0)), ((0, 0, 0), (15, 15, 15))]])
+
+    def test_grayscale_and_other_types(self):
+        gray = np.array([[0, 65535], [32768, 0]], dtype = np.uint16)
+        self.assertEqual(decode(self.console.render_image(gray, width = 10, height = 10)), [[((0, 0, 0), (127, 127, 127)), ((255, 255, 255), (0, 0, 0))]])
+        floats = np.array([[[0.0, 0.5, 1.0, 1.0]]])
+        self.assertEqual(decode(self.console.render_image(floats, width = 10, height = 10)), [[((0, 127, 255), None)]])
+
+    def test_empty_image(self):
+        self.assertEqual(self.console.render_image(np.zeros((0, 5, 3), dtype = np.uint8), width = 10, height = 10), "")
+
+    def test_print_image(self):
+        image = np.full((1, 2, 3), 9, dtype = np.uint8)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.console.print_image(image, width = 10, height = 10)
+        self.assertEqual(decode(output.getvalue()), [[((9, 9, 9), None), ((9, 9, 9), None)]])
+
+
+if __name__ == '__main__':
+    unittest.main()
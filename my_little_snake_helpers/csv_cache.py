@@ -0,0 +1,213 @@
+import os
+import json
+import glob
+import hashlib
+import tempfile
+import threading
+from .lazy_import import lazy_import
+
+# Heavy dependencies are imported on first use so importing this module stays cheap.
+pd = lazy_import('pandas')
+
+class CsvCache():
+    """
+    On-disk cache of parsed CSV files stored in a columnar binary format (Feather or Parquet when
+    pyarrow is installed, pickle otherwise). Entries are keyed by the csv's path, modification time,
+    size and the read options, so they go stale as soon as the source changes. The cache directory is
+    kept under a size limit by evicting the least recently used entries.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = 2 * 1024 ** 3, file_format: str = None):
+        """
+        Parameters:
+            cache_dir (str): Where cache entries are stored. If None, uses $XDG_CACHE_HOME (or ~/.cache)/my_little_snake_helpers/csv.
+            max_bytes (int): Total size the cache directory is trimmed to after each store.
+            file_format (str): 'feather', 'parquet' or 'pickle'. If None, uses feather when pyarrow is available, else pickle.
+        """
+        if cache_dir is None:
+            cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+            cache_dir = os.path.join(cache_home, 'my_little_snake_helpers', 'csv')
+        if file_format is None:
+            file_format = 'feather' if self._pyarrow_available() else 'pickle'
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.file_format = file_format
+        self._lock = threading.Lock()
+
+    def get(self, filepath: str, read_options: dict = None):
+        """
+        Returns the cached DataFrame for a csv file read with the given options.
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+            read_options (dict): The options the file is read with (usecols, dtype, ...).
+
+        Returns:
+            pd.DataFrame | None: The cached DataFrame, or None on a miss.
+        """
+        stem = self._entry_stem(filepath, read_options)
+        if stem is None:
+            return None
+
+        for entry_path in glob.glob(stem + '.*'):
+            try:
+                df = self._read(entry_path)
+            except Exception:
+                # A corrupt or unreadable entry is just a miss, remove it.
+                self._remove(entry_path)
+                continue
+
+            # Touch the entry, eviction uses the modification time as the last use.
+            try:
+                os.utime(entry_path)
+            except OSError:
+                pass
+            return df
+        return None
+
+    def put(self, filepath: str, read_options: dict, df) -> None:
+        """
+        Stores a DataFrame as the cache entry for a csv file and its read options, removing the stale
+        entries of older versions of the file and evicting least recently used entries over the size limit.
+        Failing to write the cache is never an error, the entry is just not stored.
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+            read_options (dict): The options the file was read with.
+            df (pd.DataFrame): The parsed DataFrame.
+        """
+        stem = self._entry_stem(filepath, read_options)
+        if stem is None:
+            return
+
+        with self._lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok = True)
+
+                # Entries for an older version of this file can never hit again.
+                path_hash, state_hash, _ = os.path.basename(stem).split('-')
+                for entry_path in glob.glob(os.path.join(self.cache_dir, path_hash + '-*')):
+                    if not os.path.basename(entry_path).startswith(f"{path_hash}-{state_hash}-"):
+                        self._remove(entry_path)
+
+                self._write(stem, df)
+                self.evict()
+            except OSError:
+                pass
+
+    def evict(self) -> None:
+        """
+        Deletes least recently used entries until the cache directory fits in max_bytes.
+        """
+        entries = []
+        for entry_path in glob.glob(os.path.join(self.cache_dir, '*')):
+            try:
+                stat = os.stat(entry_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(entry_path)
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Deletes every cache entry.
+        """
+        for entry_path in glob.glob(os.path.join(self.cache_dir, '*')):
+            self._remove(entry_path)
+
+    def _entry_stem(self, filepath: str, read_options: dict):
+        # Entry names are <hash of path>-<hash of mtime and size>-<hash of read options>, without extension.
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        path_hash = self._hash(os.path.abspath(filepath))
+        state_hash = self._hash(f"{stat.st_mtime_ns}:{stat.st_size}")
+        options_hash = self._hash(json.dumps(read_options or {}, sort_keys = True, default = str))
+        return os.path.join(self.cache_dir, f"{path_hash}-{state_hash}-{options_hash}")
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+    def _write(self, stem: str, df) -> None:
+        # Write to a temporary file and rename, so readers never see a partial entry. Frames the
+        # columnar formats can't store (e.g. mixed-type object columns) fall back to pickle.
+        fd, temp_path = tempfile.mkstemp(dir = self.cache_dir, suffix = '.tmp')
+        os.close(fd)
+        try:
+            try:
+                extension = self._write_frame(df, temp_path, self.file_format)
+            except (ImportError, ValueError, TypeError) + self._arrow_errors():
+                extension = self._write_frame(df, temp_path, 'pickle')
+            os.replace(temp_path, f"{stem}.{extension}")
+        finally:
+            self._remove(temp_path)
+
+    @staticmethod
+    def _write_frame(df, path: str, file_format: str) -> str:
+        if file_format == 'feather':
+            df.reset_index(drop = True).to_feather(path)
+        elif file_format == 'parquet':
+            df.to_parquet(path)
+        else:
+            df.to_pickle(path)
+        return file_format
+
+    @staticmethod
+    def _read(entry_path: str):
+        extension = os.path.splitext(entry_path)[1]
+        if extension == '.feather':
+            return pd.read_feather(entry_path)
+        if extension == '.parquet':
+            return pd.read_parquet(entry_path)
+        if extension == '.pickle':
+            return pd.read_pickle(entry_path)
+        raise ValueError(f"unknown cache entry: {entry_path}")
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _pyarrow_available() -> bool:
+        try:
+            import pyarrow
+            return True
+        except ImportError:
+            return False
+
+    @staticmethod
+    def _arrow_errors() -> tuple:
+        # pyarrow's conversion errors, when pyarrow is installed.
+        try:
+            import pyarrow
+            return (pyarrow.ArrowException,)
+        except ImportError:
+            return ()
+
+
+# Cache shared by every FileDataProcessor load called with cache = True.
+_shared_cache = None
+
+def get_csv_cache() -> CsvCache:
+    """
+    Returns the process-wide CsvCache, creating it on first use.
+
+    Returns:
+        CsvCache: The shared cache.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = CsvCache()
+    return _shared_cache
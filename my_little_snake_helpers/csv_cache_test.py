@@ -0,0 +1,121 @@
+import os
+import glob
+import tempfile
+import unittest
+import importlib.util
+import pandas as pd
+from my_little_snake_helpers.csv_cache import CsvCache
+from my_little_snake_helpers.file_data_processor import FileDataProcessor
+
+HAVE_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+class CsvCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache_dir = os.path.join(self.directory.name, 'cache')
+        self.csv_path = self.write_csv("id,name\n1,a\n2,b\n")
+        self.df = pd.read_csv(self.csv_path)
+
+    def write_csv(self, text: str, name: str = 'data.csv') -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as file:
+            file.write(text)
+        return path
+
+    def entries(self) -> list[str]:
+        return sorted(glob.glob(os.path.join(self.cache_dir, '*')))
+
+    def test_round_trip(self):
+        formats = ['pickle'] + (['feather', 'parquet'] if HAVE_PYARROW else [])
+        for file_format in formats:
+            with self.subTest(file_format = file_format):
+                cache = CsvCache(os.path.join(self.cache_dir, file_format), file_format = file_format)
+                self.assertIsNone(cache.get(self.csv_path, {'usecols': None}))
+                cache.put(self.csv_path, {'usecols': None}, self.df)
+                pd.testing.assert_frame_equal(cache.get(self.csv_path, {'usecols': None}), self.df)
+
+    def test_read_options_are_part_of_the_key(self):
+        cache = CsvCache(self.cache_dir, file_format = 'pickle')
+        cache.put(self.csv_path, {'usecols': ['id']}, self.df[['id']])
+        self.assertIsNone(cache.get(self.csv_path, {'usecols': None}))
+        self.assertEqual(list(cache.get(self.csv_path, {'usecols': ['id']}).columns), ['id'])
+
+    def test_changed_file_is_a_miss(self):
+        cache = CsvCache(self.cache_dir, file_format = 'pickle')
+        cache.put(self.csv_path, None, self.df)
+        stat = os.stat(self.csv_path)
+
+        # Same size, newer modification time.
+        os.utime(self.csv_path, ns = (stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertIsNone(cache.get(self.csv_path, None))
+
+        # Storing the new version removes the stale entry.
+        cache.put(self.csv_path, None, self.df)
+        self.assertEqual(len(self.entries()), 1)
+        self.assertIsNotNone(cache.get(self.csv_path, None))
+
+    def test_missing_file(self):
+        cache = CsvCache(self.cache_dir, file_format = 'pickle')
+        missing = os.path.join(self.directory.name, 'missing.csv')
+        cache.put(missing, None, self.df)
+        self.assertIsNone(cache.get(missing, None))
+        self.assertEqual(self.entries(), [])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = CsvCache(self.cache_dir, file_format = 'pickle')
+        paths = [self.write_csv("id,name\n1,a\n2,b\n", f"{name}.csv") for name in ('first', 'second', 'third')]
+        for age, path in enumerate(paths):
+            cache.put(path, None, self.df)
+
+            # Give each entry a distinct last-use time, oldest first.
+            entry = cache._entry_stem(path, None) + '.pickle'
+            os.utime(entry, (1_000_000 + age, 1_000_000 + age))
+
+        # Reading the first file makes it the most recently used, so the second one goes first.
+        cache.get(paths[0], None)
+        cache.max_bytes = os.path.getsize(self.entries()[0]) * 2
+        cache.evict()
+        self.assertEqual(len(self.entries()), 2)
+        self.assertIsNotNone(cache.get(paths[0], None))
+        self.assertIsNone(cache.get(paths[1], None))
+        self.assertIsNotNone(cache.get(paths[2], None))
+
+    def test_corrupt_entry_is_removed(self):
+        cache = CsvCache(self.cache_dir, file_format = 'pickle')
+        cache.put(self.csv_path, None, self.df)
+        with open(self.entries()[0], 'wb') as file:
+            file.write(b"not a pickle")
+        self.assertIsNone(cache.get(self.csv_path, None))
+        self.assertEqual(self.entries(), [])
+
+    @unittest.skipUnless(HAVE_PYARROW, "needs pyarrow")
+    def test_mixed_types_fall_back_to_pickle(self):
+        cache = CsvCache(self.cache_dir, file_format = 'feather')
+        mixed = pd.DataFrame({'value': pd.Series([1, "a", 2.5], dtype = object)})
+        cache.put(self.csv_path, None, mixed)
+        self.assertTrue(self.entries()[0].endswith('.pickle'))
+        self.assertEqual(cache.get(self.csv_path, None)['value'].tolist(), [1, "a", 2.5])
+
+    def test_clear(self):
+        cache = CsvCache(self.cache_dir, file_format = 'pickle')
+        cache.put(self.csv_path, None, self.df)
+        cache.clear()
+        self.assertEqual(self.entries(), [])
+
+    def test_load_csv_to_dataframe_uses_the_cache(self):
+        cache = CsvCache(self.cache_dir, file_format = 'pickle')
+        processor = FileDataProcessor()
+        first = processor.load_csv_to_dataframe(self.csv_path, cache = cache)
+        self.assertEqual(len(self.entries()), 1)
+
+        # A planted entry shows the second load is served from the cache, not parsed.
+        planted = first.assign(name = ["cached", "cached"])
+        cache.put(self.csv_path, {'usecols': None, 'dtype': None, 'schema': None}, planted)
+        pd.testing.assert_frame_equal(processor.load_csv_to_dataframe(self.csv_path, cache = cache), planted)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+from __future__ import annotations
+import io
+import os
+import zipfile
+import tempfile
+from .lazy_import import lazy_import
+
+# Heavy dependencies are imported on first use so importing this module stays cheap.
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+class CsvRowIndex():
+    """
+    Byte-offset index over the rows of a CSV file. Built in one pass (and optionally persisted next to
+    the file), it lets any range of rows be read with a seek and a small parse instead of loading the file.
+
+    Attributes:
+        filepath (str): The path to the indexed CSV file.
+        offsets (np.ndarray): int64 byte offsets, offsets[i] is the start of data row i and offsets[-1] is the end of the file.
+        columns (list[str]): Column names parsed from the header line.
+        encoding (str): Text encoding of the file.
+    """
+
+    INDEX_SUFFIX = ".rowidx.npz"
+
+    def __init__(self, filepath: str, offsets: np.ndarray, encoding: str = "utf-8"):
+        """
+        Use CsvRowIndex.build() or CsvRowIndex.open() rather than calling this directly.
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+            offsets (np.ndarray): Row start offsets followed by the end offset of the last row.
+            encoding (str): Text encoding of the file.
+        """
+        self.filepath = filepath
+        self.offsets = offsets
+        self.encoding = encoding
+
+        # Parse the header line (everything before the first data row) for the column names.
+        try:
+            with open(filepath, 'rb') as file:
+                header = file.read(int(offsets[0]))
+            self.columns = list(pd.read_csv(io.BytesIO(header), nrows = 0, encoding = encoding).columns)
+        except Exception as e:
+            raise RuntimeError(f"An error occurred while reading the csv header: {e}")
+        self._header = header
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @classmethod
+    def build(cls, filepath: str, encoding: str = "utf-8", block_size: int = 8 * 1024 ** 2) -> "CsvRowIndex":
+        """
+        Scans the file once and records the byte offset at which each row starts. Newlines inside
+        quoted fields are not treated as row boundaries, and blank lines are not rows (like pd.read_csv).
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+            encoding (str): Text encoding of the file (must be ASCII compatible).
+            block_size (int): Number of bytes scanned per block.
+
+        Returns:
+            CsvRowIndex: The new index.
+
+        Raises:
+            RuntimeError: If there is an error reading the CSV file.
+        """
+        try:
+            boundaries = []
+            carriage_returns = []
+            position = 0
+            quote_parity = 0
+            last_byte = 0
+            with open(filepath, 'rb') as file:
+                while True:
+                    block = file.read(block_size)
+                    if not block:
+                        break
+                    data = np.frombuffer(block, dtype = np.uint8)
+                    newlines = np.flatnonzero(data == 10)
+
+                    # Only newlines outside quotes end a row, a running uint8 count of quotes keeps the parity.
+                    if quote_parity or block.find(b'"') != -1:
+                        inside = (np.cumsum(data == 34, dtype = np.uint8) + quote_parity) & 1
+                        newlines = newlines[inside[newlines] == 0]
+                        quote_parity = int(inside[-1])
+
+                    # Whether each newline follows a '\r', the byte before the block's first one is the previous block's last.
+                    before = np.where(newlines > 0, data[np.maximum(newlines - 1, 0)], last_byte) if len(newlines) else newlines
+                    carriage_returns.append(before == 13)
+                    last_byte = data[-1]
+
+                    boundaries.append(newlines.astype(np.int64) + position + 1)
+                    position += len(block)
+        except Exception as e:
+            raise RuntimeError(f"An error occurred while indexing the csv: {e}")
+
+        offsets = np.concatenate(boundaries) if boundaries else np.empty(0, dtype = np.int64)
+
+        # A line that is only '\n' or '\r\n' isn't a row, its bytes are left to the row before it.
+        if len(offsets) > 1:
+            lengths = np.diff(offsets)
+            after_cr = np.concatenate(carriage_returns)[1:]
+            blank = (lengths == 1) | ((lengths == 2) & after_cr)
+            offsets = np.concatenate((offsets[:-1][~blank], offsets[-1:]))
+
+        # A last row without a trailing newline still ends at the end of the file.
+        if len(offsets) == 0 or offsets[-1] != position:
+            offsets = np.append(offsets, np.int64(position))
+
+        return cls(filepath, offsets, encoding)
+
+    @classmethod
+    def open(cls, filepath: str, encoding: str = "utf-8", persist: bool = True) -> "CsvRowIndex":
+        """
+        Loads the persisted index next to the file if it is still valid, otherwise builds it (and saves it if persist is True).
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+            encoding (str): Text encoding of the file.
+            persist (bool): Save a newly built index next to the file for later sessions.
+
+        Returns:
+            CsvRowIndex: The index.
+
+        Raises:
+            RuntimeError: If there is an error reading the CSV file.
+        """
+        index_path = filepath + cls.INDEX_SUFFIX
+        try:
+            stat = os.stat(filepath)
+        except OSError as e:
+            raise RuntimeError(f"An error occurred while indexing the csv: {e}")
+
+        # Reuse the saved index only if the csv hasn't changed since it was built. A missing, truncated or
+        # corrupt index file is rebuilt.
+        try:
+            with np.load(index_path) as saved:
+                if int(saved['size']) == stat.st_size and int(saved['mtime_ns']) == stat.st_mtime_ns:
+                    return cls(filepath, saved['offsets'], encoding)
+        except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+            pass
+
+        index = cls.build(filepath, encoding)
+        if persist:
+            index.save(index_path, stat)
+        return index
+
+    def save(self, index_path: str = None, stat: os.stat_result = None) -> None:
+        """
+        Saves the offsets next to the CSV file, tagged with its size and modification time.
+        Failing to write (e.g. a read-only directory) is not an error, the index just isn't persisted.
+
+        Parameters:
+            index_path (str): Where to save the index. Defaults to the csv path plus INDEX_SUFFIX.
+            stat (os.stat_result): Stat of the csv when the index was built. Defaults to the current stat.
+        """
+        if index_path is None: index_path = self.filepath + self.INDEX_SUFFIX
+        temp_path = None
+        try:
+            if stat is None: stat = os.stat(self.filepath)
+
+            # Write to a temporary file and rename, so a reader never sees a partially written index.
+            fd, temp_path = tempfile.mkstemp(dir = os.path.dirname(os.path.abspath(index_path)), suffix = '.tmp')
+            with os.fdopen(fd, 'wb') as file:
+                np.savez(file, offsets = self.offsets, size = stat.st_size, mtime_ns = stat.st_mtime_ns)
+            os.replace(temp_path, index_path)
+        except OSError:
+            if temp_path is not None and os.path.exists(temp_path): os.remove(temp_path)
+
+    def read_rows(self, start: int, stop: int) -> pd.DataFrame:
+        """
+        Reads rows [start, stop) straight from the file.
+
+        Parameters:
+            start (int): First row to read (0-based, header excluded).
+            stop (int): Row to stop before.
+
+        Returns:
+            pd.DataFrame: The rows, indexed by their row numbers.
+
+        Raises:
+            RuntimeError: If there is an error reading the CSV file.
+        """
+        start = max(0, min(start, len(self)))
+        stop = max(start, min(stop, len(self)))
+
+        try:
+            # Seek to the first row and read just the bytes of the requested rows.
+            with open(self.filepath, 'rb') as file:
+                file.seek(int(self.offsets[start]))
+                data = file.read(int(self.offsets[stop] - self.offsets[start]))
+
+            # Parse them with the header prepended so pandas infers the same columns.
+            df = pd.read_csv(io.BytesIO(self._header + data), encoding = self.encoding)
+        except Exception as e:
+            raise RuntimeError(f"An error occurred while reading the csv: {e}")
+
+        df.index = pd.RangeIndex(start, start + len(df))
+        return df
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from my_little_snake_helpers.csv_row_index import CsvRowIndex
+
+# Files the index must agree with pd.read_csv on.
+CSV_FILES = {
+    'plain': "id,name,price\n1,apple,0.5\n2,pear,0.75\n3,plum,1.25\n",
+    'no trailing newline': "id,name,price\n1,apple,0.5\n2,pear,0.75",
+    'trailing blank lines': "id,name,price\n1,apple,0.5\n2,pear,0.75\n\n\n",
+    'trailing blank crlf lines': "id,name,price\r\n1,apple,0.5\r\n2,pear,0.75\r\n\r\n\r\n",
+    'blank lines between rows': "id,name,price\n\n1,apple,0.5\n\n\n2,pear,0.75\n",
+    'quoted newlines': 'id,name,price\n1,"red\napple",0.5\n2,"pear\n\n",0.75\n3,"a ""quoted"" plum",1\n',
+    'header only': "id,name,price\n",
+}
+
+
+class CsvRowIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, text: str, name: str = 'data.csv') -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding = 'utf-8', newline = '') as file:
+            file.write(text)
+        return path
+
+    def test_matches_read_csv(self):
+        # Small blocks so rows, quotes and '\r\n' pairs are split between blocks too.
+        for name, text in CSV_FILES.items():
+            path = self.write(text)
+            expected = pd.read_csv(path)
+            for block_size in (1, 2, 3, 5, 8 * 1024 ** 2):
+                with self.subTest(file = name, block_size = block_size):
+                    index = CsvRowIndex.build(path, block_size = block_size)
+                    self.assertEqual(len(index), len(expected))
+                    self.assertEqual(index.columns, list(expected.columns))
+                    pd.testing.assert_frame_equal(index.read_rows(0, len(index)), expected)
+
+    def test_trailing_blank_lines_are_not_rows(self):
+        index = CsvRowIndex.build(self.write(CSV_FILES['trailing blank lines']))
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.read_rows(1, 2)['name'].tolist(), ["pear"])
+        self.assertEqual(len(index.read_rows(2, 3)), 0)
+
+    def test_read_rows_ranges(self):
+        rows = 250
+        path = self.write("n,square\n" + "".join(f"{n},{n * n}\n" for n in range(rows)))
+        index = CsvRowIndex.build(path, block_size = 64)
+        expected = pd.read_csv(path)
+        for start, stop in ((0, 10), (95, 130), (240, 300), (-5, 3)):
+            with self.subTest(start = start, stop = stop):
+                pd.testing.assert_frame_equal(index.read_rows(start, stop), expected.iloc[max(start, 0):stop])
+
+        # An empty range has the columns and no rows.
+        empty = index.read_rows(10, 5)
+        self.assertEqual((len(empty), list(empty.columns)), (0, ['n', 'square']))
+
+    def test_open_reuses_saved_index_until_the_file_changes(self):
+        path = self.write(CSV_FILES['plain'])
+        index = CsvRowIndex.open(path)
+        self.assertTrue(os.path.exists(path + CsvRowIndex.INDEX_SUFFIX))
+        self.assertEqual(len(index), 3)
+
+        # A stale offsets file is still used while the size and mtime match...
+        saved_stat = os.stat(path)
+        CsvRowIndex(path, index.offsets[:2]).save(stat = saved_stat)
+        self.assertEqual(len(CsvRowIndex.open(path)), 1)
+
+        # ...and rebuilt once the csv changes.
+        self.write(CSV_FILES['plain'] + "4,fig,2\n")
+        os.utime(path, ns = (saved_stat.st_atime_ns, saved_stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(len(CsvRowIndex.open(path)), 4)
+
+    def test_open_without_persist(self):
+        path = self.write(CSV_FILES['plain'])
+        self.assertEqual(len(CsvRowIndex.open(path, persist = False)), 3)
+        self.assertFalse(os.path.exists(path + CsvRowIndex.INDEX_SUFFIX))
+
+    def test_corrupt_index_is_rebuilt(self):
+        path = self.write(CSV_FILES['plain'])
+        CsvRowIndex.open(path)
+        index_path = path + CsvRowIndex.INDEX_SUFFIX
+        with open(index_path, 'rb') as file:
+            saved = file.read()
+
+        for name, data in (('truncated', saved[:len(saved) // 2]), ('empty', b""), ('garbage', b"not an index")):
+            with self.subTest(index = name):
+                with open(index_path, 'wb') as file:
+                    file.write(data)
+                self.assertEqual(len(CsvRowIndex.open(path)), 3)
+                with open(index_path, 'rb') as file:
+                    self.assertEqual(file.read(), saved)
+
+    def test_save_replaces_the_index_atomically(self):
+        path = self.write(CSV_FILES['plain'])
+        index = CsvRowIndex.build(path)
+        index.save()
+        index.save()
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ['data.csv', 'data.csv' + CsvRowIndex.INDEX_SUFFIX])
+
+        # A directory that can't be written to only means the index isn't persisted.
+        CsvRowIndex(path, index.offsets).save(os.path.join(self.directory.name, 'missing', 'data.idx'))
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(RuntimeError):
+            CsvRowIndex.build(os.path.join(self.directory.name, 'missing.csv'))
+        with self.assertRaises(RuntimeError):
+            CsvRowIndex.open(os.path.join(self.directory.name, 'missing.csv'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,324 @@
+import sys
+from .tag_template import TAG_PATTERN
+from .lazy_import import lazy_import
+
+# curses is imported on first use (on Windows it needs the windows-curses package).
+curses = lazy_import('curses')
+
+# Color pair numbers, one per role.
+_PAIR_WINDOW = 1
+_PAIR_TITLE = 2
+_PAIR_KEY = 3
+_PAIR_SELECTED = 4
+_PAIR_ERROR = 5
+_PAIR_PROMPT = 6
+
+# Keys that are read as enter and backspace by get_wch, depending on the terminal.
+_ENTER_KEYS = ('\n', '\r')
+_BACKSPACE_KEYS = ('\b', '\x7f')
+
+class CursesMenu():
+    """
+    Full-screen menu drawn with curses, a drop-in alternative to Console.integer_only_menu_with_validation.
+    Items are selected with the arrow keys (or PAGE UP / PAGE DOWN / HOME / END) and ENTER, or by typing
+    their number. The menu sleeps in a blocking getch() and only redraws after a key press or a resize,
+    and then only writes the screen lines that changed: every line is built as a list of (text, attribute)
+    segments and compared with what was last drawn there, and the changed lines are pushed to the terminal
+    with one noutrefresh() / doupdate(). Lists longer than the screen scroll with the selection.
+
+    Without a terminal (piped input) or without curses, the same call falls back to the Console menu.
+    """
+
+    def __init__(self, width: int = 60, use_color: bool = True):
+        """
+        Parameters:
+            width (int): Preferred width of the menu box, it shrinks to fit smaller terminals.
+            use_color (bool): Draw with colors when the terminal supports them.
+        """
+        self.width = width
+        self.use_color = use_color
+
+        # Lines currently on the screen (row -> segments), None whenever the screen contents are unknown.
+        self._drawn_lines = None
+        self._attrs = {}
+
+    def integer_only_menu_with_validation(self, title: str, item_list: list[str], input_message: str = 'enter selection: ', prepend_str: str = None, append_str: str = None) -> tuple[int, str]:
+        """
+        Shows the menu full-screen until an item is selected.
+
+        Parameters:
+            title (str): Title to be displayed on the menu.
+            item_list (list[str]): Items to display in the menu (tags are stripped).
+            input_message (str): Prompt message for typed selections.
+            prepend_str (str): Optional text shown above the items.
+            append_str (str): Optional text shown below the items.
+
+        Returns:
+            tuple[int, str]: The selected 1-based item number and the item.
+        """
+
+        # Check that item_list is a list of strings.
+        if not (isinstance(item_list, list) and all(isinstance(item, str) for item in item_list)): raise ValueError('item_list is not a list of strings.')
+        if not item_list: raise ValueError('item_list is empty.')
+
+        # No terminal to draw on, use the line based menu instead.
+        if not self._terminal_available():
+            from .console import Console
+            return Console().integer_only_menu_with_validation(title, item_list, input_message, prepend_str, append_str)
+
+        # Strip the console tags once, curses draws plain text.
+        menu = {
+            'title': self._plain(title),
+            'items': [self._plain(item) for item in item_list],
+            'input_message': self._plain(input_message),
+            'prepend_lines': self._plain(prepend_str).splitlines() if prepend_str else [],
+            'append_lines': self._plain(append_str).splitlines() if append_str else [],
+        }
+
+        value = curses.wrapper(self._menu_wrapped, menu)
+        return value, item_list[value - 1]
+
+    @staticmethod
+    def _terminal_available() -> bool:
+        if not (sys.stdin.isatty() and sys.stdout.isatty()):
+            return False
+        try:
+            curses.initscr
+            return True
+        except ImportError:
+            return False
+
+    @staticmethod
+    def _plain(text: str) -> str:
+        return TAG_PATTERN.sub("", text or "").replace('\t', '    ')
+
+    def _menu_wrapped(self, stdscr, menu: dict) -> int:
+
+        # Set up the curses environment.
+        self._menu_setup(stdscr)
+
+        # The selection state: highlighted item, first visible item, typed number and error message.
+        state = {'cursor': 0, 'top': 0, 'typed': "", 'message': None}
+        item_count = len(menu['items'])
+
+        while True:
+            self._draw(stdscr, menu, state)
+
+            # Sleep until a key arrives, nothing is redrawn while the menu is idle.
+            try:
+                key = stdscr.get_wch()
+            except curses.error:
+                continue
+            state['message'] = None
+
+            # Resizing clears the screen, so everything is drawn again.
+            if key == curses.KEY_RESIZE:
+                curses.update_lines_cols()
+                self._drawn_lines = None
+
+            # Moving the highlight.
+            elif key in (curses.KEY_UP, 'k'):
+                state['cursor'] = max(0, state['cursor'] - 1)
+                state['typed'] = ""
+            elif key in (curses.KEY_DOWN, 'j'):
+                state['cursor'] = min(item_count - 1, state['cursor'] + 1)
+                state['typed'] = ""
+            elif key == curses.KEY_PPAGE:
+                state['cursor'] = max(0, state['cursor'] - self._visible_items(stdscr, menu))
+                state['typed'] = ""
+            elif key == curses.KEY_NPAGE:
+                state['cursor'] = min(item_count - 1, state['cursor'] + self._visible_items(stdscr, menu))
+                state['typed'] = ""
+            elif key == curses.KEY_HOME:
+                state['cursor'] = 0
+                state['typed'] = ""
+            elif key == curses.KEY_END:
+                state['cursor'] = item_count - 1
+                state['typed'] = ""
+
+            # Typing a number, the highlight follows it while it's in range.
+            elif isinstance(key, str) and key.isdigit():
+                state['typed'] += key
+                if 0 < int(state['typed']) <= item_count:
+                    state['cursor'] = int(state['typed']) - 1
+            elif key in _BACKSPACE_KEYS or key == curses.KEY_BACKSPACE:
+                state['typed'] = state['typed'][:-1]
+            elif key == '\x1b':
+                state['typed'] = ""
+
+            # Selecting, a typed number is validated like the console menu does.
+            elif key in _ENTER_KEYS or key == curses.KEY_ENTER:
+                if not state['typed']:
+                    return state['cursor'] + 1
+                if 0 < int(state['typed']) <= item_count:
+                    return int(state['typed'])
+                state['message'] = "your input is out of the menu range."
+                state['typed'] = ""
+
+            elif isinstance(key, str) and key.isprintable():
+                state['message'] = "your input is non-numeric."
+
+    def _menu_setup(self, stdscr) -> None:
+        self._drawn_lines = None
+
+        # Hide the cursor where the terminal allows it and read special keys as single codes.
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        stdscr.keypad(True)
+
+        # ESC is only used to clear the typed number, don't wait a second to tell it apart from a sequence.
+        curses.set_escdelay(25)
+
+        # Colors on the terminal's own background, plain attributes when there are none.
+        self._attrs = {
+            'window': curses.A_NORMAL,
+            'title': curses.A_BOLD,
+            'key': curses.A_NORMAL,
+            'selected': curses.A_REVERSE,
+            'error': curses.A_BOLD,
+            'prompt': curses.A_NORMAL,
+        }
+        if self.use_color and curses.has_colors():
+            curses.start_color()
+            try:
+                curses.use_default_colors()
+                background = -1
+            except curses.error:
+                background = curses.COLOR_BLACK
+            curses.init_pair(_PAIR_WINDOW, -1 if background == -1 else curses.COLOR_WHITE, background)
+            curses.init_pair(_PAIR_TITLE, curses.COLOR_MAGENTA, background)
+            curses.init_pair(_PAIR_KEY, curses.COLOR_GREEN, background)
+            curses.init_pair(_PAIR_SELECTED, curses.COLOR_BLACK, curses.COLOR_YELLOW)
+            curses.init_pair(_PAIR_ERROR, curses.COLOR_RED, background)
+            curses.init_pair(_PAIR_PROMPT, curses.COLOR_CYAN, background)
+            self._attrs.update({
+                'window': curses.color_pair(_PAIR_WINDOW),
+                'title': curses.color_pair(_PAIR_TITLE) | curses.A_BOLD,
+                'key': curses.color_pair(_PAIR_KEY),
+                'selected': curses.color_pair(_PAIR_SELECTED),
+                'error': curses.color_pair(_PAIR_ERROR) | curses.A_BOLD,
+                'prompt': curses.color_pair(_PAIR_PROMPT),
+            })
+
+    def _layout(self, stdscr, menu: dict) -> dict:
+        # Size and position of the box, and how many item rows fit in it.
+        screen_height, screen_width = stdscr.getmaxyx()
+        longest = max(len(line) for line in [menu['title'] + "  "] + [f"[{len(menu['items']):02}] - {item}" for item in menu['items']] + menu['prepend_lines'] + menu['append_lines'])
+        width = max(min(max(self.width, longest + 4), screen_width), 1)
+
+        # Border, prepend lines, gap, items, append lines, gap, prompt, message, border.
+        fixed_rows = 2 + len(menu['prepend_lines']) + 1 + len(menu['append_lines']) + 3
+        visible = max(0, min(len(menu['items']), screen_height - fixed_rows))
+        height = min(fixed_rows + visible, screen_height)
+        return {
+            'screen_height': screen_height,
+            'screen_width': screen_width,
+            'top': max(0, (screen_height - height) // 2),
+            'left': max(0, (screen_width - width) // 2),
+            'width': width,
+            'height': height,
+            'visible': visible,
+        }
+
+    def _visible_items(self, stdscr, menu: dict) -> int:
+        return max(1, self._layout(stdscr, menu)['visible'])
+
+    def _build_lines(self, layout: dict, menu: dict, state: dict) -> dict:
+        # The screen as row -> segments, rows that aren't listed are blank.
+        attrs = self._attrs
+        inner = layout['width'] - 4
+        lines = {}
+
+        def box_row(row, segments):
+            # A row inside the box: border, padded content clipped to the box, border.
+            used = 0
+            clipped = []
+            for text, attr in segments:
+                text = text[:max(0, inner - used)]
+                used += len(text)
+                clipped.append((text, attr))
+            lines[layout['top'] + row] = (("║ ", attrs['window']),) + tuple(clipped) + ((" " * (inner - used) + " ║", attrs['window']),)
+
+        # Too small to show a single item, say so instead of drawing a broken box.
+        if layout['visible'] < 1 or inner < 8:
+            lines[0] = (("terminal too small for this menu"[:layout['screen_width'] - 1], attrs['error']),)
+            return lines
+
+        # Keep the highlighted item inside the visible window.
+        item_count = len(menu['items'])
+        if state['cursor'] < state['top']:
+            state['top'] = state['cursor']
+        elif state['cursor'] >= state['top'] + layout['visible']:
+            state['top'] = state['cursor'] - layout['visible'] + 1
+        state['top'] = max(0, min(state['top'], item_count - layout['visible']))
+
+        # Top border with the title centered in it.
+        title = f" {menu['title']} "[:layout['width'] - 4] if menu['title'] else ""
+        border = layout['width'] - 2 - len(title)
+        lines[layout['top']] = (("╔" + "═" * (border // 2), attrs['window']), (title, attrs['title']), ("═" * (border - border // 2) + "╗", attrs['window']))
+
+        row = 1
+        for line in menu['prepend_lines']:
+            box_row(row, [(line, attrs['window'])])
+            row += 1
+        box_row(row, [])
+        row += 1
+
+        # The visible window of items, with arrows on the first and last rows when more are hidden.
+        first = state['top']
+        last = first + layout['visible']
+        for index in range(first, last):
+            more = ""
+            if index == first and first > 0: more = f"  ↑ {first} more"
+            if index == last - 1 and last < item_count: more = f"  ↓ {item_count - last} more"
+            item_attr = attrs['selected'] if index == state['cursor'] else attrs['window']
+            box_row(row, [(f"[{index + 1:02}]", attrs['key']), (" - ", attrs['window']), (menu['items'][index], item_attr), (more, attrs['prompt'])])
+            row += 1
+
+        for line in menu['append_lines']:
+            box_row(row, [(line, attrs['window'])])
+            row += 1
+        box_row(row, [])
+        row += 1
+
+        # Prompt with the typed number, and the last validation error under it.
+        box_row(row, [(menu['input_message'], attrs['prompt']), (state['typed'], attrs['window'])])
+        row += 1
+        box_row(row, [(state['message'] or "", attrs['error'])])
+        row += 1
+
+        lines[layout['top'] + row] = (("╚" + "═" * (layout['width'] - 2) + "╝", attrs['window']),)
+        return lines
+
+    def _draw(self, stdscr, menu: dict, state: dict) -> None:
+        layout = self._layout(stdscr, menu)
+        lines = self._build_lines(layout, menu, state)
+        left = layout['left'] if layout['visible'] >= 1 else 0
+
+        # Unknown screen contents (first frame, resize), start from a blank screen.
+        if self._drawn_lines is None:
+            stdscr.erase()
+            self._drawn_lines = {}
+
+        # Only rewrite rows whose segments differ from what was drawn there last time.
+        for row in set(lines) | set(self._drawn_lines):
+            segments = lines.get(row)
+            if segments == self._drawn_lines.get(row):
+                continue
+            stdscr.move(row, 0)
+            stdscr.clrtoeol()
+            if segments:
+                stdscr.move(row, left)
+                for text, attr in segments:
+                    try:
+                        stdscr.addstr(text, attr)
+                    except curses.error:
+                        # Writing the bottom right cell moves the cursor off screen, the text is drawn anyway.
+                        break
+        self._drawn_lines = lines
+
+        # Push every changed row to the terminal in one update.
+        stdscr.noutrefresh()
+        curses.doupdate()
@@ -0,0 +1,134 @@
+import unittest
+from unittest import mock
+from my_little_snake_helpers import curses_menu
+from my_little_snake_helpers.curses_menu import CursesMenu
+
+curses = curses_menu.curses
+
+
+class FakeScreen():
+    # Stands in for a curses window: answers get_wch from a list of keys and keeps the text of every row.
+
+    def __init__(self, keys, height = 24, width = 80):
+        self.keys = list(keys)
+        self.height = height
+        self.width = width
+        self.rows = {}
+        self.cursor = (0, 0)
+        self.rewritten = []
+        self.frames = []
+        self.texts = []
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def get_wch(self):
+        return self.keys.pop(0)
+
+    def keypad(self, flag):
+        pass
+
+    def erase(self):
+        self.rows = {}
+
+    def move(self, row, column):
+        self.cursor = (row, column)
+
+    def clrtoeol(self):
+        row, column = self.cursor
+        self.rows[row] = self.rows.get(row, "")[:column]
+        self.rewritten.append(row)
+
+    def addstr(self, text, attr = 0):
+        row, column = self.cursor
+        line = self.rows.get(row, "").ljust(column)
+        self.rows[row] = line[:column] + text + line[column + len(text):]
+        self.cursor = (row, column + len(text))
+
+    def noutrefresh(self):
+        self.frames.append(self.rewritten)
+        self.texts.append(self.text())
+        self.rewritten = []
+
+    def text(self) -> str:
+        return "\n".join(self.rows[row] for row in sorted(self.rows))
+
+
+class CursesMenuTest(unittest.TestCase):
+
+    def setUp(self):
+        # Nothing is sent to a real terminal, only the fake screen is drawn on.
+        for name in ('doupdate', 'curs_set', 'set_escdelay'):
+            patcher = mock.patch.object(curses, name, create = True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.menu = CursesMenu(use_color = False)
+
+    def run_menu(self, keys, items = None, height = 24):
+        screen = FakeScreen(keys, height = height)
+        menu = {
+            'title': "pick one",
+            'items': items or [f"item {number}" for number in range(1, 6)],
+            'input_message': "enter selection: ",
+            'prepend_lines': ["choose wisely"],
+            'append_lines': [],
+        }
+        return self.menu._menu_wrapped(screen, menu), screen
+
+    def test_arrow_keys_and_enter(self):
+        value, _ = self.run_menu([curses.KEY_DOWN, 'j', curses.KEY_UP, curses.KEY_DOWN, curses.KEY_DOWN, '\n'])
+        self.assertEqual(value, 4)
+
+    def test_home_end(self):
+        self.assertEqual(self.run_menu([curses.KEY_END, '\n'])[0], 5)
+        self.assertEqual(self.run_menu([curses.KEY_END, curses.KEY_HOME, '\n'])[0], 1)
+
+    def test_typed_number(self):
+        items = [f"item {number}" for number in range(1, 21)]
+        self.assertEqual(self.run_menu(['1', '2', '\n'], items)[0], 12)
+        self.assertEqual(self.run_menu(['1', '9', '\x7f', '\n'], items)[0], 1)
+
+    def test_invalid_input_shows_a_message(self):
+        value, screen = self.run_menu(['9', '\n', 'x', curses.KEY_DOWN, '\n'])
+        self.assertEqual(value, 2)
+        self.assertIn("your input is out of the menu range.", screen.texts[2])
+        self.assertIn("your input is non-numeric.", screen.texts[3])
+        self.assertNotIn("your input", screen.texts[4])
+
+    def test_only_changed_rows_are_rewritten(self):
+        value, screen = self.run_menu([curses.KEY_DOWN, '\n'])
+        self.assertEqual(value, 2)
+
+        # The first frame draws the whole box, moving the highlight rewrites the two item rows only.
+        first, second = screen.frames
+        self.assertGreater(len(first), 5)
+        self.assertEqual(len(second), 2)
+
+    def test_long_lists_scroll_with_the_selection(self):
+        items = [f"item {number}" for number in range(1, 51)]
+        value, screen = self.run_menu([curses.KEY_END, '\n'], items, height = 14)
+        self.assertEqual(value, 50)
+        self.assertIn("[50] - item 50", screen.text())
+        self.assertIn("more", screen.text())
+        self.assertNotIn("[01] - item 1 ", screen.text())
+
+    def test_screen_too_small(self):
+        value, screen = self.run_menu(['\n'], height = 5)
+        self.assertEqual(value, 1)
+        self.assertIn("terminal too small", screen.text())
+
+    def test_falls_back_to_console_without_a_terminal(self):
+        with mock.patch.object(CursesMenu, '_terminal_available', return_value = False), \
+             mock.patch('my_little_snake_helpers.console.Console.integer_only_menu_with_validation', return_value = (2, "b")) as console_menu:
+            self.assertEqual(self.menu.integer_only_menu_with_validation("title", ["a", "b"]), (2, "b"))
+        console_menu.assert_called_once()
+
+    def test_item_list_is_validated(self):
+        for item_list in ([], ["a", 1], "ab"):
+            with self.subTest(item_list = item_list):
+                with self.assertRaises(ValueError):
+                    self.menu.integer_only_menu_with_validation("title", item_list)
+
+
+if __name__ == '__main__':
+    unittest.main()
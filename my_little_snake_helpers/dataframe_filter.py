@@ -0,0 +1,157 @@
+import re
+from .lazy_import import lazy_import
+
+# Heavy dependencies are imported on first use so importing this module stays cheap.
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+# A simple "column op value" condition. The column is matched lazily, the operator is the first one found.
+_CONDITION_PATTERN = re.compile(r'^\s*(?P<column>.+?)\s*(?P<op>==|!=|>=|<=|=|>|<|~)\s*(?P<value>.*?)\s*$')
+
+class DataFrameFilter():
+    """
+    Filters and searches one DataFrame. Equality lookups go through a hash index (value -> row positions)
+    that is built for a column the first time it is searched and then reused, so repeated lookups on key
+    columns like TransactionID don't scan the frame. Other conditions are evaluated vectorized, and
+    anything that isn't a simple "column op value" is handed to DataFrame.query.
+
+    Attributes:
+        df (pd.DataFrame): The DataFrame being filtered. A changed frame needs a new DataFrameFilter.
+    """
+
+    def __init__(self, df):
+        """
+        Parameters:
+            df (pd.DataFrame): The DataFrame to filter.
+        """
+        self.df = df
+        self._indexes = {}
+
+    def lookup(self, column, value):
+        """
+        Returns the rows whose column equals value, through the column's hash index.
+
+        Parameters:
+            column: The column label.
+            value: The value to look up, strings are converted to the column's type.
+
+        Returns:
+            pd.DataFrame: The matching rows, in frame order.
+
+        Raises:
+            ValueError: If the column doesn't exist or the value can't be converted to its type.
+        """
+        if column not in self.df.columns:
+            raise ValueError(f"unknown column: {column}")
+        uniques, order, offsets = self._index(column)
+        try:
+            code = uniques.get_loc(self._coerce(column, value))
+        except (KeyError, TypeError):
+            return self.df.iloc[0:0]
+        return self.df.iloc[order[offsets[code + 1]:offsets[code + 2]]]
+
+    def _index(self, column) -> tuple:
+        # Build the column's index on first use, then reuse it. The rows are grouped by value code
+        # (positions sorted by code, offsets of each code's run), and the distinct values are held in a
+        # pandas Index whose hash table maps a value to its code. Everything is built vectorized.
+        index = self._indexes.get(column)
+        if index is None:
+            codes, uniques = pd.factorize(self.df[column])
+
+            # Missing values get code -1, shift by one so they form the first run. The stable sort keeps
+            # each run in frame order.
+            order = np.argsort(codes, kind = 'stable')
+            counts = np.bincount(codes + 1, minlength = len(uniques) + 1)
+            offsets = np.concatenate(([0], np.cumsum(counts)))
+            index = (pd.Index(uniques), order, offsets)
+            self._indexes[column] = index
+        return index
+
+    def filter(self, expression: str):
+        """
+        Returns the rows matching an expression. Supported forms:
+            column == value (or column = value)  equality, through the hash index
+            column != value, <, <=, >, >=        comparisons
+            column ~ text                        case-insensitive substring search
+            anything else                        evaluated with DataFrame.query (e.g. "Quantity > 2 and Region == 'North'")
+        Values may be quoted, they are converted to the column's type.
+
+        Parameters:
+            expression (str): The filter expression.
+
+        Returns:
+            pd.DataFrame: The matching rows, in frame order.
+
+        Raises:
+            ValueError: If the expression is invalid.
+        """
+        condition = self._parse_condition(expression)
+        if condition is None:
+            try:
+                return self.df.query(expression)
+            except Exception as e:
+                raise ValueError(f"invalid expression: {e}")
+
+        column, op, value = condition
+        if op in ('==', '='):
+            return self.lookup(column, value)
+
+        values = self.df[column]
+        if op == '~':
+            return self.df[values.astype(str).str.contains(value, case = False, regex = False, na = False).to_numpy()]
+
+        value = self._coerce(column, value)
+        try:
+            if op == '!=': mask = values != value
+            elif op == '<': mask = values < value
+            elif op == '<=': mask = values <= value
+            elif op == '>': mask = values > value
+            else: mask = values >= value
+        except TypeError as e:
+            raise ValueError(f"can't compare {column} with {value!r}: {e}")
+        return self.df[mask.to_numpy()]
+
+    def _parse_condition(self, expression: str):
+        # Split "column op value" when the left side is a column of the frame, else None (a query expression).
+        match = _CONDITION_PATTERN.match(expression)
+        if match is None:
+            return None
+        labels = {str(column): column for column in self.df.columns}
+        column = match.group('column').strip('`')
+        if column not in labels:
+            return None
+
+        # A value containing another operator or a boolean keyword is a compound query, not a simple condition.
+        value = match.group('value')
+        if re.search(r'==|!=|>=|<=|[<>]|\b(and|or|not)\b', value) and not re.fullmatch(r'(["\']).*\1', value):
+            return None
+        return labels[column], match.group('op'), self._unquote(value)
+
+    @staticmethod
+    def _unquote(value: str) -> str:
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+            return value[1:-1]
+        return value
+
+    def _coerce(self, column, value):
+        # Convert text typed by the user to the type of the column's values.
+        if not isinstance(value, str):
+            return value
+        dtype = self.df[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            dtype = dtype.categories.dtype
+        try:
+            if pd.api.types.is_bool_dtype(dtype):
+                if value.lower() not in ('true', 'false', '1', '0'):
+                    raise ValueError(value)
+                return value.lower() in ('true', '1')
+            if pd.api.types.is_integer_dtype(dtype):
+                number = float(value)
+                return int(number) if number.is_integer() else number
+            if pd.api.types.is_float_dtype(dtype):
+                return float(value)
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                return pd.Timestamp(value)
+        except ValueError:
+            raise ValueError(f"{value!r} is not a valid value for column {column} ({dtype})")
+        return value
@@ -0,0 +1,78 @@
+import os
+import unittest
+import numpy as np
+import pandas as pd
+from my_little_snake_helpers.dataframe_filter import DataFrameFilter
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'demo_data', 'sample_csv_data.csv')
+
+
+class DataFrameFilterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'id': [3, 1, 2, 1, 5],
+            'name': ["pear", "Apple", None, "apple pie", "fig"],
+            'price': [0.5, 1.25, np.nan, 2.0, 3.5],
+            'region': pd.Categorical(["North", "South", "North", "East", "South"]),
+            'active': [True, False, True, True, False],
+            'date': pd.to_datetime(["2025-01-01", "2025-02-01", "2025-03-01", "2025-04-01", "2025-05-01"]),
+        })
+        self.filter = DataFrameFilter(self.df)
+
+    def positions(self, result) -> list[int]:
+        return result.index.tolist()
+
+    def test_lookup_uses_the_index(self):
+        self.assertEqual(self.positions(self.filter.lookup('id', 1)), [1, 3])
+        self.assertIn('id', self.filter._indexes)
+        index = self.filter._indexes['id']
+        self.assertEqual(self.positions(self.filter.lookup('id', "1")), [1, 3])
+        self.assertIs(self.filter._indexes['id'], index)
+
+    def test_lookup_missing_value(self):
+        self.assertEqual(len(self.filter.lookup('id', 42)), 0)
+        self.assertEqual(len(self.filter.lookup('name', "banana")), 0)
+
+    def test_equality(self):
+        self.assertEqual(self.positions(self.filter.filter("region == South")), [1, 4])
+        self.assertEqual(self.positions(self.filter.filter("name = 'apple pie'")), [3])
+        self.assertEqual(self.positions(self.filter.filter("active == true")), [0, 2, 3])
+        self.assertEqual(self.positions(self.filter.filter("date == 2025-02-01")), [1])
+
+    def test_comparisons(self):
+        self.assertEqual(self.positions(self.filter.filter("price > 1")), [1, 3, 4])
+        self.assertEqual(self.positions(self.filter.filter("price <= 1.25")), [0, 1])
+        self.assertEqual(self.positions(self.filter.filter("id != 1")), [0, 2, 4])
+        self.assertEqual(self.positions(self.filter.filter("date >= 2025-04-01")), [3, 4])
+
+    def test_substring_search(self):
+        self.assertEqual(self.positions(self.filter.filter("name ~ APPLE")), [1, 3])
+
+    def test_query_expressions(self):
+        self.assertEqual(self.positions(self.filter.filter("price > 1 and region == 'South'")), [1, 4])
+        self.assertEqual(self.positions(self.filter.filter("id * 2 > 5")), [0, 4])
+
+    def test_parse_errors(self):
+        for expression in ("price > cheap", "id == 1.5.2", "active == maybe", "nonsense ((", "missing_column > 1"):
+            with self.subTest(expression = expression):
+                with self.assertRaises(ValueError):
+                    self.filter.filter(expression)
+
+    def test_unknown_column_lookup(self):
+        with self.assertRaises(ValueError):
+            self.filter.lookup('missing', 1)
+
+    def test_matches_pandas_on_demo_data(self):
+        df = pd.read_csv(SAMPLE_CSV)
+        frame_filter = DataFrameFilter(df)
+        for region in df['Region'].unique():
+            with self.subTest(region = region):
+                pd.testing.assert_frame_equal(frame_filter.filter(f"Region == {region}"), df[df['Region'] == region])
+        transaction = df['TransactionID'].iloc[7]
+        pd.testing.assert_frame_equal(frame_filter.filter(f"TransactionID == {transaction}"), df[df['TransactionID'] == transaction])
+        pd.testing.assert_frame_equal(frame_filter.filter("Quantity >= 3"), df[df['Quantity'] >= 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+from collections import OrderedDict
+from .lazy_import import lazy_import
+
+# Heavy dependencies are imported on first use so importing this module stays cheap.
+pd = lazy_import('pandas')
+
+# Aggregations a summary can use, all of them run as vectorized groupby reductions.
+AGGREGATIONS = ('sum', 'mean', 'median', 'min', 'max', 'std', 'count', 'nunique')
+
+class SummaryEngine():
+    """
+    Grouped aggregations (e.g. sum of Quantity * UnitPrice * (1 - Discount) by Region) over a DataFrame,
+    with computed value columns evaluated by DataFrame.eval. Results are memoized per (frame version,
+    group keys, expression, aggregation), so reopening a summary is a dictionary lookup. The caller bumps
+    the frame version whenever the frame changes and calls invalidate() to drop the stale results.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        """
+        Parameters:
+            max_entries (int): Number of results kept, the least recently used are dropped first.
+        """
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+
+    def summarize(self, df, group_keys, expression: str = None, agg: str = 'sum', version = None):
+        """
+        Groups df by group_keys and aggregates expression per group.
+
+        Parameters:
+            df (pd.DataFrame): The frame to summarize.
+            group_keys (list): Columns to group by.
+            expression (str | None): A column name or an expression over columns (e.g. "Quantity * UnitPrice").
+                If None, only the row count of each group is returned.
+            agg (str): One of AGGREGATIONS.
+            version: Identifies the state of df. Results are only reused for the same version, so it must change
+                whenever df does. If None, the result is computed but not memoized.
+
+        Returns:
+            pd.DataFrame: One row per group, with the group keys, the aggregated value and the row count, sorted by the keys.
+
+        Raises:
+            ValueError: If a key is unknown, the aggregation isn't supported or the expression can't be evaluated.
+        """
+        group_keys = list(group_keys)
+        expression = expression.strip() if expression else None
+        memo_key = (version, tuple(group_keys), expression, agg)
+        if version is not None and memo_key in self._results:
+            self._results.move_to_end(memo_key)
+            return self._results[memo_key]
+
+        result = self._compute(df, group_keys, expression, agg)
+
+        if version is not None:
+            self._results[memo_key] = result
+            if len(self._results) > self.max_entries:
+                self._results.popitem(last = False)
+        return result
+
+    def _compute(self, df, group_keys, expression, agg):
+        if not group_keys:
+            raise ValueError("select at least one column to group by")
+        missing = [str(key) for key in group_keys if key not in df.columns]
+        if missing:
+            raise ValueError(f"unknown columns: {', '.join(missing)}")
+        if agg not in AGGREGATIONS:
+            raise ValueError(f"unknown aggregation: {agg} (use one of {', '.join(AGGREGATIONS)})")
+
+        grouped_by = [df[key] for key in group_keys]
+        if expression is None:
+            return df.groupby(grouped_by, observed = True, sort = True).size().rename('rows').reset_index()
+
+        # A plain column is used as is, anything else is evaluated as a whole-column expression.
+        try:
+            values = df[expression] if expression in df.columns else df.eval(expression)
+        except Exception as e:
+            raise ValueError(f"invalid expression: {e}")
+        if not isinstance(values, pd.Series) or len(values) != len(df):
+            raise ValueError(f"the expression must give one value per row: {expression}")
+
+        # One groupby computes the aggregate and the group sizes together.
+        try:
+            stats = values.groupby(grouped_by, observed = True, sort = True).agg([agg, 'size'])
+        except TypeError as e:
+            raise ValueError(f"can't compute {agg} of {expression}: {e}")
+
+        stats.columns = [f"{agg}({expression})", 'rows']
+        stats.index.names = [str(key) for key in group_keys]
+        return stats.reset_index()
+
+    def cached(self, version) -> list[tuple]:
+        """
+        Lists the memoized summaries of one frame version, most recently used first.
+
+        Parameters:
+            version: The frame version.
+
+        Returns:
+            list[tuple]: (group_keys, expression, agg) of each memoized result.
+        """
+        return [(list(keys), expression, agg) for (memo_version, keys, expression, agg) in reversed(self._results) if memo_version == version]
+
+    def invalidate(self, keep_version = None) -> None:
+        """
+        Drops memoized results of every version except keep_version (all of them if None).
+
+        Parameters:
+            keep_version: The current frame version.
+        """
+        for memo_key in [key for key in self._results if key[0] != keep_version or keep_version is None]:
+            del self._results[memo_key]
@@ -0,0 +1,67 @@
+import unittest
+import pandas as pd
+from my_little_snake_helpers.dataframe_summary import SummaryEngine
+
+
+class SummaryEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Region': pd.Categorical(["North", "South", "North", "East", "South", "North"]),
+            'Rep': ["ann", "bob", "bob", "ann", "bob", "ann"],
+            'Quantity': [1, 2, 3, 4, 5, 6],
+            'UnitPrice': [10.0, 20.0, 10.0, 5.0, 2.0, 1.0],
+            'Discount': [0.0, 0.5, 0.0, 0.0, 0.5, 0.0],
+        })
+        self.engine = SummaryEngine(max_entries = 2)
+
+    def test_sum_of_expression(self):
+        result = self.engine.summarize(self.df, ['Region'], "Quantity * UnitPrice * (1 - Discount)")
+        self.assertEqual(list(result.columns), ['Region', 'sum(Quantity * UnitPrice * (1 - Discount))', 'rows'])
+        self.assertEqual(result['Region'].tolist(), ["East", "North", "South"])
+        self.assertEqual(result.iloc[:, 1].tolist(), [20.0, 46.0, 25.0])
+        self.assertEqual(result['rows'].tolist(), [1, 3, 2])
+
+    def test_matches_groupby(self):
+        for agg in ('mean', 'median', 'min', 'max', 'std', 'count', 'nunique'):
+            with self.subTest(agg = agg):
+                result = self.engine.summarize(self.df, ['Region', 'Rep'], 'Quantity', agg)
+                expected = self.df.groupby(['Region', 'Rep'], observed = True)['Quantity'].agg(agg)
+                pd.testing.assert_series_equal(result[f"{agg}(Quantity)"], expected.reset_index(drop = True), check_names = False)
+
+    def test_row_counts_only(self):
+        result = self.engine.summarize(self.df, ['Rep'])
+        self.assertEqual(result.to_dict('list'), {'Rep': ["ann", "bob"], 'rows': [3, 3]})
+
+    def test_errors(self):
+        for keys, expression, agg in (([], None, 'sum'), (['Missing'], None, 'sum'), (['Rep'], 'Quantity', 'mode'),
+                                      (['Rep'], 'Quantity +', 'sum'), (['Rep'], 'Quantity.sum()', 'sum'), (['Region'], 'Rep', 'mean')):
+            with self.subTest(keys = keys, expression = expression, agg = agg):
+                with self.assertRaises(ValueError):
+                    self.engine.summarize(self.df, keys, expression, agg)
+
+    def test_memoized_per_version(self):
+        first = self.engine.summarize(self.df, ['Rep'], 'Quantity', version = 1)
+        self.assertIs(self.engine.summarize(self.df, ['Rep'], ' Quantity ', version = 1), first)
+        self.assertIsNot(self.engine.summarize(self.df, ['Rep'], 'Quantity', version = 2), first)
+        self.assertIsNot(self.engine.summarize(self.df, ['Rep'], 'Quantity'), self.engine.summarize(self.df, ['Rep'], 'Quantity'))
+
+    def test_least_recently_used_results_are_dropped(self):
+        first = self.engine.summarize(self.df, ['Rep'], 'Quantity', version = 1)
+        self.engine.summarize(self.df, ['Region'], 'Quantity', version = 1)
+        self.engine.summarize(self.df, ['Rep'], 'Quantity', version = 1)
+        self.engine.summarize(self.df, ['Rep'], 'UnitPrice', version = 1)
+        self.assertEqual(self.engine.cached(1), [(['Rep'], 'UnitPrice', 'sum'), (['Rep'], 'Quantity', 'sum')])
+        self.assertIs(self.engine.summarize(self.df, ['Rep'], 'Quantity', version = 1), first)
+
+    def test_invalidate(self):
+        self.engine.summarize(self.df, ['Rep'], 'Quantity', version = 1)
+        self.engine.summarize(self.df, ['Rep'], 'Quantity', version = 2)
+        self.engine.invalidate(keep_version = 2)
+        self.assertEqual((self.engine.cached(1), len(self.engine.cached(2))), ([], 1))
+        self.engine.invalidate()
+        self.assertEqual(self.engine.cached(2), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
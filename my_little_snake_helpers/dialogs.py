@@ -0,0 +1,265 @@
+import os
+import sys
+import atexit
+import glob
+import fnmatch
+import threading
+from .lazy_import import lazy_import
+from . import instrumentation
+
+# Heavy dependencies are imported on first use so importing this module stays cheap.
+tk = lazy_import('tkinter')
+filedialog = lazy_import('tkinter.filedialog')
+
+class DialogService():
+    """
+    Shows file / directory dialogs from one hidden Tk root that is created lazily and reused, instead
+    of starting a new Tcl interpreter for every dialog. Requests from any thread are marshalled onto the
+    thread that owns the root. Without a display, the same calls fall back to a console path prompt
+    with tab completion.
+    """
+
+    def __init__(self, headless: bool = None):
+        """
+        Parameters:
+            headless (bool): Force (True) or disable (False) the console fallback. If None, it is used
+                automatically when no display is available or Tk fails to start.
+        """
+        self.headless = headless
+        self._root = None
+        self._thread = None
+        self._requests = None
+        self._lock = threading.RLock()
+
+        # macOS only allows Tk on the main thread, so there dialogs run inline on the calling thread.
+        self._inline = sys.platform == 'darwin'
+
+    @instrumentation.timed('DialogService.ask_open_filename')
+    def ask_open_filename(self, title: str = "Select a file", initialdir: str = None, filetypes = ("All files", "*.*")) -> str:
+        """
+        Asks for an existing file.
+
+        Parameters:
+            title (str): Dialog title.
+            initialdir (str): The directory to start in. If None, uses the current working directory.
+            filetypes (tuple | list[tuple]): A (description, patterns) tuple or a list of them.
+
+        Returns:
+            str: The selected path, or an empty string if cancelled.
+        """
+        return self._ask('open', title = title, initialdir = initialdir or os.getcwd(), filetypes = self._normalize_filetypes(filetypes))
+
+    @instrumentation.timed('DialogService.ask_directory')
+    def ask_directory(self, title: str = "Select a directory", initialdir: str = None) -> str:
+        """
+        Asks for an existing directory.
+
+        Parameters:
+            title (str): Dialog title.
+            initialdir (str): The directory to start in. If None, uses the current working directory.
+
+        Returns:
+            str: The selected directory, or an empty string if cancelled.
+        """
+        return self._ask('directory', title = title, initialdir = initialdir or os.getcwd())
+
+    @instrumentation.timed('DialogService.ask_saveas_filename')
+    def ask_saveas_filename(self, title: str = "Save file as", initialdir: str = None, initialfile: str = "", filetypes = ("All files", "*.*")) -> str:
+        """
+        Asks for a file path to save to (the file doesn't need to exist).
+
+        Parameters:
+            title (str): Dialog title.
+            initialdir (str): The directory to start in. If None, uses the current working directory.
+            initialfile (str): The default filename.
+            filetypes (tuple | list[tuple]): A (description, patterns) tuple or a list of them.
+
+        Returns:
+            str: The path to save to, or an empty string if cancelled.
+        """
+        return self._ask('save', title = title, initialdir = initialdir or os.getcwd(), initialfile = initialfile, filetypes = self._normalize_filetypes(filetypes))
+
+    def shutdown(self) -> None:
+        """
+        Destroys the hidden root (and stops its thread). A later dialog creates a new one.
+        """
+        with self._lock:
+            if self._requests is not None:
+                self._requests.put(None)
+                self._thread.join()
+                self._thread = None
+                self._requests = None
+                atexit.unregister(self.shutdown)
+            elif self._root is not None:
+                self._root.destroy()
+                self._root = None
+
+    def _ask(self, kind: str, **options) -> str:
+        if self._use_console():
+            with self._lock:
+                return self._console_prompt(kind, **options)
+
+        try:
+            if self._inline:
+                with self._lock:
+                    return self._show(kind, options)
+            return self._submit(kind, options).result()
+        except tk.TclError:
+            # Tk couldn't start (no display, broken install), switch to the console prompt for good.
+            self.headless = True
+            with self._lock:
+                return self._console_prompt(kind, **options)
+
+    def _use_console(self) -> bool:
+        if self.headless is None:
+            # X11 / Wayland need a display variable, Windows and macOS always have a window server.
+            no_display = os.name == 'posix' and sys.platform != 'darwin' and not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+            self.headless = no_display or not self._tk_available()
+        return self.headless
+
+    @staticmethod
+    def _tk_available() -> bool:
+        try:
+            tk.TkVersion
+            return True
+        except ImportError:
+            return False
+
+    def _submit(self, kind: str, options: dict):
+        # Start the thread that owns the root on first use, then queue the request for it. queue and
+        # concurrent.futures are imported here so importing the module doesn't load them (and logging).
+        import queue
+        from concurrent.futures import Future
+        with self._lock:
+            if self._thread is None:
+                self._requests = queue.Queue()
+                self._thread = threading.Thread(target = self._dialog_thread, args = (self._requests,), name = "DialogService", daemon = True)
+                self._thread.start()
+
+                # The root must be destroyed on its own thread before the interpreter exits, else Tcl
+                # aborts with "Tcl_AsyncDelete: async handler deleted by the wrong thread".
+                atexit.register(self.shutdown)
+            future = Future()
+            self._requests.put((kind, options, future))
+        return future
+
+    def _dialog_thread(self, requests) -> None:
+        # Runs every dialog on this one thread, Tk objects must only be used from the thread that created them.
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            kind, options, future = request
+            try:
+                future.set_result(self._show(kind, options))
+            except BaseException as e:
+                future.set_exception(e)
+        if self._root is not None:
+            self._root.destroy()
+            self._root = None
+
+    def _show(self, kind: str, options: dict) -> str:
+        # Create the hidden root once and reuse it as the parent of every dialog.
+        if self._root is None:
+            self._root = tk.Tk()
+            self._root.withdraw()
+
+        if kind == 'open':
+            path = filedialog.askopenfilename(parent = self._root, **options)
+        elif kind == 'directory':
+            path = filedialog.askdirectory(parent = self._root, **options)
+        else:
+            path = filedialog.asksaveasfilename(parent = self._root, **options)
+
+        # Let Tk finish tearing down the dialog window before going idle.
+        self._root.update()
+        return path or ""
+
+    def _console_prompt(self, kind: str, title: str, initialdir: str, initialfile: str = "", filetypes: list = None) -> str:
+        # Console fallback, asks for a path with tab completion until it's valid or the user enters nothing.
+        from .console import Console
+        console = Console()
+
+        patterns = []
+        for _, pattern in filetypes or []:
+            patterns.extend('*' if item == '*.*' else item for item in pattern.replace(';', ' ').split())
+
+        previous_completer = self._install_completer(initialdir)
+        try:
+            console.fancy_print("<INFO>{}</INFO> <DATA>(relative to {})</DATA>", title, initialdir)
+            if patterns: console.fancy_print("<INFO>file types:</INFO> <DATA>{}</DATA>", " ".join(patterns))
+            while True:
+                default_str = f" [{initialfile}]" if initialfile else ""
+                answer = console.fancy_input("<INPUT_PROMPT>path{} (</INPUT_PROMPT><KEYBOARD_KEY>ENTER</KEYBOARD_KEY><INPUT_PROMPT> to cancel): </INPUT_PROMPT>", default_str).strip()
+                if not answer and initialfile: answer = initialfile
+                if not answer:
+                    return ""
+
+                path = os.path.abspath(os.path.join(initialdir, os.path.expanduser(answer)))
+                if kind == 'directory' and not os.path.isdir(path):
+                    console.fancy_print("<BAD>not a directory: {}</BAD>", path)
+                elif kind == 'open' and not os.path.isfile(path):
+                    console.fancy_print("<BAD>file not found: {}</BAD>", path)
+                elif kind == 'open' and patterns and not any(fnmatch.fnmatch(os.path.basename(path).lower(), p.lower()) for p in patterns):
+                    console.fancy_print("<BAD>file type not accepted: {}</BAD>", path)
+                elif kind == 'save' and not os.path.isdir(os.path.dirname(path)):
+                    console.fancy_print("<BAD>directory does not exist: {}</BAD>", os.path.dirname(path))
+                else:
+                    return path
+        finally:
+            self._restore_completer(previous_completer)
+
+    @staticmethod
+    def _install_completer(initialdir: str):
+        # Tab completion of paths through readline (not available on every platform).
+        try:
+            import readline
+        except ImportError:
+            return None
+
+        def complete(text, state):
+            # Absolute paths complete as typed, relative ones against the starting directory.
+            expanded = os.path.expanduser(text)
+            if os.path.isabs(expanded): matches = glob.glob(expanded + '*')
+            else: matches = [os.path.relpath(match, initialdir) for match in glob.glob(os.path.join(initialdir, expanded) + '*')]
+            matches = [match + os.sep if os.path.isdir(os.path.join(initialdir, match)) else match for match in sorted(matches)]
+            return matches[state] if state < len(matches) else None
+
+        previous = (readline.get_completer(), readline.get_completer_delims())
+        readline.set_completer(complete)
+        readline.set_completer_delims(' \t\n')
+        readline.parse_and_bind('tab: complete')
+        return previous
+
+    @staticmethod
+    def _restore_completer(previous) -> None:
+        if previous is None:
+            return
+        import readline
+        readline.set_completer(previous[0])
+        readline.set_completer_delims(previous[1])
+
+    @staticmethod
+    def _normalize_filetypes(filetypes) -> list:
+        # Accept a single (description, patterns) tuple as well as a list of them.
+        if isinstance(filetypes, tuple) and len(filetypes) == 2 and all(isinstance(item, str) for item in filetypes):
+            return [filetypes]
+        return list(filetypes)
+
+
+# Dialog service shared by every FileDataProcessor that isn't given its own.
+_shared_service = None
+_shared_service_lock = threading.Lock()
+
+def get_dialog_service() -> DialogService:
+    """
+    Returns the process-wide DialogService, creating it on first use.
+
+    Returns:
+        DialogService: The shared dialog service.
+    """
+    global _shared_service
+    with _shared_service_lock:
+        if _shared_service is None:
+            _shared_service = DialogService()
+        return _shared_service
@@ -0,0 +1,131 @@
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import contextlib
+import subprocess
+from unittest import mock
+from my_little_snake_helpers import dialogs
+from my_little_snake_helpers.dialogs import DialogService, get_dialog_service
+
+
+class RecordingService(DialogService):
+    # Stands in for the Tk dialogs: records the thread each request ran on and answers from a list.
+
+    def __init__(self, answers):
+        super().__init__(headless = False)
+        self._inline = False
+        self.answers = list(answers)
+        self.calls = []
+
+    def _show(self, kind, options):
+        self.calls.append((kind, options, threading.current_thread().name))
+        answer = self.answers.pop(0)
+        if isinstance(answer, BaseException):
+            raise answer
+        return answer
+
+
+class DialogThreadTest(unittest.TestCase):
+
+    def test_requests_run_on_one_dialog_thread(self):
+        service = RecordingService(["/tmp/a.csv", "/tmp", ""])
+        self.addCleanup(service.shutdown)
+        results = []
+        workers = [threading.Thread(target = lambda: results.append(service.ask_open_filename(initialdir = "/tmp"))) for _ in range(2)]
+        for worker in workers: worker.start()
+        for worker in workers: worker.join()
+        results.append(service.ask_saveas_filename(initialdir = "/tmp", filetypes = [("CSV", "*.csv")]))
+
+        self.assertEqual(sorted(results[:2]), ["/tmp", "/tmp/a.csv"])
+        self.assertEqual(results[2], "")
+        self.assertEqual({name for _, _, name in service.calls}, {"DialogService"})
+        self.assertEqual(service.calls[2][0], 'save')
+        self.assertEqual(service.calls[2][1]['filetypes'], [("CSV", "*.csv")])
+
+    def test_errors_reach_the_caller(self):
+        service = RecordingService([ValueError("broken")])
+        self.addCleanup(service.shutdown)
+        with self.assertRaises(ValueError):
+            service.ask_directory()
+
+    def test_shutdown_stops_the_thread(self):
+        service = RecordingService(["x"])
+        service.ask_directory()
+        thread = service._thread
+        service.shutdown()
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(service._thread)
+
+    def test_thread_is_shut_down_at_exit(self):
+        # The interpreter must not exit with the root alive on the dialog thread. The check is registered
+        # first, so it runs after the service's own exit handler.
+        code = "\n".join([
+            "import atexit",
+            "from my_little_snake_helpers.dialogs_test import RecordingService",
+            "service = RecordingService(['x'])",
+            "atexit.register(lambda: print('stopped' if service._thread is None else 'running'))",
+            "service.ask_directory()",
+        ])
+        result = subprocess.run([sys.executable, '-c', code], cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__))), capture_output = True, text = True, timeout = 30)
+        self.assertEqual((result.returncode, result.stdout.strip()), (0, "stopped"), result.stderr)
+
+    def test_tcl_error_switches_to_console(self):
+        service = RecordingService([dialogs.tk.TclError("no display")])
+        self.addCleanup(service.shutdown)
+        with mock.patch.object(DialogService, '_console_prompt', return_value = "typed") as prompt:
+            self.assertEqual(service.ask_directory(initialdir = "/tmp"), "typed")
+        self.assertTrue(service.headless)
+        prompt.assert_called_once()
+
+
+class ConsolePromptTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        os.mkdir(os.path.join(self.directory.name, 'sub'))
+        for name in ('data.csv', 'notes.txt'):
+            with open(os.path.join(self.directory.name, name), 'w') as file:
+                file.write("x")
+        self.service = DialogService(headless = True)
+
+    def ask(self, answers, method, **options):
+        # Run a dialog with the console prompt answering from answers, output captured.
+        with mock.patch('my_little_snake_helpers.console.Console.fancy_input', side_effect = answers), contextlib.redirect_stdout(io.StringIO()) as output:
+            return getattr(self.service, method)(initialdir = self.directory.name, **options), output.getvalue()
+
+    def test_open_retries_until_valid(self):
+        path, output = self.ask(["missing.csv", "notes.txt", "data.csv"], 'ask_open_filename', filetypes = [("CSV files", "*.csv")])
+        self.assertEqual(path, os.path.join(self.directory.name, 'data.csv'))
+        self.assertIn("file not found", output)
+        self.assertIn("file type not accepted", output)
+
+    def test_empty_answer_cancels(self):
+        self.assertEqual(self.ask([""], 'ask_open_filename')[0], "")
+
+    def test_directory(self):
+        path, output = self.ask(["data.csv", "sub"], 'ask_directory')
+        self.assertEqual(path, os.path.join(self.directory.name, 'sub'))
+        self.assertIn("not a directory", output)
+
+    def test_save_uses_initial_file(self):
+        path, output = self.ask(["nowhere/out.csv", ""], 'ask_saveas_filename', initialfile = "out.csv")
+        self.assertEqual(path, os.path.join(self.directory.name, 'out.csv'))
+        self.assertIn("directory does not exist", output)
+
+
+class DialogHelpersTest(unittest.TestCase):
+
+    def test_normalize_filetypes(self):
+        self.assertEqual(DialogService._normalize_filetypes(("CSV", "*.csv")), [("CSV", "*.csv")])
+        self.assertEqual(DialogService._normalize_filetypes((("CSV", "*.csv"), ("All", "*.*"))), [("CSV", "*.csv"), ("All", "*.*")])
+
+    def test_shared_service(self):
+        self.assertIs(get_dialog_service(), get_dialog_service())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,76 @@
-import tkinter as tk
-from tkinter import filedialog
 import os
-import pandas as pd
-from PIL import Image
-import numpy as np
-import matplotlib.pyplot as plt
+import glob
+import gzip
+import json
+import time
+import secrets
+from .lazy_import import lazy_import
+from .dialogs import get_dialog_service
+from .csv_cache import get_csv_cache
+from . import instrumentation
+
+# Heavy dependencies are imported on first use so importing this module stays cheap.
+pd = lazy_import('pandas')
+Image = lazy_import('PIL.Image')
+np = lazy_import('numpy')
+plt = lazy_import('matplotlib.pyplot')
+
+# Suffix of the file recording which columns of a csv to load (see save_column_projection).
+PROJECTION_SUFFIX = ".projection.json"
+
+# Suffix of the file recording the memory-optimized column types of a csv (see save_csv_schema).
+SCHEMA_SUFFIX = ".schema.json"
+
+# Export formats by file extension (see export_dataframe), longest extensions first.
+EXPORT_FORMATS = (('.csv.gz', 'csv.gz'), ('.gz', 'csv.gz'), ('.csv', 'csv'), ('.parquet', 'parquet'), ('.pq', 'parquet'), ('.feather', 'feather'), ('.arrow', 'feather'))
+
+# File extensions picked up when a directory of images is loaded.
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff', '.webp')
+
+def _decode_image(filepath, size, mode):
+    # Decode one image to an array of the batch's mode (and size). Module level so process pools can pickle it.
+    with Image.open(filepath) as img:
+        if size is not None:
+            # Let JPEGs decode straight at a reduced scale when shrinking.
+            img.draft(mode, size)
+            img = img.convert(mode)
+            if img.size != tuple(size): img = img.resize(tuple(size))
+        else:
+            img = img.convert(mode)
+        return np.asarray(img)
+
+def _copy_into_slot(batch, slot, img_array):
+    # Copy one decoded image into its preallocated slot of the batch.
+    height, width, channels = batch.shape[1:]
+    if img_array.shape[:2] != (height, width):
+        raise ValueError(f"image is {img_array.shape[1]} x {img_array.shape[0]}, expected {width} x {height} (pass size to resize)")
+    batch[slot] = img_array.reshape(height, width, channels)
+
+def _decode_image_into(batch, slot, filepath, size, mode):
+    # Thread pool worker, decodes and fills its slot so the copies run in parallel too.
+    _copy_into_slot(batch, slot, _decode_image(filepath, size, mode))
+
+def _file_size(filepath):
+    # Size of a file for the instrumentation counters, None if it isn't a readable path.
+    try:
+        return os.path.getsize(filepath)
+    except (OSError, TypeError):
+        return None
+
+def _create_temp_file(filepath):
+    # Creates an empty, uniquely named temporary file next to filepath and returns its path. Unlike mkstemp
+    # (owner only) it is created with 0o666 and the kernel applies the umask, like any file open() creates.
+    while True:
+        temp_path = f"{filepath}.{secrets.token_hex(4)}.tmp"
+        try:
+            os.close(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+            return temp_path
+        except FileExistsError:
+            continue
+
+def _read_csv_shard(filepath, read_csv_kwargs):
+    # Parse one file of a multi-file load. Module level so process pools can pickle it.
+    return pd.read_csv(filepath, **read_csv_kwargs)
 
 class FileDataProcessor():
     """
@@ -12,31 +78,82 @@ class FileDataProcessor():
     image viewing, and data loading utilities.
     """
 
-    def __init__(self):
+    def __init__(self, dialog_service = None):
         """
         Initialize the FileDataProcessor class.
-        Currently, no initialization logic is required.
+
+        Parameters:
+            dialog_service (DialogService): The service used for file dialogs. If None, the process-wide
+                shared service is used, so every instance reuses the same hidden Tk root.
         """
-        pass
+        self.dialog_service = dialog_service
+
+        # The viewer figure and its image, reused by every view_image call while the window is open.
+        self._view_figure = None
+        self._view_artist = None
+
+    def _dialogs(self):
+        # The shared dialog service is created on first use.
+        if self.dialog_service is None:
+            self.dialog_service = get_dialog_service()
+        return self.dialog_service
 
-    def view_image(self, filepath):
+    def view_image(self, image, title: str = None, max_size: int = 1920, block: bool = True):
         """
-        Launch an image viewer for the given image filepath.
+        Shows an image in a matplotlib window. An already decoded array is shown as is (nothing is read
+        from disk), downsampled by striding to at most max_size pixels on its longest side, so even huge
+        images open quickly. The window is reused by later calls while it stays open.
 
         Parameters:
-            filepath (str): The path to the image file to display.
+            image (np.ndarray | str): The image array (as returned by load_image_to_array) or the path of an image file.
+            title (str): Window title. Defaults to the path, or "image" for arrays.
+            max_size (int): Longest side, in pixels, of what is handed to matplotlib (about the screen resolution).
+            block (bool): Wait until the window is closed. If False, returns right away and the window stays
+                open (and responsive while the console waits for input).
 
-        Displays the image using matplotlib. If the image cannot be loaded,
-        prints an error message.
+        Raises:
+            RuntimeError: If the image can't be read or there is no display to show it on.
         """
+        # Only read the file if a path was given, and then only at screen resolution.
+        if isinstance(image, str):
+            if title is None: title = image
+            image = self.load_image_to_array(image, max_size = max_size)
+        if title is None: title = "image"
+
+        # Matplotlib falls back to a non-interactive backend without a display, nothing would be shown.
+        if plt.get_backend().lower() in ('agg', 'pdf', 'ps', 'svg', 'cairo', 'template'):
+            raise RuntimeError("an error occurred while showing the image: no display available (try the terminal preview)")
+
+        # Every step-th pixel, a view of the array, so a memory mapped image only reads the rows it needs.
+        step = max(1, -(-max(image.shape[:2]) // max_size))
+        display_array = image[::step, ::step]
+
         try:
-            image = Image.open(filepath)
-            plt.imshow(image)
-            plt.axis('off')  # Hide axes for a cleaner view
-            plt.title(f"Viewing: {filepath}")
-            plt.show()
+            # Reuse the open window, swapping the pixels of its image when the shape allows it.
+            if self._view_figure is None or not plt.fignum_exists(self._view_figure.number):
+                self._view_figure, axes = plt.subplots()
+                axes.axis('off')  # Hide axes for a cleaner view
+                self._view_artist = None
+            axes = self._view_figure.axes[0]
+            if self._view_artist is not None and self._view_artist.get_array().shape == display_array.shape:
+                self._view_artist.set_data(display_array)
+            else:
+                axes.clear()
+                axes.axis('off')
+                self._view_artist = axes.imshow(display_array, cmap = 'gray' if display_array.ndim == 2 else None)
+            axes.set_title(f"Viewing: {title}")
+            self._view_figure.canvas.manager.set_window_title(title)
+
+            if block:
+                plt.show()
+            else:
+                # Interactive mode keeps the window responsive while the console waits for input.
+                plt.ion()
+                self._view_figure.show()
+                self._view_figure.canvas.draw_idle()
+                plt.pause(0.001)
         except Exception as e:
-            print(f"Error loading image: {e}")
+            raise RuntimeError(f"an error occurred while showing the image: {e}")
 
     def save_file(self, default_dir: str = None, default_filename: str = "", filetypes = ("All files", "*.*")) -> str:
         """
@@ -45,30 +162,13 @@ class FileDataProcessor():
         Parameters:
             default_dir (str): The directory to open the dialog in. If None, uses the current working directory.
             default_filename (str): The default filename to display in the dialog.
-            filetypes (tuple): A tuple of file types to filter the files shown in the dialog.
+            filetypes (tuple | list[tuple]): A file type tuple (or list of them) to filter the files shown in the dialog.
 
         Returns:
             str: The path to the file to save, or an empty string if cancelled.
         """
-        if default_dir is None:
-            default_dir = os.getcwd()
-
-        # Create a hidden root window for the dialog
-        root = tk.Tk()
-        root.withdraw()
-
-        # Open the Save As dialog
-        file_path = filedialog.asksaveasfilename(
-            title="Save file as",
-            initialdir=default_dir,
-            initialfile=default_filename,
-            filetypes=[filetypes]
-        )
-
-        # Destroy the root window to free resources
-        root.destroy()
-
-        return file_path
+        # Open the Save As dialog (or the console prompt when there is no display).
+        return self._dialogs().ask_saveas_filename(title = "Save file as", initialdir = default_dir, initialfile = default_filename, filetypes = filetypes)
 
     def open_directory(self, default_dir: str = None) -> str:
         """
@@ -80,20 +180,8 @@ class FileDataProcessor():
         Returns:
             str: The path to the selected directory, or an empty string if cancelled.
         """
-        if default_dir is None:
-            default_dir = os.getcwd()
-
-        # Create a hidden root window for the dialog
-        root = tk.Tk()
-        root.withdraw()
-
-        # Open the directory selection dialog
-        directory_path = filedialog.askdirectory(title="Select a directory", initialdir=default_dir)
-
-        # Destroy the root window to free resources
-        root.destroy()
-
-        return directory_path
+        # Open the directory selection dialog (or the console prompt when there is no display).
+        return self._dialogs().ask_directory(title = "Select a directory", initialdir = default_dir)
 
     def open_file(self, default_dir:str = None, filetypes = ("All files", "*.*")) -> str:
         """
@@ -101,59 +189,220 @@ class FileDataProcessor():
 
         Parameters:
             default_dir (str): The directory to open the file dialog in. If None, uses the current working directory.
-            filetypes (tuple): A tuple of file types to filter the files shown in the dialog.
+            filetypes (tuple | list[tuple]): A file type tuple (or list of them) to filter the files shown in the dialog.
                 Example: ("Image files", "*.png;*.jpg;*.jpeg;*.bmp;*.gif")      
 
         Returns:
             str: The path to the selected file, or an empty string if cancelled.
         """
-        if default_dir is None:
-            # If no default directory is provided, use the current working directory.
-            default_dir = os.getcwd()
+        # Launch the file picker dialog (or the console prompt when there is no display).
+        return self._dialogs().ask_open_filename(title = "Select a file", initialdir = default_dir, filetypes = filetypes)
+
+    @instrumentation.timed('FileDataProcessor.load_image_to_array', lambda image, self, filepath, *args, **kwargs: {'files': 1, 'bytes': _file_size(filepath), 'pixels': image.shape[0] * image.shape[1]})
+    def load_image_to_array(self, filepath, max_size: int = None, region: tuple = None, mmap: bool = True, raw_shape: tuple = None, raw_dtype: str = "uint8"):
+        """
+        Loads an image file into a numpy array, optionally as a reduced-resolution preview or just a region.
+
+        JPEGs are decoded at a reduced scale (PIL draft mode) when max_size allows it, so a preview of a huge
+        scan never decodes the full resolution. .npy files and raw files (given raw_shape) are memory mapped
+        instead of read, and max_size / region then just slice the mapping.
+
+        Parameters:
+            filepath (str): The path to the image file.
+            max_size (int): If given, the longest side of the returned image is at most this many pixels.
+            region (tuple): Optional (left, top, right, bottom) box, in full resolution pixels, to load.
+            mmap (bool): Return .npy / raw files as a read-only np.memmap instead of reading them into memory.
+            raw_shape (tuple): Shape of a headerless raw file (e.g. (height, width, 3)), required for raw files.
+            raw_dtype (str): Data type of a headerless raw file.
+
+        Returns:
+            np.ndarray: Numpy array containing the image data (np.memmap for memory mapped files).
+
+        Raises:
+            RuntimeError: If there is an error reading the image file.
+        """
+        try:
+            # Arrays stored on disk are memory mapped, nothing is read until the pixels are used.
+            extension = os.path.splitext(filepath)[1].lower()
+            if extension == '.npy':
+                img_array = np.load(filepath, mmap_mode = 'r' if mmap else None)
+                return self._slice_array(img_array, max_size, region)
+            if raw_shape is not None:
+                if mmap: img_array = np.memmap(filepath, dtype = raw_dtype, mode = 'r', shape = tuple(raw_shape))
+                else: img_array = np.fromfile(filepath, dtype = raw_dtype).reshape(raw_shape)
+                return self._slice_array(img_array, max_size, region)
+
+            # Open the image file using PIL (this only reads the header).
+            with Image.open(filepath) as img:
+                full_width, full_height = img.size
+                box = region if region is not None else (0, 0, full_width, full_height)
 
-        # Hide the main root window.
-        root = tk.Tk()
-        root.withdraw()
+                # Ask the decoder for a reduced scale (JPEG draft mode decodes at 1/2, 1/4 or 1/8 directly).
+                if max_size is not None:
+                    scale = max(box[2] - box[0], box[3] - box[1]) / max_size
+                    if scale > 1:
+                        img.draft(img.mode, (max(1, int(full_width / scale)), max(1, int(full_height / scale))))
 
-        # Launch the file picker dialog.
-        file_path = filedialog.askopenfilename(
-            title="Select a file",
-            initialdir=default_dir,
-            filetypes=[filetypes]
-        )
+                # Map the region onto whatever resolution the decoder settled on.
+                draft_scale = img.size[0] / full_width
+                if region is not None:
+                    img = img.crop(tuple(round(coordinate * draft_scale) for coordinate in box))
 
-        # Destroy the Tkinter root window to avoid resource leaks.
-        root.destroy()
+                # Reduce the rest of the way (thumbnail uses Image.reduce before resampling).
+                if max_size is not None:
+                    img.thumbnail((max_size, max_size))
 
-        return file_path
+                # Convert it to a numpy array.
+                img_array = np.array(img)
+            return img_array
+        except Exception as e:
+            raise RuntimeError(f"an error occurred while reading the image: {e}")
 
-    def load_image_to_array(self, filepath):
+    @staticmethod
+    def _slice_array(img_array, max_size, region):
+        # Region and size reduction on an array are plain slices, so a memmap stays a memmap.
+        if region is not None:
+            left, top, right, bottom = region
+            img_array = img_array[top:bottom, left:right]
+        if max_size is not None:
+            step = -(-max(img_array.shape[:2]) // max_size)  # Ceiling division
+            if step > 1:
+                img_array = img_array[::step, ::step]
+        return img_array
+
+    def read_image_info(self, filepath) -> dict:
         """
-        Loads an image file into a numpy array.
+        Reads an image's metadata without decoding its pixels.
 
         Parameters:
             filepath (str): The path to the image file.
 
         Returns:
-            np.ndarray: Numpy array containing the image data.
+            dict: 'format', 'mode', 'width', 'height', 'bands' and 'file_size' (bytes) of the image.
 
         Raises:
             RuntimeError: If there is an error reading the image file.
         """
         try:
-            # Open the image file using PIL and convert it to a numpy array.
-            img = Image.open(filepath)
-            img_array = np.array(img)
-            return img_array
+            file_size = os.path.getsize(filepath)
+
+            # .npy headers are read through a memory map, the data itself is never touched.
+            if os.path.splitext(filepath)[1].lower() == '.npy':
+                img_array = np.load(filepath, mmap_mode = 'r')
+                bands = img_array.shape[2] if img_array.ndim > 2 else 1
+                return {'format': 'NPY', 'mode': str(img_array.dtype), 'width': img_array.shape[1], 'height': img_array.shape[0], 'bands': bands, 'file_size': file_size}
+
+            with Image.open(filepath) as img:
+                return {'format': img.format, 'mode': img.mode, 'width': img.size[0], 'height': img.size[1], 'bands': len(img.getbands()), 'file_size': file_size}
         except Exception as e:
             raise RuntimeError(f"an error occurred while reading the image: {e}")
 
-    def load_csv_to_dataframe(self, filepath):
+    def list_image_files(self, source, pattern: str = "*") -> list[str]:
+        """
+        Lists the image files of a directory or glob, sorted by path.
+
+        Parameters:
+            source (str): A directory, or a glob pattern such as "scans/*.jpg".
+            pattern (str): Glob pattern applied inside source when it is a directory.
+
+        Returns:
+            list[str]: The image file paths.
+        """
+        if os.path.isdir(source): paths = glob.glob(os.path.join(source, pattern))
+        else: paths = glob.glob(source)
+        return sorted(path for path in paths if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS)
+
+    @instrumentation.timed('FileDataProcessor.load_images_to_array', lambda batch, *args, **kwargs: {'files': len(batch), 'pixels': batch.shape[0] * batch.shape[1] * batch.shape[2]})
+    def load_images_to_array(self, source, pattern: str = "*", size: tuple = None, mode: str = "RGB", max_workers: int = None, use_processes: bool = False):
+        """
+        Decodes a directory (or glob) of images in parallel into one preallocated (N, H, W, C) array.
+
+        Parameters:
+            source (str | list[str]): A directory, a glob pattern, or a list of image paths.
+            pattern (str): Glob pattern applied inside source when it is a directory.
+            size (tuple): Optional (width, height) every image is resized to. If None, all images must share the first image's size.
+            mode (str): PIL mode every image is converted to (e.g. 'RGB', 'L').
+            max_workers (int): Number of decode workers. If None, uses the executor default.
+            use_processes (bool): Decode in a process pool instead of a thread pool (PIL releases the GIL while decoding, so threads are usually enough).
+
+        Returns:
+            np.ndarray: uint8 array of shape (N, H, W, C).
+
+        Raises:
+            RuntimeError: If there is an error reading an image or the image sizes don't match.
+        """
+        paths = source if isinstance(source, list) else self.list_image_files(source, pattern)
+        batches = self.iter_image_batches(paths, batch_size = max(len(paths), 1), size = size, mode = mode, max_workers = max_workers, use_processes = use_processes)
+        return next(batches, np.empty((0, 0, 0, Image.getmodebands(mode)), dtype = np.uint8))
+
+    def iter_image_batches(self, source, batch_size: int = 32, pattern: str = "*", size: tuple = None, mode: str = "RGB", max_workers: int = None, use_processes: bool = False):
+        """
+        Decodes a directory (or glob) of images in parallel, yielding preallocated (B, H, W, C) batches.
+
+        Parameters:
+            source (str | list[str]): A directory, a glob pattern, or a list of image paths.
+            batch_size (int): Number of images per batch (the last batch may be smaller).
+            pattern (str): Glob pattern applied inside source when it is a directory.
+            size (tuple): Optional (width, height) every image is resized to. If None, all images must share the first image's size.
+            mode (str): PIL mode every image is converted to (e.g. 'RGB', 'L').
+            max_workers (int): Number of decode workers. If None, uses the executor default.
+            use_processes (bool): Decode in a process pool instead of a thread pool.
+
+        Yields:
+            np.ndarray: uint8 array of shape (B, H, W, C).
+
+        Raises:
+            RuntimeError: If there is an error reading an image or the image sizes don't match.
+        """
+        paths = source if isinstance(source, list) else self.list_image_files(source, pattern)
+        if not paths:
+            return
+
+        # Without a target size every image has to match the first one, read from its header.
+        if size is None:
+            first_info = self.read_image_info(paths[0])
+            width, height = first_info['width'], first_info['height']
+        else:
+            width, height = size
+        batch_shape = (height, width, Image.getmodebands(mode))
+
+        # concurrent.futures pulls in multiprocessing and logging, so it's only imported when a batch is loaded.
+        from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers = max_workers) as executor:
+            for batch_start in range(0, len(paths), batch_size):
+                batch_paths = paths[batch_start:batch_start + batch_size]
+
+                # Preallocate the batch. Thread workers decode straight into their slot, process workers send the array back.
+                batch = np.empty((len(batch_paths),) + batch_shape, dtype = np.uint8)
+                if use_processes: futures = [executor.submit(_decode_image, path, size, mode) for path in batch_paths]
+                else: futures = [executor.submit(_decode_image_into, batch, slot, path, size, mode) for slot, path in enumerate(batch_paths)]
+
+                for slot, (path, future) in enumerate(zip(batch_paths, futures)):
+                    try:
+                        img_array = future.result()
+                        if use_processes: _copy_into_slot(batch, slot, img_array)
+                    except Exception as e:
+                        raise RuntimeError(f"an error occurred while reading the image {path}: {e}")
+                yield batch
+
+    @instrumentation.timed('FileDataProcessor.load_csv_to_dataframe', lambda df, self, filepath, *args, **kwargs: {'files': 1, 'bytes': _file_size(filepath), 'rows': len(df)})
+    def load_csv_to_dataframe(self, filepath, usecols = None, dtype = None, cache = None, optimize_memory: bool = False, schema: dict = None, progress_callback = None):
         """
         Loads a CSV file into a pandas DataFrame.
 
         Parameters:
             filepath (str): The path to the CSV file.
+            usecols (list[str] | None): Only read these columns. If None, reads every column.
+            dtype (dict | None): Optional dtype hints per column, passed through to pandas.
+            cache (bool | CsvCache | None): If True, uses the shared on-disk CsvCache, or pass a CsvCache
+                to use that one. Later loads of the unchanged file with the same options skip parsing.
+            optimize_memory (bool): Read low-cardinality strings as categoricals and parse dates (numbers
+                keep their full width), following the saved schema of the file if there is one, else one inferred from a sample.
+            schema (dict | None): Column types to apply (see infer_csv_schema). Implies optimize_memory.
+            progress_callback (callable): If given, the file is parsed in chunks and this is called as
+                progress_callback(bytes_read, total_bytes, rows) after each one. An exception it raises
+                (e.g. to cancel the load) propagates unchanged.
 
         Returns:
             pd.DataFrame: DataFrame containing the CSV data.
@@ -161,27 +410,732 @@ class FileDataProcessor():
         Raises:
             RuntimeError: If there is an error reading the CSV file.
         """
+        # Pick the column types up front, they are part of the read options the cache is keyed on.
+        if optimize_memory and schema is None:
+            schema = self.load_csv_schema(filepath) or self.infer_csv_schema(filepath)
+
+        # Serve unchanged files from the columnar cache.
+        if cache is True: cache = get_csv_cache()
+        read_options = {'usecols': usecols, 'dtype': dtype, 'schema': schema}
+        if cache:
+            df = cache.get(filepath, read_options)
+            if df is not None:
+                return df
+
+        # Categoricals are created by the parser, so the full-size string columns never exist.
+        read_dtype = dtype
+        if schema is not None:
+            read_dtype = {column: 'category' for column, kind in schema['columns'].items() if kind == 'category'}
+            read_dtype.update(dtype or {})
+            if usecols is not None: read_dtype = {column: value for column, value in read_dtype.items() if column in usecols}
+
+        if progress_callback is None:
+            try:
+                df = pd.read_csv(filepath, usecols = usecols, dtype = read_dtype)
+            except Exception as e:
+                raise RuntimeError(f"An error occurred while reading the csv: {e}")
+        else:
+            df = self._read_csv_with_progress(filepath, usecols, read_dtype, progress_callback)
+
+        # Parse dates in the loaded frame, leaving the columns the caller typed alone.
+        if schema is not None:
+            kept = {column: kind for column, kind in schema['columns'].items() if column not in (dtype or {})}
+            df = self.optimize_dataframe_memory(df, schema = {'columns': kept})
+
+        if cache:
+            cache.put(filepath, read_options, df)
+        return df
+
+    def _read_csv_with_progress(self, filepath, usecols, dtype, progress_callback, chunk_size: int = 100_000):
+
+        # Parse in chunks from an open file, its position tells how far the parser has read.
         try:
-            df = pd.read_csv(filepath)
-            return df
+            total_bytes = os.path.getsize(filepath)
+            file = open(filepath, 'rb')
+        except OSError as e:
+            raise RuntimeError(f"An error occurred while reading the csv: {e}")
+        chunks = []
+        rows = 0
+        with file:
+            try:
+                reader = pd.read_csv(file, chunksize = chunk_size, usecols = usecols, dtype = dtype)
+            except Exception as e:
+                raise RuntimeError(f"An error occurred while reading the csv: {e}")
+            with reader:
+                while True:
+                    try:
+                        chunk = next(reader)
+                    except StopIteration:
+                        break
+                    except Exception as e:
+                        raise RuntimeError(f"An error occurred while reading the csv: {e}")
+                    chunks.append(chunk)
+                    rows += len(chunk)
+
+                    # Outside the try, so an exception from the callback isn't reported as a read error.
+                    progress_callback(file.tell(), total_bytes, rows)
+
+        # A file with only a header gives no chunks, read its columns.
+        if not chunks:
+            try:
+                return pd.read_csv(filepath, nrows = 0, usecols = usecols, dtype = dtype)
+            except Exception as e:
+                raise RuntimeError(f"An error occurred while reading the csv: {e}")
+
+        df = pd.concat(chunks, ignore_index = True)
+
+        # Chunks with different category sets concatenate to plain text, restore the categoricals.
+        for column in chunks[0].columns:
+            if isinstance(chunks[0][column].dtype, pd.CategoricalDtype) and not isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype('category')
+        return df
+
+    def list_csv_files(self, source, pattern: str = "*.csv") -> list[str]:
+        """
+        Lists the CSV files of a directory or glob, sorted by path.
+
+        Parameters:
+            source (str): A directory, or a glob pattern such as "shards/2025-*.csv".
+            pattern (str): Glob pattern applied inside source when it is a directory.
+
+        Returns:
+            list[str]: The CSV file paths.
+        """
+        if os.path.isdir(source): paths = glob.glob(os.path.join(source, pattern))
+        else: paths = glob.glob(source)
+        return sorted(path for path in paths if os.path.isfile(path))
+
+    @instrumentation.timed('FileDataProcessor.load_csvs_to_dataframe', lambda df, *args, **kwargs: {'rows': len(df)})
+    def load_csvs_to_dataframe(self, source, pattern: str = "*.csv", max_workers: int = None, use_processes: bool = True, check_schema: bool = True, progress_callback = None, **read_csv_kwargs):
+        """
+        Parses many CSV files of the same layout in parallel and concatenates them, in path order, into one DataFrame.
+
+        Parameters:
+            source (str | list[str]): A directory, a glob pattern, or a list of CSV paths.
+            pattern (str): Glob pattern applied inside source when it is a directory.
+            max_workers (int): Number of parser workers. If None, uses the executor default (one per core).
+            use_processes (bool): Parse in a process pool (the csv parser holds the GIL for part of its work, so threads scale poorly).
+            check_schema (bool): Require every file to have the first file's columns, and numeric columns to stay numeric.
+            progress_callback (callable): Called as progress_callback(files_done, files_total, path) as each file finishes.
+                An exception it raises (e.g. to cancel the load) propagates unchanged.
+            **read_csv_kwargs: Keyword arguments passed to pd.read_csv for every file (usecols, dtype, ...).
+
+        Returns:
+            pd.DataFrame: The rows of every file, with a fresh RangeIndex.
+
+        Raises:
+            RuntimeError: If a file can't be read or doesn't match the schema of the first file.
+        """
+        paths = source if isinstance(source, list) else self.list_csv_files(source, pattern)
+        if not paths:
+            raise RuntimeError(f"an error occurred while loading the csv files: no csv files found in {source}")
+
+        # Parse every file concurrently, keeping the frames in path order for the concat.
+        frames = [None] * len(paths)
+        from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers = max_workers) as executor:
+            futures = {executor.submit(_read_csv_shard, path, read_csv_kwargs): slot for slot, path in enumerate(paths)}
+            try:
+                for files_done, future in enumerate(as_completed(futures), start = 1):
+                    slot = futures[future]
+                    try:
+                        frames[slot] = future.result()
+                    except Exception as e:
+                        raise RuntimeError(f"an error occurred while reading the csv {paths[slot]}: {e}")
+                    if progress_callback is not None:
+                        progress_callback(files_done, len(paths), paths[slot])
+            except BaseException:
+                # On an error (or a cancel raised by the callback) don't start parsing the files still queued.
+                for pending in futures: pending.cancel()
+                raise
+
+        if check_schema:
+            for path, frame in zip(paths[1:], frames[1:]):
+                self._check_csv_schema(frames[0], frame, paths[0], path)
+
+        # One concat allocates the result once, instead of growing it file by file.
+        try:
+            return pd.concat(frames, ignore_index = True)
+        except Exception as e:
+            raise RuntimeError(f"an error occurred while concatenating the csv files: {e}")
+
+    @staticmethod
+    def _check_csv_schema(reference, frame, reference_path, path) -> None:
+        # Columns must match exactly, dtypes only by family (a shard with missing values turns ints into floats).
+        if list(frame.columns) != list(reference.columns):
+            missing = [str(column) for column in reference.columns if column not in frame.columns]
+            extra = [str(column) for column in frame.columns if column not in reference.columns]
+            raise RuntimeError(f"csv schema mismatch: {path} doesn't have the columns of {reference_path} (missing: {missing}, extra: {extra}, or reordered)")
+        for column in reference.columns:
+            if pd.api.types.is_numeric_dtype(reference[column]) != pd.api.types.is_numeric_dtype(frame[column]):
+                # An entirely empty column parses as float, that isn't a conflict.
+                if reference[column].isna().all() or frame[column].isna().all():
+                    continue
+                raise RuntimeError(f"csv schema mismatch: column {column} of {path} is {frame[column].dtype}, but {reference[column].dtype} in {reference_path}")
+
+    def iter_csv_chunks(self, filepath, chunk_size: int = 100_000, usecols = None, dtype = None, **read_csv_kwargs):
+        """
+        Streams a CSV file as a sequence of DataFrame chunks so files larger than memory can be processed.
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+            chunk_size (int): Number of rows per chunk.
+            usecols (list[str] | None): Only read these columns. If None, reads every column.
+            dtype (dict | None): Optional dtype hints per column, passed through to pandas.
+            **read_csv_kwargs: Any other keyword arguments accepted by pd.read_csv.
+
+        Yields:
+            pd.DataFrame: The next chunk of at most chunk_size rows.
+
+        Raises:
+            RuntimeError: If there is an error reading the CSV file.
+        """
+        try:
+            reader = pd.read_csv(filepath, chunksize = chunk_size, usecols = usecols, dtype = dtype, **read_csv_kwargs)
         except Exception as e:
             raise RuntimeError(f"An error occurred while reading the csv: {e}")
 
-    def remove_keys_from_json(self, data, keys_to_remove):
+        # Close the underlying file even if the caller stops iterating early.
+        with reader:
+            while True:
+                try:
+                    chunk = next(reader)
+                except StopIteration:
+                    return
+                except Exception as e:
+                    raise RuntimeError(f"An error occurred while reading the csv: {e}")
+                yield chunk
+
+    def preview_csv(self, filepath, nrows: int = 1_000, usecols = None, dtype = None):
+        """
+        Loads only the first rows of a CSV file.
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+            nrows (int): Number of data rows to read.
+            usecols (list[str] | None): Only read these columns. If None, reads every column.
+            dtype (dict | None): Optional dtype hints per column, passed through to pandas.
+
+        Returns:
+            pd.DataFrame: DataFrame containing the first nrows rows.
+
+        Raises:
+            RuntimeError: If there is an error reading the CSV file.
+        """
+        try:
+            return pd.read_csv(filepath, nrows = nrows, usecols = usecols, dtype = dtype)
+        except Exception as e:
+            raise RuntimeError(f"An error occurred while reading the csv: {e}")
+
+    def count_csv_rows(self, filepath, chunk_size: int = 1_000_000) -> int:
+        """
+        Counts the data rows of a CSV file without loading it. Only the first column is parsed, so
+        memory use stays bounded by chunk_size and quoted fields containing newlines are counted correctly.
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+            chunk_size (int): Number of rows parsed per chunk.
+
+        Returns:
+            int: Number of data rows (the header is not counted).
+
+        Raises:
+            RuntimeError: If there is an error reading the CSV file.
+        """
+        return sum(len(chunk) for chunk in self.iter_csv_chunks(filepath, chunk_size, usecols = [0], dtype = str))
+
+    @instrumentation.timed('FileDataProcessor.export_dataframe', lambda summary, *args, **kwargs: {'rows': summary['rows'], 'bytes': summary['bytes']})
+    def export_dataframe(self, df, filepath, file_format: str = None, chunk_size: int = 100_000, progress_callback = None) -> dict:
+        """
+        Writes a DataFrame to CSV, gzip compressed CSV, Parquet or Feather, chunk_size rows at a time, so only
+        one chunk is ever converted to text (or Arrow) at once instead of a second copy of the whole frame.
+        The file is written under a temporary name and renamed when complete.
+
+        Parameters:
+            df (pd.DataFrame): The DataFrame to write.
+            filepath (str): Where to write it.
+            file_format (str): 'csv', 'csv.gz', 'parquet' or 'feather'. If None, it is taken from the extension (csv if unknown).
+            chunk_size (int): Number of rows converted and written per chunk.
+            progress_callback (callable): Called as progress_callback(rows_written, total_rows) after each chunk.
+
+        Returns:
+            dict: path, file_format, rows, bytes (size of the written file) and seconds.
+
+        Raises:
+            RuntimeError: If the file can't be written (or pyarrow is missing for Parquet / Feather).
+        """
+        if file_format is None:
+            file_format = next((name for extension, name in EXPORT_FORMATS if filepath.lower().endswith(extension)), 'csv')
+        if file_format not in ('csv', 'csv.gz', 'parquet', 'feather'):
+            raise RuntimeError(f"an error occurred while exporting the dataframe: unknown format {file_format}")
+
+        start = time.perf_counter()
+        try:
+            temp_path = _create_temp_file(os.path.abspath(filepath))
+        except OSError as e:
+            raise RuntimeError(f"an error occurred while exporting the dataframe: {e}")
+        try:
+            if file_format in ('csv', 'csv.gz'): self._export_csv(df, temp_path, file_format == 'csv.gz', chunk_size, progress_callback)
+            else: self._export_arrow(df, temp_path, file_format, chunk_size, progress_callback)
+            os.replace(temp_path, filepath)
+        except ImportError:
+            raise RuntimeError(f"an error occurred while exporting the dataframe: {file_format} export needs pyarrow (pip install pyarrow)")
+        except Exception as e:
+            raise RuntimeError(f"an error occurred while exporting the dataframe: {e}")
+        finally:
+            if os.path.exists(temp_path): os.remove(temp_path)
+
+        return {'path': filepath, 'file_format': file_format, 'rows': len(df), 'bytes': os.path.getsize(filepath), 'seconds': time.perf_counter() - start}
+
+    @staticmethod
+    def _export_csv(df, path, compress, chunk_size, progress_callback):
+        # Each chunk is formatted straight into the (compressed) file, the header only with the first one.
+        with (gzip.open(path, 'wt', encoding = 'utf-8', newline = '', compresslevel = 6) if compress else open(path, 'w', encoding = 'utf-8', newline = '')) as file:
+            if len(df) == 0:
+                df.to_csv(file, index = False)
+            for chunk_start in range(0, len(df), chunk_size):
+                df.iloc[chunk_start:chunk_start + chunk_size].to_csv(file, header = chunk_start == 0, index = False)
+                if progress_callback is not None: progress_callback(min(chunk_start + chunk_size, len(df)), len(df))
+
+    @staticmethod
+    def _export_arrow(df, path, file_format, chunk_size, progress_callback):
+        # Convert and write one chunk at a time, every chunk is cast to one schema inferred from the whole
+        # frame (a text column that is all None in the first chunk is still a string column).
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.Schema.from_pandas(df, preserve_index = False)
+        if file_format == 'parquet': writer = pq.ParquetWriter(path, schema, compression = 'snappy')
+        else: writer = pa.ipc.new_file(path, schema, options = pa.ipc.IpcWriteOptions(compression = 'lz4'))
+        with writer:
+            for chunk_start in range(0, len(df), chunk_size):
+                table = pa.Table.from_pandas(df.iloc[chunk_start:chunk_start + chunk_size], schema = schema, preserve_index = False)
+                writer.write_table(table)
+                if progress_callback is not None: progress_callback(min(chunk_start + chunk_size, len(df)), len(df))
+
+    def infer_csv_schema(self, filepath, sample_rows: int = 10_000, categorical_threshold: float = 0.5) -> dict:
+        """
+        Infers memory-saving column types for a CSV file from its first rows (see optimize_dataframe_memory).
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+            sample_rows (int): Number of data rows sampled.
+            categorical_threshold (float): Text columns whose share of distinct values is at most this become categoricals.
+
+        Returns:
+            dict: {'columns': {column: kind}} with kind one of 'category', 'datetime', 'integer', 'float', 'bool' or 'string'.
+
+        Raises:
+            RuntimeError: If there is an error reading the CSV file.
+        """
+        sample = self.preview_csv(filepath, nrows = sample_rows)
+        return {'columns': {str(column): self._infer_column_kind(sample[column], categorical_threshold) for column in sample.columns}}
+
+    @staticmethod
+    def _infer_column_kind(column, categorical_threshold: float) -> str:
+        # Classify one column, text is checked for dates before cardinality.
+        types = pd.api.types
+        if types.is_bool_dtype(column): return 'bool'
+        if types.is_integer_dtype(column): return 'integer'
+        if types.is_float_dtype(column):
+            # Integers with missing values load as floats, keep them floats.
+            return 'float'
+        if types.is_datetime64_any_dtype(column): return 'datetime'
+
+        values = column.dropna()
+        if len(values) == 0:
+            return 'string'
+
+        # Only try parsing text that looks like dates, pandas would happily read "2024" as a year.
+        text = values.astype(str)
+        if text.str.contains(r'^\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}', regex = True).all():
+            try:
+                pd.to_datetime(text, format = 'ISO8601')
+                return 'datetime'
+            except (ValueError, TypeError):
+                pass
+
+        if values.nunique() <= categorical_threshold * len(values):
+            return 'category'
+        return 'string'
+
+    def optimize_dataframe_memory(self, df, schema: dict = None, categorical_threshold: float = 0.5, parse_dates: bool = True):
+        """
+        Converts the columns of a DataFrame to smaller types: low-cardinality text to categoricals and
+        date text to datetimes. Integers and floats are left at full width, so arithmetic on the
+        optimized frame gives the same results as on the original.
+
+        Parameters:
+            df (pd.DataFrame): The DataFrame to optimize.
+            schema (dict | None): Column types to apply (see infer_csv_schema). If None, they are inferred from the whole frame.
+            categorical_threshold (float): Used when inferring, text columns whose share of distinct values is at most this become categoricals.
+            parse_dates (bool): Convert date text to datetimes.
+
+        Returns:
+            pd.DataFrame: A DataFrame with the converted columns.
+        """
+        if schema is None:
+            schema = {'columns': {column: self._infer_column_kind(df[column], categorical_threshold) for column in df.columns}}
+
+        converted = {}
+        for column, kind in schema['columns'].items():
+            if column not in df.columns:
+                continue
+            values = df[column]
+            try:
+                if kind == 'category' and not isinstance(values.dtype, pd.CategoricalDtype):
+                    converted[column] = values.astype('category')
+                # Integers keep their 64-bit signed type, smaller types would silently wrap in expressions
+                # like "Quantity * 100" and change the results of queries and summaries.
+                elif kind == 'datetime' and parse_dates and not pd.api.types.is_datetime64_any_dtype(values):
+                    converted[column] = pd.to_datetime(values, format = 'ISO8601')
+            except (ValueError, TypeError):
+                # Rows beyond the sample that don't fit the inferred type leave the column as it is.
+                continue
+
+        if not converted:
+            return df
+
+        # Shallow copy, the columns that weren't converted are shared with the input.
+        df = df.copy(deep = False)
+        for column, values in converted.items():
+            df[column] = values
+        return df
+
+    @staticmethod
+    def dataframe_memory_usage(df) -> int:
+        """
+        Returns the memory used by a DataFrame, including the contents of text columns.
+
+        Parameters:
+            df (pd.DataFrame): The DataFrame.
+
+        Returns:
+            int: Size in bytes.
+        """
+        return int(df.memory_usage(index = True, deep = True).sum())
+
+    def save_csv_schema(self, filepath, schema: dict) -> str:
+        """
+        Records the column types of a CSV file next to it, so later optimized loads skip the sample pass.
+        The modification time and size of the file are recorded with them, editing the file makes the
+        schema stale.
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+            schema (dict): The column types (see infer_csv_schema).
+
+        Returns:
+            str: The path of the schema file.
+
+        Raises:
+            RuntimeError: If the schema file can't be written.
+        """
+        schema_path = filepath + SCHEMA_SUFFIX
+        try:
+            source = self._csv_state(filepath)
+            with open(schema_path, 'w', encoding = 'utf-8') as file:
+                json.dump({'source': source, 'columns': {str(column): kind for column, kind in schema['columns'].items()}}, file, indent = 2)
+        except OSError as e:
+            raise RuntimeError(f"an error occurred while saving the csv schema: {e}")
+        return schema_path
+
+    def load_csv_schema(self, filepath):
+        """
+        Returns the column types recorded by save_csv_schema for a CSV file.
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+
+        Returns:
+            dict | None: The schema, or None if no (readable) schema exists or the file changed since it was saved.
+        """
+        try:
+            with open(filepath + SCHEMA_SUFFIX, 'r', encoding = 'utf-8') as file:
+                schema = json.load(file)
+
+            # Like the csv cache, the schema only applies to the version of the file it was inferred from.
+            if schema.get('source') != self._csv_state(filepath):
+                return None
+            return {'columns': dict(schema['columns'])}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    @staticmethod
+    def _csv_state(filepath) -> dict:
+        # The modification time and size identify a version of a file (raises OSError if it is missing).
+        stat = os.stat(filepath)
+        return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def save_column_projection(self, filepath, columns) -> str:
+        """
+        Records which columns of a CSV file to keep, next to the file, so later loads can read only those
+        columns (see load_column_projection).
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+            columns (list[str]): The columns to keep.
+
+        Returns:
+            str: The path of the projection file.
+
+        Raises:
+            RuntimeError: If the projection file can't be written.
+        """
+        projection_path = filepath + PROJECTION_SUFFIX
+        try:
+            with open(projection_path, 'w', encoding = 'utf-8') as file:
+                json.dump({'usecols': [str(column) for column in columns]}, file, indent = 2)
+        except OSError as e:
+            raise RuntimeError(f"an error occurred while saving the column projection: {e}")
+        return projection_path
+
+    def load_column_projection(self, filepath):
+        """
+        Returns the columns recorded by save_column_projection for a CSV file.
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+
+        Returns:
+            list[str] | None: The recorded columns that still exist in the file, or None if no (readable) projection exists.
+        """
+        try:
+            with open(filepath + PROJECTION_SUFFIX, 'r', encoding = 'utf-8') as file:
+                usecols = set(json.load(file)['usecols'])
+
+            # Drop columns that have disappeared from the file since the projection was saved.
+            header = pd.read_csv(filepath, nrows = 0).columns
+            return [column for column in header if column in usecols] or None
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def clear_column_projection(self, filepath) -> None:
+        """
+        Deletes the recorded column projection of a CSV file, if there is one.
+
+        Parameters:
+            filepath (str): The path to the CSV file.
+        """
+        try:
+            os.remove(filepath + PROJECTION_SUFFIX)
+        except FileNotFoundError:
+            pass
+
+    @instrumentation.timed('FileDataProcessor.remove_keys_from_json', lambda data, *args, **kwargs: {'records': len(data) if isinstance(data, list) else 1})
+    def remove_keys_from_json(self, data, keys_to_remove, in_place: bool = True, keep_keys = None):
         """
         Removes specified keys from each dictionary in a list.
 
+        Keys containing dots (e.g. "user.address.zip") also remove the nested key, descending through
+        dictionaries and lists. The key set is prepared once, not per record.
+
         Parameters:
-        - data: list of dictionaries (JSON-like)
+        - data: list (or any iterable) of dictionaries (JSON-like)
         - keys_to_remove: list of keys to be removed from each dictionary
+        - in_place: if True the dictionaries are modified, otherwise new dictionaries are built
+          with a dict comprehension and the input is left untouched
+        - keep_keys: optional list of the only top-level keys to keep, every other top-level key is
+          dropped (keys_to_remove, top-level and nested, still apply)
 
         Returns:
         - The cleaned list of dictionaries
         """
-        for item in data:
-            for key in keys_to_remove:
-                item.pop(key, None)  # Safely remove key if it exists.
-        return data
+        drop_keys = tuple(frozenset(keys_to_remove))
+
+        # Plain top-level removal in place is the original loop, kept inline so it adds no call per record.
+        if in_place and keep_keys is None and isinstance(data, list) and not any('.' in key for key in drop_keys):
+            for item in data:
+                for key in drop_keys:
+                    item.pop(key, None)  # Safely remove key if it exists.
+            return data
+
+        scrub = self._json_scrubber(keys_to_remove, in_place, keep_keys)
+
+        # In place with nothing to build, the original list is returned like before.
+        if in_place and keep_keys is None and isinstance(data, list):
+            for item in data:
+                scrub(item)
+            return data
+        return [scrub(item) for item in data]
+
+    def _json_scrubber(self, keys_to_remove, in_place: bool = True, keep_keys = None):
+        # Build a function that cleans one record, with the key sets and nested paths prepared up front.
+        drop_keys = frozenset(keys_to_remove)
+        drop_tuple = tuple(drop_keys)
+        nested_paths = [tuple(key.split('.')) for key in keys_to_remove if '.' in key]
+        # Removals apply to the kept keys too, so keep_keys never brings back a key that was asked to be removed.
+        keep = tuple(key for key in keep_keys if key not in drop_keys) if keep_keys is not None else None
+
+        def remove_path(node, parts):
+            # Walk the dotted path, applying it to every element when a list is reached. When not working
+            # in place, containers along the path are copied before changing them so the input stays intact.
+            if isinstance(node, list):
+                if not in_place:
+                    return [remove_path(element, parts) for element in node]
+                for element in node:
+                    remove_path(element, parts)
+            elif isinstance(node, dict) and parts[0] in node:
+                if len(parts) == 1:
+                    if not in_place: node = dict(node)
+                    del node[parts[0]]
+                else:
+                    child = remove_path(node[parts[0]], parts[1:])
+                    if child is not node[parts[0]]:
+                        node = dict(node)
+                        node[parts[0]] = child
+            return node
+
+        # Top-level step: project onto the kept keys, pop in place, or rebuild without the dropped keys.
+        if keep is not None:
+            def top_level(item):
+                return {key: item[key] for key in keep if key in item}
+        elif in_place:
+            def top_level(item):
+                for key in drop_tuple:
+                    item.pop(key, None)  # Safely remove key if it exists.
+                return item
+        else:
+            def top_level(item):
+                return {key: value for key, value in item.items() if key not in drop_keys}
+
+        if not nested_paths:
+            return top_level
+
+        def scrub(item):
+            item = top_level(item)
+            for parts in nested_paths:
+                item = remove_path(item, parts)
+            return item
+
+        return scrub
+
+    @instrumentation.timed('FileDataProcessor.stream_remove_keys_from_json', lambda written, self, input_path, *args, **kwargs: {'records': written, 'bytes': _file_size(input_path)})
+    def stream_remove_keys_from_json(self, input_path, output_path, keys_to_remove, keep_keys = None, file_format: str = None, buffer_size: int = 1024 ** 2) -> int:
+        """
+        Removes keys from every record of a JSON array or JSON Lines file, reading and writing
+        incrementally so the file never has to fit in memory.
+
+        Parameters:
+        - input_path: path of a JSON file holding an array of objects, or a JSON Lines file
+        - output_path: path the cleaned records are written to, in the same format
+        - keys_to_remove: list of keys (dotted for nested keys) to remove from each record
+        - keep_keys: optional list of the only top-level keys to keep (see remove_keys_from_json)
+        - file_format: 'json' or 'jsonl', if None it is detected from the first character of the file
+        - buffer_size: number of characters read at a time
+
+        Returns:
+        - The number of records written
+
+        Raises:
+        - RuntimeError: If there is an error reading or writing the files.
+        """
+        scrub_record = self._json_scrubber(keys_to_remove, in_place = True, keep_keys = keep_keys)
+        count = 0
+
+        # Array elements that aren't objects are written through unchanged.
+        def scrub(record):
+            return scrub_record(record) if isinstance(record, dict) else record
+
+        try:
+            with open(input_path, 'r', encoding = 'utf-8') as source, open(output_path, 'w', encoding = 'utf-8') as target:
+
+                # A file starting with '[' is a JSON array, anything else is read as JSON Lines.
+                if file_format is None:
+                    first = source.read(buffer_size)
+                    file_format = 'json' if first.lstrip().startswith('[') else 'jsonl'
+                    source.seek(0)
+
+                if file_format == 'jsonl':
+                    for line in source:
+                        if line.strip():
+                            target.write(json.dumps(scrub(json.loads(line)), ensure_ascii = False))
+                            target.write("\n")
+                            count += 1
+                    return count
+
+                target.write("[")
+                for record in self._iter_json_array(source, buffer_size):
+                    target.write(",\n" if count else "\n")
+                    target.write(json.dumps(scrub(record), ensure_ascii = False))
+                    count += 1
+                target.write("\n]\n")
+            return count
+        except Exception as e:
+            raise RuntimeError(f"an error occurred while processing the json: {e}")
+
+    @staticmethod
+    def _iter_json_array(source, buffer_size: int):
+        # Yield the elements of a top-level JSON array one at a time, decoding from a sliding text buffer.
+        # The buffer is only compacted when it is refilled, so each element is decoded without copying the rest.
+        decoder = json.JSONDecoder()
+        buffer = source.read(buffer_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError("json file does not contain an array")
+        position = 1
+        eof = False
+
+        def refill(buffer, position):
+            more = source.read(buffer_size)
+            return buffer[position:] + more, 0, not more
+
+        def skip_whitespace(buffer, position, eof):
+            # Move to the next non-whitespace character, refilling the buffer as needed.
+            while True:
+                while position < len(buffer) and buffer[position] in ' \t\r\n':
+                    position += 1
+                if position < len(buffer) or eof:
+                    break
+                buffer, position, eof = refill(buffer, position)
+            if position >= len(buffer):
+                raise ValueError("unexpected end of json array")
+            return buffer, position, eof
+
+        def check_end(buffer, position):
+            # Only whitespace may follow the closing ']'.
+            rest = buffer[position + 1:]
+            while True:
+                if rest.strip():
+                    raise ValueError("unexpected data after the json array")
+                rest = source.read(buffer_size)
+                if not rest:
+                    return
+
+        # An empty array ends right away, every other element follows the '[' or exactly one ','.
+        buffer, position, eof = skip_whitespace(buffer, position, eof)
+        if buffer[position] == ']':
+            check_end(buffer, position)
+            return
+
+        while True:
+
+            # Decode the next element, reading more if it is cut off at the end of the buffer.
+            while True:
+                try:
+                    record, end = decoder.raw_decode(buffer, position)
+                    # The element is only complete when a ',' or ']' follows it. A number cut off by the
+                    # end of the buffer (e.g. '1' of '1.5') decodes too, but may continue in the next read.
+                    following = end
+                    while following < len(buffer) and buffer[following] in ' \t\r\n':
+                        following += 1
+                    if eof or (following < len(buffer) and buffer[following] in ',]'):
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                buffer, position, eof = refill(buffer, position)
+            position = end
+            yield record
+
+            # Exactly one ',' (followed by another element) or the closing ']' must come next.
+            buffer, position, eof = skip_whitespace(buffer, position, eof)
+            if buffer[position] == ']':
+                check_end(buffer, position)
+                return
+            if buffer[position] != ',':
+                raise ValueError(f"expected ',' or ']' after an array element, found {buffer[position]!r}")
+            buffer, position, eof = skip_whitespace(buffer, position + 1, eof)
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,466 @@
+import os
+import io
+import copy
+import json
+import tempfile
+import unittest
+from unittest import mock
+import importlib.util
+import numpy as np
+import pandas as pd
+from PIL import Image
+from my_little_snake_helpers.file_data_processor import FileDataProcessor
+from my_little_snake_helpers.dataframe_filter import DataFrameFilter
+from my_little_snake_helpers.dataframe_summary import SummaryEngine
+
+HAVE_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+def make_records(count: int) -> list[dict]:
+    # Export-like records: flat fields and a nested object with a list.
+    return [{'id': i, 'name': f"user {i}", 'email': f"user{i}@example.com", 'score': i * 0.25, 'active': i % 2 == 0,
+             'meta': {'ip': f"10.0.0.{i % 256}", 'source': "import", 'tags': [{'tag': "a", 'ip': "x"}]}} for i in range(count)]
+
+
+class RemoveKeysFromJsonTest(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = FileDataProcessor()
+
+    def test_top_level_in_place(self):
+        data = make_records(3)
+        result = self.processor.remove_keys_from_json(data, ['email', 'email', 'missing'])
+        self.assertIs(result, data)
+        self.assertTrue(all('email' not in record for record in data))
+        self.assertEqual(data[0]['name'], "user 0")
+
+    def test_nested_paths(self):
+        data = make_records(2)
+        self.processor.remove_keys_from_json(data, ['meta.ip', 'meta.tags.ip'])
+        self.assertEqual(data[1]['meta'], {'source': "import", 'tags': [{'tag': "a"}]})
+
+    def test_copy_leaves_input_untouched(self):
+        data = make_records(2)
+        original = copy.deepcopy(data)
+        result = self.processor.remove_keys_from_json(data, ['name', 'meta.ip', 'meta.tags.ip'], in_place = False)
+        self.assertEqual(data, original)
+        self.assertNotIn('name', result[0])
+        self.assertEqual(result[0]['meta'], {'source': "import", 'tags': [{'tag': "a"}]})
+
+    def test_keep_keys(self):
+        data = make_records(2)
+        result = self.processor.remove_keys_from_json(data, ['meta.ip'], keep_keys = ['id', 'meta', 'absent'])
+        self.assertEqual(result[0], {'id': 0, 'meta': {'source': "import", 'tags': [{'tag': "a", 'ip': "x"}]}})
+
+    def test_removals_apply_to_kept_keys(self):
+        for in_place in (True, False):
+            with self.subTest(in_place = in_place):
+                result = self.processor.remove_keys_from_json(make_records(2), ['name', 'meta.ip'], in_place = in_place, keep_keys = ['id', 'name', 'meta'])
+                self.assertEqual(result[1], {'id': 1, 'meta': {'source': "import", 'tags': [{'tag': "a", 'ip': "x"}]}})
+        self.assertEqual(self.processor.remove_keys_from_json([{'a': 1, 'b': 2, 'c': 3}], ['a'], keep_keys = ['a', 'b']), [{'b': 2}])
+
+
+class StreamRemoveKeysFromJsonTest(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = FileDataProcessor()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, text: str, name: str = 'input.json') -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding = 'utf-8') as file:
+            file.write(text)
+        return path
+
+    def stream(self, text: str, keys = (), buffer_size: int = 1024 ** 2, **kwargs):
+        input_path = self.write(text)
+        output_path = os.path.join(self.directory.name, 'output.json')
+        count = self.processor.stream_remove_keys_from_json(input_path, output_path, list(keys), buffer_size = buffer_size, **kwargs)
+        with open(output_path, encoding = 'utf-8') as file:
+            output = file.read()
+        return count, output
+
+    def test_array_matches_in_memory_removal(self):
+        records = make_records(50)
+        count, output = self.stream(json.dumps(records, indent = 1), ['email', 'meta.ip'], buffer_size = 64)
+        self.assertEqual(count, 50)
+        self.assertEqual(json.loads(output), self.processor.remove_keys_from_json(records, ['email', 'meta.ip']))
+
+    def test_json_lines(self):
+        records = make_records(5)
+        text = "\n".join(json.dumps(record) for record in records) + "\n\n"
+        count, output = self.stream(text, ['meta'])
+        self.assertEqual(count, 5)
+        self.assertEqual([json.loads(line) for line in output.splitlines()], [{key: value for key, value in record.items() if key != 'meta'} for record in records])
+
+    def test_numbers_cut_by_the_buffer(self):
+        # Every buffer size, so each number is split at every position.
+        documents = ['[1.5]', '[12.25,3]', '[ 1 ] \n', '[1e10]', '[ -0.5 , 2E-3 ,7 ]', '[1, "a", null, true, {"n": 10.75}, [2.5]]', '[]']
+        for document in documents:
+            for buffer_size in range(1, len(document) + 2):
+                with self.subTest(document = document, buffer_size = buffer_size):
+                    count, output = self.stream(document, buffer_size = buffer_size)
+                    self.assertEqual(json.loads(output), json.loads(document))
+                    self.assertEqual(count, len(json.loads(document)))
+
+    def test_iter_json_array_small_buffer(self):
+        records = make_records(20)
+        source = io.StringIO(json.dumps(records))
+        self.assertEqual(list(FileDataProcessor._iter_json_array(source, 7)), records)
+
+    def test_truncated_array_raises(self):
+        for document in ['[1.5', '[{"a": 1}', '[1,']:
+            for buffer_size in (1, 3, 1024):
+                with self.subTest(document = document, buffer_size = buffer_size):
+                    with self.assertRaises(RuntimeError):
+                        self.stream(document, buffer_size = buffer_size)
+
+    def test_malformed_separators_raise(self):
+        for document in ['[1 2, {}]', '[{"a": 1} {"b": 2}]', '[1,,2]', '[,1]', '[1,]', '[1;2]', '[1]]', '[] x']:
+            for buffer_size in (1, 3, 1024):
+                with self.subTest(document = document, buffer_size = buffer_size):
+                    with self.assertRaises(RuntimeError):
+                        self.stream(document, buffer_size = buffer_size)
+
+    def test_not_an_array_raises(self):
+        with self.assertRaises(RuntimeError):
+            self.stream('{"a": 1}', file_format = 'json')
+
+    def test_keep_keys_and_removals(self):
+        count, output = self.stream(json.dumps([{'a': 1, 'b': 2, 'c': 3}]), ['a'], keep_keys = ['a', 'b'])
+        self.assertEqual(json.loads(output), [{'b': 2}])
+
+
+class CsvChunksTest(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = FileDataProcessor()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = self.write('data.csv', "id,name,price\n" + "".join(f"{i},name {i},{i / 4}\n" for i in range(250)))
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', newline = '') as file:
+            file.write(text)
+        return path
+
+    def test_chunks_match_read_csv(self):
+        chunks = list(self.processor.iter_csv_chunks(self.path, chunk_size = 100))
+        self.assertEqual([len(chunk) for chunk in chunks], [100, 100, 50])
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index = True), pd.read_csv(self.path))
+
+    def test_usecols_dtype_and_read_csv_options(self):
+        chunks = list(self.processor.iter_csv_chunks(self.path, chunk_size = 1000, usecols = ['id', 'price'], dtype = {'id': str}, nrows = 5))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(list(chunks[0].columns), ['id', 'price'])
+        self.assertEqual(chunks[0]['id'].tolist(), ["0", "1", "2", "3", "4"])
+
+    def test_stopping_early(self):
+        chunks = self.processor.iter_csv_chunks(self.path, chunk_size = 10)
+        self.assertEqual(len(next(chunks)), 10)
+        chunks.close()
+
+    def test_errors_are_wrapped(self):
+        bad_row = self.write('bad.csv', "id,name\n1,a\n2,b,extra,fields\n")
+        for path, kwargs in ((os.path.join(self.directory, 'missing.csv'), {}), (self.path, {'usecols': ['missing']}), (bad_row, {})):
+            with self.subTest(path = os.path.basename(path), **kwargs):
+                with self.assertRaises(RuntimeError):
+                    list(self.processor.iter_csv_chunks(path, chunk_size = 100, **kwargs))
+
+    def test_count_rows(self):
+        self.assertEqual(self.processor.count_csv_rows(self.path, chunk_size = 64), 250)
+        self.assertEqual(self.processor.count_csv_rows(self.write('header.csv', "id,name\n")), 0)
+
+        # Newlines inside quoted fields don't start rows, a last row without a newline still counts.
+        self.assertEqual(self.processor.count_csv_rows(self.write('quoted.csv', 'id,note\n1,"two\nlines"\n2,"x\r\ny"\n3,last')), 3)
+
+        with self.assertRaises(RuntimeError):
+            self.processor.count_csv_rows(os.path.join(self.directory, 'missing.csv'))
+
+
+class LoadCsvProgressTest(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = FileDataProcessor()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = self.write('data.csv', "id,name\n" + "".join(f"{i},name {i}\n" for i in range(250)))
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as file:
+            file.write(text)
+        return path
+
+    def load(self, path, progress = None, usecols = None):
+        return self.processor._read_csv_with_progress(path, usecols, None, progress or (lambda *args: None), chunk_size = 100)
+
+    def test_progress(self):
+        progress = []
+        df = self.load(self.path, lambda done, total, rows: progress.append((done, total, rows)))
+        self.assertEqual(len(df), 250)
+        self.assertEqual([rows for _, _, rows in progress], [100, 200, 250])
+        self.assertEqual(progress[-1][:2], (os.path.getsize(self.path),) * 2)
+
+    def test_header_only(self):
+        self.assertEqual(list(self.load(self.write('header.csv', "id,name\n")).columns), ['id', 'name'])
+
+    def test_errors_are_wrapped(self):
+        for path, kwargs in ((os.path.join(self.directory, 'missing.csv'), {}), (self.write('empty.csv', ""), {}),
+                             (self.path, {'usecols': ['missing']}), (self.write('header.csv', "id,name\n"), {'usecols': ['missing']})):
+            with self.subTest(path = os.path.basename(path), **kwargs):
+                with self.assertRaises(RuntimeError):
+                    self.load(path, **kwargs)
+
+    def test_callback_exception_propagates(self):
+        class Cancelled(Exception):
+            pass
+
+        def cancel(*args):
+            raise Cancelled()
+
+        with self.assertRaises(Cancelled):
+            self.load(self.path, cancel)
+
+
+class OptimizeMemoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = FileDataProcessor()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'sales.csv')
+        pd.DataFrame({
+            'Date': ["2024-06-02", "2025-03-16", "2025-02-06", "2024-08-13", "2024-08-14", "2024-09-01"],
+            'Quantity': [1, 5, 2, 2, 3, 5],
+            'UnitPrice': [1125.25, 176.06, 782.77, 701.35, 10.0, 20.0],
+            'Region': ["South", "North", "South", "North", "East", "East"],
+        }).to_csv(self.path, index = False)
+
+    def test_columns_are_converted(self):
+        df = self.processor.load_csv_to_dataframe(self.path, optimize_memory = True)
+        self.assertIsInstance(df['Region'].dtype, pd.CategoricalDtype)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['Date']))
+        self.assertEqual(df['Quantity'].dtype, 'int64')
+
+    def test_saved_schema_goes_stale_when_the_file_changes(self):
+        schema = self.processor.infer_csv_schema(self.path)
+        self.processor.save_csv_schema(self.path, schema)
+        self.assertEqual(self.processor.load_csv_schema(self.path), schema)
+
+        # Rewriting the file (here with text in Quantity) must not apply the old column types.
+        with open(self.path, 'a') as file:
+            file.write("2024-09-02,many,1.0,East\n")
+        self.assertIsNone(self.processor.load_csv_schema(self.path))
+
+    def test_queries_and_summaries_match_the_plain_frame(self):
+        plain = self.processor.load_csv_to_dataframe(self.path)
+        optimized = self.processor.load_csv_to_dataframe(self.path, optimize_memory = True)
+
+        # Small integers must not wrap in arithmetic once the frame is optimized.
+        self.assertEqual(optimized.eval("Quantity * 100").tolist(), [100, 500, 200, 200, 300, 500])
+        for expression in ("Quantity * 100", "Quantity * UnitPrice", "Quantity * 1000000000"):
+            with self.subTest(expression = expression):
+                expected = SummaryEngine().summarize(plain, ['Region'], expression)
+                result = SummaryEngine().summarize(optimized, ['Region'], expression)
+                self.assertEqual(result.iloc[:, 1].tolist(), expected.iloc[:, 1].tolist())
+        self.assertEqual(SummaryEngine().summarize(optimized, ['Region'], "Quantity * 100").iloc[:, 1].tolist(), [800, 700, 300])
+
+        for expression in ("Quantity * 100 > 300", "Quantity > 2", "Region == South"):
+            with self.subTest(expression = expression):
+                self.assertEqual(DataFrameFilter(optimized).filter(expression).index.tolist(), DataFrameFilter(plain).filter(expression).index.tolist())
+        self.assertEqual(len(DataFrameFilter(optimized).filter("Quantity * 100 > 300")), 2)
+
+
+class LoadCsvsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = FileDataProcessor()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+        # Three daily shards of the same layout, written out of order.
+        for day in (3, 1, 2):
+            self.write(f"2025-06-0{day}.csv", "id,region,quantity\n" + "".join(f"{day * 10 + i},North,{i}\n" for i in range(day)))
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as file:
+            file.write(text)
+        return path
+
+    def test_shards_are_concatenated_in_path_order(self):
+        for use_processes in (False, True):
+            with self.subTest(use_processes = use_processes):
+                progress = []
+                df = self.processor.load_csvs_to_dataframe(self.directory, max_workers = 2, use_processes = use_processes,
+                                                           progress_callback = lambda done, total, path: progress.append((done, total)))
+                self.assertEqual(df['id'].tolist(), [10, 20, 21, 30, 31, 32])
+                self.assertEqual(df.index.tolist(), list(range(6)))
+                self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
+
+    def test_glob_list_and_read_csv_options(self):
+        self.assertEqual(len(self.processor.list_csv_files(os.path.join(self.directory, "2025-06-0[12].csv"))), 2)
+        paths = self.processor.list_csv_files(self.directory)
+        df = self.processor.load_csvs_to_dataframe(paths[1:], use_processes = False, usecols = ['id'], dtype = {'id': str})
+        self.assertEqual((list(df.columns), df['id'].tolist()), (['id'], ["20", "21", "30", "31", "32"]))
+
+    def test_schema_mismatch_raises(self):
+        shards = {
+            'other columns': "id,area,quantity\n40,North,1\n",
+            'reordered columns': "id,quantity,region\n40,1,North\n",
+            'text in a numeric column': "id,region,quantity\n40,North,many\n",
+        }
+        for name, text in shards.items():
+            with self.subTest(shard = name):
+                path = self.write("2025-06-04.csv", text)
+                with self.assertRaisesRegex(RuntimeError, "schema mismatch"):
+                    self.processor.load_csvs_to_dataframe(self.directory, use_processes = False)
+
+                # Without the check the shards are concatenated as they are.
+                self.assertEqual(len(self.processor.load_csvs_to_dataframe(self.directory, use_processes = False, check_schema = False)), 7)
+                os.remove(path)
+
+    def test_empty_column_is_not_a_mismatch(self):
+        self.write("2025-06-04.csv", "id,region,quantity\n40,North,\n41,South,\n")
+        df = self.processor.load_csvs_to_dataframe(self.directory, use_processes = False)
+        self.assertEqual(len(df), 8)
+
+    def test_errors(self):
+        with self.assertRaises(RuntimeError):
+            self.processor.load_csvs_to_dataframe(os.path.join(self.directory, "*.tsv"))
+        with self.assertRaises(RuntimeError):
+            self.processor.load_csvs_to_dataframe([os.path.join(self.directory, "missing.csv")], use_processes = False)
+
+        self.write("2025-06-04.csv", "id,region,quantity\n1,North,1,extra\n2,North\n\"open quote\n")
+        with self.assertRaises(RuntimeError):
+            self.processor.load_csvs_to_dataframe(self.directory, use_processes = False)
+
+    def test_callback_exception_propagates(self):
+        class Cancelled(Exception):
+            pass
+
+        def cancel(*args):
+            raise Cancelled()
+
+        with self.assertRaises(Cancelled):
+            self.processor.load_csvs_to_dataframe(self.directory, use_processes = False, progress_callback = cancel)
+
+
+class ImageBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = FileDataProcessor()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+        # Five 4 x 3 images, each filled with its own color, plus a file that isn't an image.
+        self.images = []
+        for number in range(5):
+            pixels = np.full((3, 4, 3), number * 40, dtype = np.uint8)
+            pixels[0, 0] = (255, number, 0)
+            Image.fromarray(pixels).save(os.path.join(self.directory, f"image_{number}.png"))
+            self.images.append(pixels)
+        with open(os.path.join(self.directory, 'notes.txt'), 'w') as file:
+            file.write("not an image")
+
+    def test_list_image_files(self):
+        paths = self.processor.list_image_files(self.directory)
+        self.assertEqual([os.path.basename(path) for path in paths], [f"image_{number}.png" for number in range(5)])
+        self.assertEqual(len(self.processor.list_image_files(os.path.join(self.directory, "image_[13].png"))), 2)
+
+    def test_load_images_to_array(self):
+        for use_processes in (False, True):
+            with self.subTest(use_processes = use_processes):
+                batch = self.processor.load_images_to_array(self.directory, max_workers = 2, use_processes = use_processes)
+                self.assertEqual((batch.shape, batch.dtype), ((5, 3, 4, 3), np.uint8))
+                np.testing.assert_array_equal(batch, np.stack(self.images))
+
+    def test_size_and_mode(self):
+        batch = self.processor.load_images_to_array(self.directory, size = (8, 6), mode = 'L')
+        self.assertEqual(batch.shape, (5, 6, 8, 1))
+        self.assertEqual(int(batch[2, 5, 7, 0]), 80)
+
+    def test_batches(self):
+        batches = list(self.processor.iter_image_batches(self.directory, batch_size = 2))
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        np.testing.assert_array_equal(np.concatenate(batches), np.stack(self.images))
+
+    def test_empty_source(self):
+        self.assertEqual(self.processor.load_images_to_array(os.path.join(self.directory, "*.jpg")).shape, (0, 0, 0, 3))
+        self.assertEqual(list(self.processor.iter_image_batches([])), [])
+
+    def test_errors(self):
+        Image.fromarray(np.zeros((5, 5, 3), dtype = np.uint8)).save(os.path.join(self.directory, "image_9.png"))
+        with self.assertRaises(RuntimeError):
+            self.processor.load_images_to_array(self.directory)
+
+        broken = os.path.join(self.directory, "broken.png")
+        with open(broken, 'wb') as file:
+            file.write(b"not a png")
+        for use_processes in (False, True):
+            with self.subTest(use_processes = use_processes):
+                with self.assertRaises(RuntimeError):
+                    self.processor.load_images_to_array([self.processor.list_image_files(self.directory)[1], broken], use_processes = use_processes)
+
+
+class ExportDataframeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = FileDataProcessor()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.df = pd.DataFrame({'id': range(10), 'name': pd.Series([None] * 5 + ["e", "f", None, "h", "i"], dtype = object)})
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    @unittest.skipIf(os.name == 'nt', "file modes are a POSIX feature")
+    def test_file_mode_follows_umask(self):
+        for umask in (0o022, 0o027):
+            with self.subTest(umask = oct(umask)):
+                previous = os.umask(umask)
+                try:
+                    result = self.processor.export_dataframe(self.df, self.path('out.csv'))
+                finally:
+                    os.umask(previous)
+                self.assertEqual(os.stat(result['path']).st_mode & 0o777, 0o666 & ~umask)
+
+        # The umask is process-wide, exporting must not touch it while other threads create files.
+        with mock.patch('os.umask') as umask:
+            self.processor.export_dataframe(self.df, self.path('out.csv'))
+        umask.assert_not_called()
+
+    def test_csv_round_trip(self):
+        for name in ('out.csv', 'out.csv.gz'):
+            with self.subTest(name = name):
+                progress = []
+                result = self.processor.export_dataframe(self.df, self.path(name), chunk_size = 3, progress_callback = lambda done, total: progress.append(done))
+                self.assertEqual(result['rows'], 10)
+                self.assertEqual(progress, [3, 6, 9, 10])
+                self.assertEqual(pd.read_csv(result['path'])['name'].tolist()[5:7], ["e", "f"])
+                self.assertEqual([entry for entry in os.listdir(self.directory.name) if entry.endswith('.tmp')], [])
+
+    @unittest.skipUnless(HAVE_PYARROW, "needs pyarrow")
+    def test_arrow_column_empty_in_first_chunk(self):
+        # 'name' is all None in the first chunk and text afterwards.
+        for name, read in (('out.parquet', pd.read_parquet), ('out.feather', pd.read_feather)):
+            with self.subTest(name = name):
+                result = self.processor.export_dataframe(self.df, self.path(name), chunk_size = 3)
+                loaded = read(result['path'])
+                self.assertEqual(loaded['id'].tolist(), list(range(10)))
+                self.assertEqual([value if isinstance(value, str) else None for value in loaded['name']], self.df['name'].tolist())
+
+    def test_unknown_format_raises(self):
+        with self.assertRaises(RuntimeError):
+            self.processor.export_dataframe(self.df, self.path('out.xlsx'), file_format = 'xlsx')
+
+
+if __name__ == '__main__':
+    unittest.main()
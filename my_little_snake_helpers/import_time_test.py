@@ -0,0 +1,26 @@
+import sys
+import json
+import unittest
+import subprocess
+from benchmarks.bench_import_time import REPO_ROOT, LIGHT_MODULES, HEAVY_DEPENDENCIES
+
+# The timing budget is checked by benchmarks/bench_import_time.py, this only checks what gets imported.
+
+
+def loaded_heavy_dependencies(module: str) -> list[str]:
+    # Imports module in a fresh interpreter and returns the heavy dependencies it left in sys.modules.
+    code = f"import sys, json, {module}; print(json.dumps(sorted(name for name in {HEAVY_DEPENDENCIES!r} if name in sys.modules)))"
+    result = subprocess.run([sys.executable, '-c', code], cwd = REPO_ROOT, capture_output = True, text = True, check = True)
+    return json.loads(result.stdout)
+
+
+class ImportTimeTest(unittest.TestCase):
+
+    def test_no_heavy_dependencies(self):
+        for module in LIGHT_MODULES:
+            with self.subTest(module = module):
+                self.assertEqual(loaded_heavy_dependencies(module), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,256 @@
+import os
+import json
+import math
+import time
+import atexit
+import threading
+from collections import deque
+from functools import wraps
+
+# Setting this environment variable to 1 turns instrumentation on at import. A path ending in .json
+# turns it on and writes the report there when the process exits.
+ENV_VAR = 'MY_LITTLE_SNAKE_HELPERS_TIMING'
+
+# Durations kept per operation for the percentiles, the call count and total time cover every call.
+MAX_SAMPLES = 10_000
+
+# Whether calls are being recorded. Instrumented functions check this one global and nothing else
+# while it is off.
+_enabled = False
+_lock = threading.Lock()
+_operations = {}
+
+class _Operation():
+    # Recorded calls of one operation: count, total time, the most recent durations and summed counters.
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples = deque(maxlen = MAX_SAMPLES)
+        self.counters = {}
+
+
+def enable() -> None:
+    """
+    Starts recording instrumented calls.
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """
+    Stops recording, what was recorded is kept until reset().
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """
+    Returns:
+        bool: True while calls are being recorded.
+    """
+    return _enabled
+
+
+def reset() -> None:
+    """
+    Drops everything recorded so far.
+    """
+    with _lock:
+        _operations.clear()
+
+
+def record(name: str, seconds: float = None, **counters) -> None:
+    """
+    Records one call of an operation, with optional amounts processed (e.g. rows = 1000, bytes = 2048).
+    Does nothing while instrumentation is disabled.
+
+    Parameters:
+        name (str): The operation, e.g. 'FileDataProcessor.load_csv_to_dataframe'.
+        seconds (float): How long the call took, None for a counter-only record.
+        **counters: Amounts to add to the operation's totals.
+    """
+    if not _enabled:
+        return
+    with _lock:
+        operation = _operations.get(name)
+        if operation is None:
+            operation = _operations[name] = _Operation()
+        if seconds is not None:
+            operation.calls += 1
+            operation.total_seconds += seconds
+            operation.max_seconds = max(operation.max_seconds, seconds)
+            operation.samples.append(seconds)
+        for counter, amount in counters.items():
+            if amount is not None:
+                operation.counters[counter] = operation.counters.get(counter, 0) + amount
+
+
+def timed(name: str, counters = None):
+    """
+    Decorator that records the duration of every call of a function under name. While instrumentation
+    is disabled the only cost is the wrapper call and one global check.
+
+    Parameters:
+        name (str): The operation name.
+        counters (callable): Optional counters(result, *args, **kwargs) returning a dict of amounts processed
+            by the call (e.g. {'rows': len(result)}). Errors in it are ignored.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            seconds = time.perf_counter() - start
+            amounts = {}
+            if counters is not None:
+                try:
+                    amounts = counters(result, *args, **kwargs) or {}
+                except Exception:
+                    amounts = {}
+            record(name, seconds, **amounts)
+            return result
+        return wrapper
+    return decorator
+
+
+class _Timer():
+    # Context manager recording the time spent in its block, see timer().
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counters = {}
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        record(self.name, time.perf_counter() - self._start, **self.counters)
+        return False
+
+    def add(self, **counters) -> None:
+        for counter, amount in counters.items():
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+
+class _NullTimer():
+    # Stand-in returned by timer() while instrumentation is disabled.
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def add(self, **counters) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str):
+    """
+    Context manager recording the time spent in its block under name. Amounts processed inside the block
+    are added with add(), e.g.
+
+        with instrumentation.timer('export') as timing:
+            ...
+            timing.add(rows = len(df))
+
+    Parameters:
+        name (str): The operation name.
+
+    Returns:
+        The context manager (a shared no-op one while instrumentation is disabled).
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def _percentile(ordered: list, fraction: float) -> float:
+    # Nearest-rank percentile of sorted durations.
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered), max(1, math.ceil(fraction * len(ordered)))) - 1]
+
+
+def snapshot() -> dict:
+    """
+    Summarizes what has been recorded.
+
+    Returns:
+        dict: Operation name -> {'calls', 'total_seconds', 'p50_seconds', 'p95_seconds', 'max_seconds',
+            'counters'}, sorted by total time, largest first. The percentiles cover the last MAX_SAMPLES calls.
+    """
+    with _lock:
+        copies = [(name, operation.calls, operation.total_seconds, operation.max_seconds, sorted(operation.samples), dict(operation.counters)) for name, operation in _operations.items()]
+
+    summary = {}
+    for name, calls, total, longest, ordered, counters in sorted(copies, key = lambda copy: copy[2], reverse = True):
+        summary[name] = {
+            'calls': calls,
+            'total_seconds': total,
+            'p50_seconds': _percentile(ordered, 0.50),
+            'p95_seconds': _percentile(ordered, 0.95),
+            'max_seconds': longest,
+            'counters': counters,
+        }
+    return summary
+
+
+def export_json(filepath: str = None) -> str:
+    """
+    Exports the snapshot as JSON.
+
+    Parameters:
+        filepath (str): If given, the JSON is also written to this file.
+
+    Returns:
+        str: The JSON text.
+
+    Raises:
+        RuntimeError: If there is an error writing the file.
+    """
+    text = json.dumps({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'operations': snapshot()}, indent = 2)
+    if filepath is not None:
+        try:
+            with open(filepath, 'w') as file:
+                file.write(text)
+        except Exception as e:
+            raise RuntimeError(f"An error occurred while writing the timing report: {e}")
+    return text
+
+
+def log_report(logger = None, level: int = None) -> None:
+    """
+    Logs one line per operation of the snapshot.
+
+    Parameters:
+        logger (logging.Logger): The logger to use. If None, uses this module's logger.
+        level (int): The logging level. If None, uses logging.INFO.
+    """
+    import logging
+    if logger is None: logger = logging.getLogger(__name__)
+    if level is None: level = logging.INFO
+    for name, stats in snapshot().items():
+        counters = " ".join(f"{counter}={amount}" for counter, amount in stats['counters'].items())
+        logger.log(level, "%s calls=%d total=%.6fs p50=%.6fs p95=%.6fs max=%.6fs %s", name, stats['calls'], stats['total_seconds'], stats['p50_seconds'], stats['p95_seconds'], stats['max_seconds'], counters)
+
+
+# Turn on from the environment, writing the report at exit when a file is named.
+_env_value = os.environ.get(ENV_VAR, "").strip()
+if _env_value and _env_value != '0':
+    enable()
+    if _env_value.lower().endswith('.json'):
+        atexit.register(export_json, _env_value)
@@ -0,0 +1,108 @@
+import io
+import os
+import json
+import logging
+import tempfile
+import unittest
+import contextlib
+from my_little_snake_helpers import instrumentation
+from my_little_snake_helpers.console import Console
+
+
+class InstrumentationTest(unittest.TestCase):
+
+    def setUp(self):
+        # Every test starts enabled and empty, and leaves the module as it found it.
+        was_enabled = instrumentation.is_enabled()
+        self.addCleanup(lambda: instrumentation.enable() if was_enabled else instrumentation.disable())
+        self.addCleanup(instrumentation.reset)
+        instrumentation.reset()
+        instrumentation.enable()
+
+    def test_disabled_records_nothing(self):
+        instrumentation.disable()
+
+        @instrumentation.timed('test.disabled')
+        def double(value):
+            return value * 2
+
+        self.assertEqual(double(2), 4)
+        instrumentation.record('test.disabled', 1.0, rows = 5)
+        with instrumentation.timer('test.disabled') as timing:
+            timing.add(rows = 1)
+        self.assertIs(instrumentation.timer('test.disabled'), instrumentation._NULL_TIMER)
+        self.assertEqual(instrumentation.snapshot(), {})
+
+    def test_timed_with_counters(self):
+        @instrumentation.timed('test.load', lambda result, rows: {'rows': len(result)})
+        def load(rows):
+            return list(range(rows))
+
+        load(3)
+        load(4)
+        stats = instrumentation.snapshot()['test.load']
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(stats['counters'], {'rows': 7})
+        self.assertLessEqual(stats['p50_seconds'], stats['max_seconds'])
+        self.assertEqual(load.__name__, 'load')
+
+    def test_failing_counters_are_ignored(self):
+        @instrumentation.timed('test.counters', lambda result: {'rows': len(result)})
+        def nothing():
+            return None
+
+        self.assertIsNone(nothing())
+        self.assertEqual(instrumentation.snapshot()['test.counters']['counters'], {})
+
+    def test_percentiles_and_order(self):
+        for seconds in range(1, 101):
+            instrumentation.record('test.slow', seconds / 100)
+        instrumentation.record('test.fast', 0.001)
+        instrumentation.record('test.fast', rows = 10)
+
+        summary = instrumentation.snapshot()
+        self.assertEqual(list(summary), ['test.slow', 'test.fast'])
+        self.assertEqual((summary['test.slow']['p50_seconds'], summary['test.slow']['p95_seconds'], summary['test.slow']['max_seconds']), (0.5, 0.95, 1.0))
+        self.assertAlmostEqual(summary['test.slow']['total_seconds'], 50.5)
+        self.assertEqual((summary['test.fast']['calls'], summary['test.fast']['counters']), (1, {'rows': 10}))
+
+    def test_samples_are_bounded(self):
+        for _ in range(instrumentation.MAX_SAMPLES + 5):
+            instrumentation.record('test.many', 0.001)
+        self.assertEqual(len(instrumentation._operations['test.many'].samples), instrumentation.MAX_SAMPLES)
+        self.assertEqual(instrumentation.snapshot()['test.many']['calls'], instrumentation.MAX_SAMPLES + 5)
+
+    def test_timer(self):
+        with instrumentation.timer('test.block') as timing:
+            timing.add(bytes = 10)
+            timing.add(bytes = 5)
+        self.assertEqual(instrumentation.snapshot()['test.block']['counters'], {'bytes': 15})
+
+    def test_export_json_and_log(self):
+        instrumentation.record('test.export', 0.25, rows = 2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'timing.json')
+            text = instrumentation.export_json(path)
+            with open(path) as file:
+                self.assertEqual(json.load(file), json.loads(text))
+        self.assertEqual(json.loads(text)['operations']['test.export']['counters'], {'rows': 2})
+
+        with self.assertLogs('my_little_snake_helpers.instrumentation', level = logging.INFO) as logs:
+            instrumentation.log_report()
+        self.assertIn("test.export calls=1", logs.output[0])
+
+    def test_export_json_error(self):
+        with self.assertRaises(RuntimeError):
+            instrumentation.export_json(os.path.join(tempfile.gettempdir(), 'missing_directory', 'nested', 'timing.json'))
+
+    def test_console_report(self):
+        console = Console()
+        with contextlib.redirect_stdout(io.StringIO()):
+            console.fancy_print("<DATA>{}</DATA>", 1)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            console.print_timing_report()
+        self.assertIn("Console.fancy_print", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
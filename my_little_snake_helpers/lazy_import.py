@@ -0,0 +1,50 @@
+import sys
+import types
+import importlib
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module that is only imported the first time one of its attributes is used.
+    Lets modules keep the familiar `pd.read_csv(...)` style at module level without paying for
+    heavy imports (pandas, numpy, PIL, matplotlib, tkinter) until they are actually needed.
+    """
+
+    def __init__(self, name: str):
+        """
+        Parameters:
+            name (str): Fully qualified name of the module to import on first use (e.g. 'matplotlib.pyplot').
+        """
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_lazy_module'] = module
+
+            # Copy the real module's namespace so later attribute lookups don't go through __getattr__.
+            self.__dict__.update(module.__dict__)
+        return module
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Returns the module if it is already imported, otherwise a LazyModule that imports it on first use.
+
+    Parameters:
+        name (str): Fully qualified module name.
+
+    Returns:
+        types.ModuleType: The real module or a LazyModule proxy for it.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
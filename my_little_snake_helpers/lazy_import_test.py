@@ -0,0 +1,41 @@
+import sys
+import unittest
+from my_little_snake_helpers.lazy_import import LazyModule, lazy_import
+
+
+class LazyImportTest(unittest.TestCase):
+
+    def setUp(self):
+        # colorsys is small and not used by the package, so the test can import it itself.
+        self.saved = sys.modules.pop('colorsys', None)
+        self.addCleanup(self.restore)
+
+    def restore(self):
+        sys.modules.pop('colorsys', None)
+        if self.saved is not None:
+            sys.modules['colorsys'] = self.saved
+
+    def test_imported_module_is_returned_as_is(self):
+        import json
+        self.assertIs(lazy_import('json'), json)
+
+    def test_import_waits_for_first_attribute(self):
+        module = lazy_import('colorsys')
+        self.assertIsInstance(module, LazyModule)
+        self.assertNotIn('colorsys', sys.modules)
+
+        self.assertEqual(module.rgb_to_hsv(1.0, 0.0, 0.0), (0.0, 1.0, 1.0))
+        self.assertIn('colorsys', sys.modules)
+
+        # The real namespace is copied over, later lookups don't go through __getattr__.
+        self.assertIs(module.__dict__['rgb_to_hsv'], sys.modules['colorsys'].rgb_to_hsv)
+        self.assertIn('hsv_to_rgb', dir(module))
+
+    def test_missing_module_fails_on_use(self):
+        module = lazy_import('my_little_snake_helpers_no_such_module')
+        with self.assertRaises(ImportError):
+            module.anything
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,44 +4,282 @@
 # It uses the Console class for console interactions and the FileDataProcessor class for file operations.
 # The script allows users to select a CSV file, load it into a DataFrame, and unload it.
 import os
+import time
 from .console import Console
 from .file_data_processor import FileDataProcessor
+from .csv_row_index import CsvRowIndex
+from .background_loader import BackgroundLoader, LoadJob
+from . import instrumentation
+from .dataframe_filter import DataFrameFilter
+from .dataframe_summary import SummaryEngine, AGGREGATIONS
 
 class MenuCSV:
 
-    def _drop_columns_menu(self, df):
+    def __init__(self, stream_threshold_bytes: int = 512 * 1024 ** 2, persist_row_index: bool = True, use_cache: bool = True, optimize_memory: bool = True):
+        """
+        Parameters:
+            stream_threshold_bytes (int): CSV files at least this large are opened in streaming mode
+                (viewed straight from disk through a row index) instead of being loaded fully into memory.
+            persist_row_index (bool): Save the row index next to the csv so the next session opens it instantly.
+            use_cache (bool): Load csv files through the on-disk columnar cache, so picking the same
+                unchanged file again skips parsing it.
+            optimize_memory (bool): Load DataFrames with smaller column types (categoricals and parsed
+                dates, numbers keep their full width). A csv file is parsed straight into them using its
+                saved column types (saved on the first load and inferred again once the file changes), a
+                directory is converted after loading. The memory saved is shown in the status line.
+        """
+        self.stream_threshold_bytes = stream_threshold_bytes
+        self.persist_row_index = persist_row_index
+        self.use_cache = use_cache
+        self.optimize_memory = optimize_memory
+
+    def _open_streaming(self, file_processor, csv_file_path):
+
+        # Index the row offsets in one pass (or reuse the saved index), pages are then read with a seek.
+        row_index = CsvRowIndex.open(csv_file_path, persist = self.persist_row_index)
+
+        return {'index': row_index, 'rows': len(row_index), 'columns': len(row_index.columns)}
+
+    @staticmethod
+    def _format_bytes(size: int) -> str:
+        # Human readable size for the status line.
+        for unit in ('bytes', 'KB', 'MB'):
+            if size < 1024:
+                return f"{size:.0f} {unit}" if unit == 'bytes' else f"{size:.1f} {unit}"
+            size /= 1024
+        return f"{size:.1f} GB"
+
+    def _load_dataframe(self, file_processor, csv_file_path, job = None):
+
+        # Read only the kept columns if a projection was saved for this file.
+        projection = file_processor.load_column_projection(csv_file_path)
+
+        # Parse straight into the smaller column types (categoricals come from the parser, so the full-size
+        # text columns never exist). The column types are inferred from a sample on the first load and
+        # saved next to the file, later loads reuse them until the file changes.
+        schema = None
+        if self.optimize_memory:
+            schema = file_processor.load_csv_schema(csv_file_path)
+            if schema is None:
+                schema = file_processor.infer_csv_schema(csv_file_path)
+                try:
+                    file_processor.save_csv_schema(csv_file_path, schema)
+                except RuntimeError:
+                    pass  # A read-only directory only means the sample is read again next time.
+
+        df = file_processor.load_csv_to_dataframe(csv_file_path, usecols = projection, cache = self.use_cache, schema = schema, progress_callback = job.report if job else None)
+
+        memory = file_processor.dataframe_memory_usage(df)
+        return df, projection, {'before': self._unoptimized_memory(file_processor, df, schema) if schema is not None else memory, 'after': memory}
+
+    @staticmethod
+    def _unoptimized_memory(file_processor, df, schema) -> int:
+
+        # The frame was never built at full size, so measure the converted columns as the text a plain
+        # load gives, one column at a time so only one full-size column exists at once.
+        memory = file_processor.dataframe_memory_usage(df)
+        for column, kind in schema['columns'].items():
+            if kind in ('category', 'datetime') and column in df.columns:
+                memory += file_processor.dataframe_memory_usage(df[column].astype(str).to_frame()) - file_processor.dataframe_memory_usage(df[column].to_frame())
+        return memory
+
+    def _load_directory(self, file_processor, directory, pattern, job = None):
+
+        # Report each parsed file to the job.
+        def progress(files_done, files_total, path):
+            if job: job.report(files_done, files_total)
+
+        # Parse the files in parallel and concatenate them into one DataFrame.
+        df = file_processor.load_csvs_to_dataframe(directory, pattern, progress_callback = progress)
+
+        # Measure the frame as parsed, then again after converting it to smaller column types.
+        memory_before = file_processor.dataframe_memory_usage(df)
+        if self.optimize_memory:
+            df = file_processor.optimize_dataframe_memory(df)
+
+        return df, None, {'before': memory_before, 'after': file_processor.dataframe_memory_usage(df)}
+
+    def _drop_columns_menu(self, df, csv_file_path = None):
         
         # Create instance of Console.
         console = Console()
 
-        # Define return string.
+        # Create instance of FileProcessor (for saving the column projection).
+        file_processor = FileDataProcessor()
+
+        # Define navigation strings.
+        apply_str = "<MENU_NAV_ITEM>apply drops</MENU_NAV_ITEM>"
+        clear_str = "<MENU_NAV_ITEM>clear selection</MENU_NAV_ITEM>"
+        projection_str = "<MENU_NAV_ITEM>save column projection (next load reads only the kept columns)</MENU_NAV_ITEM>"
         return_str = "<MENU_NAV_ITEM>return</MENU_NAV_ITEM>"
-        
+
+        # Columns selected for dropping, they are all dropped at once (one copy of the frame).
+        pending = []
+
         # Loop until the user chooses to return.
         while True:
-            
-            # Clear the console.
-            console.clear()
 
-            # Get a list of columns from the DataFrame.
-            columns_list = list(df.columns)
-            
-            # Remove the 'return' column from the list.
-            columns_list.append(return_str)
+            # List the columns, marking the ones pending a drop.
+            pending_set = set(pending)
+            columns_list = [f"<BAD>{column}</BAD>" if column in pending_set else str(column) for column in df.columns]
+
+            # Navigation items, the projection can only be saved for a csv file.
+            nav_list = [apply_str, clear_str, projection_str, return_str] if csv_file_path else [apply_str, clear_str, return_str]
+
+            prepend_str = f"<GOOD>select columns to drop (numbers, ranges, comma lists or name patterns like Price*)</GOOD>\n<GOOD>dataframe shape:</GOOD> <DATA>{df.shape[0]} rows, {df.shape[1]} columns</DATA>"
+            if pending:
+                prepend_str += f"\n<WARNING>pending drops ({len(pending)}, applied on return):</WARNING> <DATA>{', '.join(str(column) for column in pending)}</DATA>"
 
-            prepend_str = f"select columns to drop\ndataframe shape:</GOOD> <DATA>{df.shape[0]} rows, {df.shape[1]} columns</DATA>"
+            # Show the columns and get the selection.
+            selections, nav_text = console.multi_select_menu_with_validation('drop columns', columns_list, nav_list, prepend_str = prepend_str)
 
-            # List all the columns in the DataFrame.
-            selection_int, selection_text = console.integer_only_menu_with_validation('drop columns', columns_list, prepend_str = prepend_str)
+            # Selecting a pending column again unselects it.
+            for number, _ in selections:
+                column = df.columns[number - 1]
+                if column in pending_set: pending.remove(column)
+                else: pending.append(column)
 
-            if selection_text != return_str:
-                # Drop the selected column from the DataFrame.
-                df.drop(columns = [selection_text], inplace = True)
+            # Apply every pending drop with a single drop call.
+            if nav_text in (apply_str, return_str, projection_str) and pending:
+                df = df.drop(columns = pending)
+                pending = []
+
+            if nav_text == clear_str:
+                pending = []
+
+            # Record the kept columns so the next load of this file reads only them.
+            if nav_text == projection_str:
+                try:
+                    file_processor.save_column_projection(csv_file_path, list(df.columns))
+                    console.fancy_print("<GOOD>\ncolumn projection saved ({} columns).</GOOD>", df.shape[1])
+                except RuntimeError as e:
+                    console.fancy_print("<BAD>\n{}</BAD>", e)
+                console.press_enter_pause()
 
             # If the user selected 'return'.
-            if selection_text == return_str: 
+            if nav_text == return_str: 
                 return df
 
+    def _filter_menu(self, df_filter):
+
+        # Create instance of Console.
+        console = Console()
+
+        # Loop until the user enters an empty expression.
+        while True:
+
+            # Show the supported expressions and the columns, then ask for an expression.
+            with console.frame():
+                console.clear()
+                console.fancy_print("<MENU_TITLE>filter/search</MENU_TITLE>")
+                console.fancy_print("<INFO>column == value</INFO> <DATA>equality lookup (indexed, instant after the first search of a column)</DATA>")
+                console.fancy_print("<INFO>column != value, <, <=, >, >=</INFO> <DATA>comparisons</DATA>")
+                console.fancy_print("<INFO>column ~ text</INFO> <DATA>case-insensitive substring search</DATA>")
+                console.fancy_print("<INFO>anything else</INFO> <DATA>a pandas query, e.g. Quantity > 2 and Region == 'North'</DATA>")
+                console.fancy_print("<GOOD>columns:</GOOD> <DATA>{}</DATA>", ", ".join(str(column) for column in df_filter.df.columns))
+                expression = console.fancy_input("<INPUT_PROMPT>expression (</INPUT_PROMPT><KEYBOARD_KEY>ENTER</KEYBOARD_KEY><INPUT_PROMPT> to return): </INPUT_PROMPT>").strip()
+
+            if not expression:
+                return None
+
+            # Run the search, reporting invalid expressions.
+            try:
+                start = time.perf_counter()
+                result = df_filter.filter(expression)
+                seconds = time.perf_counter() - start
+            except ValueError as e:
+                console.fancy_print("<BAD>{}</BAD>", e)
+                console.press_enter_pause()
+                continue
+
+            # Page through the matches, then offer to keep only them.
+            console.fancy_print("<GOOD>{} matching rows</GOOD> <DATA>({:.3f} s)</DATA>", len(result), seconds)
+            if len(result) == 0:
+                console.press_enter_pause()
+                continue
+            console.press_enter_pause()
+            console.paginated_print(result)
+            answer = console.fancy_input("<INPUT_PROMPT>keep only these {} rows? (y/</INPUT_PROMPT><KEYBOARD_KEY>N</KEYBOARD_KEY><INPUT_PROMPT>): </INPUT_PROMPT>", len(result)).strip().lower()
+            if answer == 'y':
+                return result
+
+    def _export_dataframe(self, console, file_processor, df, csv_file_path, starting_dir):
+
+        # Ask where to save, suggesting a name next to the source file.
+        default_filename = os.path.splitext(os.path.basename(csv_file_path))[0].replace('*', 'all') + "_export.csv"
+        filetypes = [("CSV files", "*.csv"), ("Compressed CSV files", "*.csv.gz"), ("Parquet files", "*.parquet"), ("Feather files", "*.feather")]
+        export_path = file_processor.save_file(os.path.dirname(csv_file_path) or starting_dir, default_filename, filetypes)
+        if not export_path:
+            return
+
+        # Report each written chunk on one updating line.
+        def progress(rows_written, total_rows):
+            console.write(console.fancy_format("\r<INFO>written {:,} / {:,} rows</INFO>", rows_written, total_rows))
+            console.erase_line()
+
+        try:
+            result = file_processor.export_dataframe(df, export_path, progress_callback = progress)
+            console.fancy_print("\n<GOOD>exported {:,} rows as {}:</GOOD> <DATA>{} ({}, {:.2f} s)</DATA>", result['rows'], result['file_format'], result['path'], self._format_bytes(result['bytes']), result['seconds'])
+        except RuntimeError as e:
+            console.fancy_print("<BAD>\n{}</BAD>", e)
+        console.press_enter_pause()
+
+    @staticmethod
+    def _summary_label(group_keys, expression, agg):
+        # Menu label of a summary, e.g. "sum(Quantity * UnitPrice) by Region, Category".
+        value_str = f"{agg}({expression})" if expression else "rows"
+        return f"{value_str} by {', '.join(str(key) for key in group_keys)}"
+
+    def _summary_menu(self, summary_engine, df, version):
+
+        # Create instance of Console.
+        console = Console()
+
+        # Define navigation strings.
+        new_str = "<MENU_NAV_ITEM>new summary</MENU_NAV_ITEM>"
+        return_str = "<MENU_NAV_ITEM>return</MENU_NAV_ITEM>"
+
+        # Loop until the user chooses to return.
+        while True:
+
+            # Summaries already computed for this frame can be reopened instantly from the cache.
+            cached = summary_engine.cached(version)
+            prepend_str = "<GOOD>group the rows and aggregate a column or an expression such as Quantity * UnitPrice * (1 - Discount)</GOOD>"
+            if cached: prepend_str += "\n<GOOD>previous summaries of this dataframe are listed below, reopening them is instant.</GOOD>"
+            selection_int, selection_text = console.integer_only_menu_with_validation('summarize', [new_str] + [self._summary_label(*summary) for summary in cached] + [return_str], prepend_str = prepend_str)
+
+            # If the user selected 'return'.
+            if selection_text == return_str:
+                return
+
+            if selection_text == new_str:
+
+                # Pick the group keys, then the value and how to aggregate it.
+                selections, nav_text = console.multi_select_menu_with_validation('group by', [str(column) for column in df.columns], [return_str], prepend_str = "<GOOD>select the columns to group by (numbers, ranges, comma lists or name patterns)</GOOD>")
+                if nav_text == return_str:
+                    continue
+                group_keys = [df.columns[number - 1] for number, _ in selections]
+                expression = console.fancy_input("<INPUT_PROMPT>value column or expression, e.g. Quantity * UnitPrice (</INPUT_PROMPT><KEYBOARD_KEY>ENTER</KEYBOARD_KEY><INPUT_PROMPT> for row counts): </INPUT_PROMPT>").strip() or None
+                agg = 'sum'
+                if expression:
+                    agg = console.fancy_input("<INPUT_PROMPT>aggregation ({}) [sum]: </INPUT_PROMPT>", ", ".join(AGGREGATIONS)).strip().lower() or 'sum'
+            else:
+                group_keys, expression, agg = cached[selection_int - 2]
+
+            # Compute (or fetch) the summary and page through it.
+            try:
+                start = time.perf_counter()
+                result = summary_engine.summarize(df, group_keys, expression, agg, version = version)
+                seconds = time.perf_counter() - start
+            except ValueError as e:
+                console.fancy_print("<BAD>\n{}</BAD>", e)
+                console.press_enter_pause()
+                continue
+
+            console.fancy_print("<GOOD>{} groups</GOOD> <DATA>({:.3f} s)</DATA>", len(result), seconds)
+            console.press_enter_pause()
+            console.paginated_print(result)
+
     def show_menu(self, starting_dir = None):
 
         # Check if starting_dir is None, and if so, set it to the current working directory.
@@ -62,11 +300,49 @@ class MenuCSV:
         # Initialize the DataFrame that will hold csv data to None.
         csv_df = None
 
+        # Initialize the column projection the DataFrame was loaded with to None.
+        csv_projection = None
+
+        # Initialize the memory usage of the DataFrame (as parsed and as held) to None.
+        csv_memory = None
+
+        # Initialize the streaming info (row count and preview of a csv that is not fully loaded) to None.
+        csv_stream = None
+
+        # Initialize the filter (and its per-column lookup indexes) of the DataFrame to None, it is rebuilt when the frame changes.
+        csv_filter = None
+
+        # The frame version changes whenever csv_df does (loads, filters, drops), cached summaries are keyed on it.
+        csv_version = 0
+        versioned_df = None
+        summary_engine = SummaryEngine()
+
+        # Loads run in the background, finished ones wait in ready_jobs until they are used.
+        loader = BackgroundLoader()
+        ready_jobs = []
+
         # Loop until the user chooses to return.
         while True:
 
-            # Clear the console.
-            console.clear()
+            # Collect finished loads, and report the ones that failed or were cancelled.
+            messages = []
+            for job in loader.pop_finished():
+                if job.state == 'done': ready_jobs.append(job)
+                elif job.state == 'failed': messages.append(f"<BAD>error loading csv {job.path}: {job.error}</BAD>")
+                else: messages.append(f"<WARNING>load cancelled: {job.path}</WARNING>")
+
+            # Use the oldest finished load if nothing is loaded yet (or it is the full load of the streamed csv).
+            if ready_jobs and csv_df is None and (csv_stream is None or ready_jobs[0].path == csv_file_path):
+                job = ready_jobs.pop(0)
+                csv_file_path = job.path
+                csv_df, csv_projection, csv_memory = job.result
+                csv_stream = None
+
+            # Bump the frame version when the DataFrame has been replaced, dropping the summaries of the old one.
+            if csv_df is not versioned_df:
+                csv_version += 1
+                versioned_df = csv_df
+                summary_engine.invalidate(keep_version = csv_version)
 
             # Prepend string to the menu.
             if not csv_file_path:
@@ -75,48 +351,128 @@ class MenuCSV:
             if csv_file_path:
                 prepend_str = f"<GOOD>csv file selected:</GOOD> <DATA>{csv_file_path}</DATA>"
                 if csv_df is not None:
-                    prepend_str += f"\n<GOOD>dataframe loaded:</GOOD> <DATA>{csv_df.shape[0]} rows, {csv_df.shape[1]} columns</DATA>"
+                    prepend_str += f"\n<GOOD>dataframe loaded:</GOOD> <DATA>{csv_df.shape[0]} rows, {csv_df.shape[1]} columns, {self._format_bytes(csv_memory['after'])} in memory"
+                    if csv_memory['before'] is not None and csv_memory['after'] != csv_memory['before']: prepend_str += f" ({self._format_bytes(csv_memory['before'])} before optimizing)"
+                    prepend_str += "</DATA>"
+                    if csv_projection is not None:
+                        prepend_str += "\n<WARNING>saved column projection applied, only the kept columns were read.</WARNING>"
+                elif csv_stream is not None:
+                    prepend_str += f"\n<WARNING>csv opened in streaming mode (not loaded):</WARNING> <DATA>{csv_stream['rows']} rows, {csv_stream['columns']} columns</DATA>"
                 else:
                     prepend_str += "\n<BAD>no dataframe loaded.</BAD>"
 
-            # Show the menu and get the user's selection (if there a a csv selected).
-            if csv_df is not None: selection_int, selection_text = console.integer_only_menu_with_validation('csv menu', ['unload csv', 'view dataframe', 'drop columns', return_str], prepend_str = prepend_str)
-            else: selection_int, selection_text = console.integer_only_menu_with_validation('csv menu', ['load csv', return_str], prepend_str = prepend_str)
+            # Add the loads in progress, the finished ones waiting to be used and the messages of this round.
+            for job in loader.active_jobs():
+                prepend_str += f"\n<WARNING>loading {job.label}:</WARNING> <DATA>{console.progress_bar(job.fraction(), 20)} {job.describe()}</DATA>"
+            for job in ready_jobs:
+                prepend_str += f"\n<GOOD>loaded, waiting to be used:</GOOD> <DATA>{job.path}</DATA>"
+            for message in messages:
+                prepend_str += "\n" + message
+
+            # Build the item list (if there a a csv selected), with the load controls while loads are running or waiting.
+            if csv_df is not None: item_list = ['unload csv', 'view dataframe', 'filter/search', 'summarize', 'drop columns', 'export dataframe']
+            elif csv_stream is not None: item_list = ['unload csv', 'view dataframe'] + ([] if any(job.path == csv_file_path for job in loader.active_jobs()) else ['load fully'])
+            else: item_list = ['load csv', 'load csv directory', 'open csv (streaming)']
+            if ready_jobs: item_list.append('use next loaded csv')
+            if loader.active_jobs(): item_list.append('monitor loads')
+            if instrumentation.is_enabled(): item_list.append('timing report')
+
+            # Show the menu and get the user's selection.
+            selection_int, selection_text = console.integer_only_menu_with_validation('csv menu', item_list + [return_str], prepend_str = prepend_str)
 
             # Determine what to do based on the user's selection.
-            if selection_text == 'load csv':
+            if selection_text in ('load csv', 'open csv (streaming)'):
                 
                 # Open a file dialog to select a CSV file.
-                csv_file_path = file_processor.open_file(starting_dir, filetypes=[("CSV files", "*.csv")])
+                selected_path = file_processor.open_file(starting_dir, filetypes=[("CSV files", "*.csv")])
 
-                if csv_file_path:
+                if selected_path:
                     try:
-                        csv_df = file_processor.load_csv_to_dataframe(csv_file_path)
-                    except RuntimeError:
-                        # If there was an error loading the CSV file, set csv_df to None.
-                        csv_df = None
+                        # Files over the threshold are streamed instead of loaded so they can't exhaust memory.
+                        if selection_text == 'open csv (streaming)' or os.path.getsize(selected_path) >= self.stream_threshold_bytes:
+                            csv_stream = self._open_streaming(file_processor, selected_path)
+                            csv_file_path = selected_path
+                        else:
+                            # Parse in the background, the menu comes straight back and shows the progress.
+                            job = LoadJob(os.path.basename(selected_path), selected_path, total = os.path.getsize(selected_path))
+                            loader.submit(job, self._load_dataframe, file_processor, selected_path)
+                    except (RuntimeError, OSError):
                         # Print the error message.
-                        console.fancy_print(f"<BAD>error loading csv: {csv_file_path}</BAD>")
+                        console.fancy_print(f"<BAD>error loading csv: {selected_path}</BAD>")
                         # Pause for user input.
                         console.press_enter_pause()
-                    
+
+            # If the user selected 'load csv directory', load every matching csv of a directory into one DataFrame.
+            if selection_text == 'load csv directory':
+
+                # Open a dialog to select the directory, then ask which files of it to load.
+                selected_path = file_processor.open_directory(starting_dir)
+
+                if selected_path:
+                    pattern = console.fancy_input("<INPUT_PROMPT>file pattern [*.csv]: </INPUT_PROMPT>").strip() or "*.csv"
+                    job = LoadJob(os.path.join(os.path.basename(selected_path), pattern), os.path.join(selected_path, pattern), unit = 'files')
+                    loader.submit(job, self._load_directory, file_processor, selected_path, pattern)
+
+            # If the user selected 'load fully', load the streamed csv into a DataFrame in the background.
+            if selection_text == 'load fully':
+                job = LoadJob(os.path.basename(csv_file_path), csv_file_path, total = os.path.getsize(csv_file_path))
+                loader.submit(job, self._load_dataframe, file_processor, csv_file_path)
+
+            # If the user selected 'use next loaded csv', replace the current csv with the oldest finished load.
+            if selection_text == 'use next loaded csv':
+                job = ready_jobs.pop(0)
+                csv_file_path = job.path
+                csv_df, csv_projection, csv_memory = job.result
+                csv_stream = None
+
+            # If the user selected 'monitor loads', show the live progress view (loads can be cancelled from it).
+            if selection_text == 'monitor loads':
+                loader.monitor(console)
+
+            # If the user selected 'timing report', show where the time went so far (instrumentation is on).
+            if selection_text == 'timing report':
+                console.print_timing_report()
+                console.press_enter_pause()
 
             # If the user selected 'clear selection', clear the selected CSV file path.
             if selection_text == 'unload csv':
                 # Clear the selected CSV file path.
                 csv_file_path = None
                 csv_df = None
+                csv_stream = None
 
             if selection_text == 'view dataframe':
-                console.paginated_print(csv_df)
+                # Streamed csv files are paged straight from disk through their row index.
+                if csv_stream is not None: console.paginated_print(csv_stream['index'])
+                else: console.paginated_print(csv_df)
+
+            # If the user selected 'filter/search', search the DataFrame and optionally keep only the matches.
+            if selection_text == 'filter/search':
+                # The lookup indexes stay valid as long as the frame is the same object.
+                if csv_filter is None or csv_filter.df is not csv_df: csv_filter = DataFrameFilter(csv_df)
+                filtered_df = self._filter_menu(csv_filter)
+                if filtered_df is not None:
+                    csv_df = filtered_df
+                    csv_memory['after'] = file_processor.dataframe_memory_usage(csv_df)
+
+            # If the user selected 'summarize', show the grouped aggregation menu.
+            if selection_text == 'summarize':
+                self._summary_menu(summary_engine, csv_df, csv_version)
 
             # If the user selected 'drop columns', show the drop columns menu.
             if selection_text == 'drop columns':
                 # Call the _drop_columns_menu function to drop columns from the DataFrame.
-                csv_df = self._drop_columns_menu(csv_df)
+                # A column projection can only be saved for a single csv file.
+                csv_df = self._drop_columns_menu(csv_df, csv_file_path if os.path.isfile(csv_file_path) else None)
+                csv_memory['after'] = file_processor.dataframe_memory_usage(csv_df)
 
-            # If the user selected 'return'.
+            # If the user selected 'export dataframe', write the current frame (with its drops and filters) to a file.
+            if selection_text == 'export dataframe':
+                self._export_dataframe(console, file_processor, csv_df, csv_file_path, starting_dir)
+
+            # If the user selected 'return', stop the loads still running.
             if selection_text == return_str: 
+                loader.shutdown()
                 return csv_file_path, csv_df
 
 # If this script is run directly, call the csv_menu function.
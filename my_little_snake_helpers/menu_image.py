@@ -4,12 +4,44 @@
 # It uses the Console class for console interactions and the FileDataProcessor class for file operations.
 # The script allows users to select a image file, load it into a Numpy array, and perform operations like viewing the image.
 import os
-import numpy as np
 from .console import Console
 from .file_data_processor import FileDataProcessor
+from .background_loader import BackgroundLoader, LoadJob
+from . import instrumentation
 
 class MenuImage:
 
+    def __init__(self, preview_size: int = None):
+        """
+        Parameters:
+            preview_size (int | None): Opt-in preview loading. If given, 'load image' decodes a preview with
+                this longest side in pixels, and 'load full resolution' decodes the whole image. The image
+                returned by show_menu is always the full resolution one. If None, images are decoded at full
+                resolution.
+        """
+        self.preview_size = preview_size
+
+    def _info_str(self, image_info, image_array, is_preview):
+
+        # Describe the file from its header, and what has actually been decoded.
+        info_str = f"\n<GOOD>image info:</GOOD> <DATA>{image_info['format']} {image_info['mode']}, {image_info['width']} x {image_info['height']}, {image_info['file_size'] / 1024 ** 2:.1f} MB on disk</DATA>"
+        if image_array is not None:
+            loaded_str = "preview" if is_preview else "full resolution"
+            info_str += f"\n<GOOD>loaded {loaded_str}:</GOOD> <DATA>{image_array.shape[1]} x {image_array.shape[0]}, {image_array.nbytes / 1024 ** 2:.1f} MB in memory</DATA>"
+        return info_str
+
+    def _load_image(self, file_processor, image_file_path, max_size, job = None):
+
+        # Read the metadata from the header, then decode (a preview sized version of) the image.
+        image_info = file_processor.read_image_info(image_file_path)
+        job.check_cancelled()
+        image_array = file_processor.load_image_to_array(image_file_path, max_size = max_size)
+
+        # Decoding can't be interrupted, a cancel while it ran drops the result.
+        job.check_cancelled()
+        is_preview = max_size is not None and max(image_info['width'], image_info['height']) > max_size
+        return image_info, image_array, is_preview
+
     def show_menu(self, starting_dir = None):
 
         # Check if starting_dir is None, and if so, set it to the current working directory.
@@ -30,51 +62,119 @@ class MenuImage:
         # Initialize the numpy array to None.
         image_array = None
 
+        # Initialize the header metadata, and whether image_array holds a reduced preview.
+        image_info = None
+        is_preview = False
+
+        # Images are decoded in the background, finished loads wait in ready_jobs until they are used.
+        loader = BackgroundLoader()
+        ready_jobs = []
+
         # Loop until the user chooses to return.
         while True:
 
-            # Clear the console.
-            console.clear()
+            # Collect finished loads, and report the ones that failed or were cancelled.
+            messages = []
+            for job in loader.pop_finished():
+                if job.state == 'done': ready_jobs.append(job)
+                elif job.state == 'failed': messages.append(f"<BAD>error loading image {job.path}: {job.error}</BAD>")
+                else: messages.append(f"<WARNING>load cancelled: {job.path}</WARNING>")
+
+            # Use the oldest finished load if nothing is loaded yet (or it is the full resolution of the loaded image).
+            if ready_jobs and (image_array is None or ready_jobs[0].path == image_file_path):
+                job = ready_jobs.pop(0)
+                image_file_path = job.path
+                image_info, image_array, is_preview = job.result
 
             # Prepend string to the menu.
             if not image_file_path:
                 prepend_str = "<BAD>image file not selected.</BAD>"
             if image_file_path:
                 prepend_str = f"<GOOD>image file selected:</GOOD> <DATA>{image_file_path}</DATA>"
-
-            # Show the menu and get the user's selection (if there a a image selected).
-            if image_array is not None: selection_int, selection_text = console.integer_only_menu_with_validation('image menu', ['unload image', 'view image', return_str], prepend_str = prepend_str)
-            else: selection_int, selection_text = console.integer_only_menu_with_validation('image menu', ['load image', return_str], prepend_str = prepend_str)
+                if image_info is not None: prepend_str += self._info_str(image_info, image_array, is_preview)
+
+            # Add the loads in progress, the finished ones waiting to be used and the messages of this round.
+            for job in loader.active_jobs():
+                prepend_str += f"\n<WARNING>loading {job.label}:</WARNING> <DATA>{console.progress_bar(job.fraction(), 20)} {job.describe()}</DATA>"
+            for job in ready_jobs:
+                prepend_str += f"\n<GOOD>loaded, waiting to be used:</GOOD> <DATA>{job.path}</DATA>"
+            for message in messages:
+                prepend_str += "\n" + message
+
+            # Build the item list (if there a a image selected), with the load controls while loads are running or waiting.
+            if image_array is not None: item_list = ['unload image', 'view image', 'preview in terminal', 'load full resolution'] if is_preview else ['unload image', 'view image', 'preview in terminal']
+            else: item_list = ['load image']
+            if ready_jobs: item_list.append('use next loaded image')
+            if loader.active_jobs(): item_list.append('monitor loads')
+            if instrumentation.is_enabled(): item_list.append('timing report')
+
+            # Show the menu and get the user's selection.
+            selection_int, selection_text = console.integer_only_menu_with_validation('image menu', item_list + [return_str], prepend_str = prepend_str)
 
             # Determine what to do based on the user's selection.
             if selection_text == 'load image':
                 
                 # Open a file dialog to select a image file.
-                image_file_path = file_processor.open_file(starting_dir, filetypes = ("Image files", "*.png;*.jpg;*.jpeg;*.bmp;*.gif"))
+                selected_path = file_processor.open_file(starting_dir, filetypes = ("Image files", "*.png;*.jpg;*.jpeg;*.bmp;*.gif;*.tif;*.tiff;*.npy"))
 
-                if image_file_path:
-                    try:
-                        image_array = file_processor.load_image_to_array(image_file_path)
-                    except RuntimeError:
-                        # If there was an error loading the image file, set image_array to None.
-                        image_array = None
-                        # Print the error message.
-                        console.fancy_print(f"<BAD>error loading image: {image_file_path}</BAD>")
-                        # Pause for user input.
-                        console.press_enter_pause()
-                    
+                # Decode the image (or its preview, if enabled) in the background, the menu comes straight back and shows the progress.
+                if selected_path:
+                    loader.submit(LoadJob(os.path.basename(selected_path), selected_path), self._load_image, file_processor, selected_path, self.preview_size)
+
+            # If the user selected 'load full resolution', decode the whole image in the background.
+            if selection_text == 'load full resolution' and not any(job.path == image_file_path for job in loader.active_jobs()):
+                loader.submit(LoadJob(os.path.basename(image_file_path), image_file_path), self._load_image, file_processor, image_file_path, None)
+
+            # If the user selected 'use next loaded image', replace the current image with the oldest finished load.
+            if selection_text == 'use next loaded image':
+                job = ready_jobs.pop(0)
+                image_file_path = job.path
+                image_info, image_array, is_preview = job.result
+
+            # If the user selected 'monitor loads', show the live progress view (loads can be cancelled from it).
+            if selection_text == 'monitor loads':
+                loader.monitor(console)
+
+            # If the user selected 'timing report', show where the time went so far (instrumentation is on).
+            if selection_text == 'timing report':
+                console.print_timing_report()
+                console.press_enter_pause()
 
             # If the user selected 'clear image', clear the selected image file path.
             if selection_text == 'unload image':
                 # Clear the selected image file path.
                 image_file_path = None
                 image_array = None
+                image_info = None
+                is_preview = False
 
+            # If the user selected 'view image', show the decoded array (no second read of the file) in the reused viewer window.
             if selection_text == 'view image':
-                FileDataProcessor.view_image(image_file_path)
-
-            # If the user selected 'return'.
+                try:
+                    file_processor.view_image(image_array, title = image_file_path, block = False)
+                except RuntimeError as e:
+                    console.fancy_print("<BAD>{}</BAD>", e)
+                    console.press_enter_pause()
+
+            # If the user selected 'preview in terminal', draw the image with colored half blocks (works without a display).
+            if selection_text == 'preview in terminal':
+                with console.frame():
+                    console.clear()
+                    console.print_image(image_array)
+                    console.press_enter_pause()
+
+            # If the user selected 'return', stop the loads still running.
             if selection_text == return_str: 
+                loader.shutdown()
+
+                # Callers get the image itself, a preview is replaced by the full resolution decode.
+                if is_preview:
+                    try:
+                        image_array = file_processor.load_image_to_array(image_file_path)
+                    except RuntimeError as e:
+                        image_array = None
+                        console.fancy_print("<BAD>{}</BAD>", e)
+                        console.press_enter_pause()
                 return image_file_path, image_array
 
 # If this script is run directly, call the show_menu function.
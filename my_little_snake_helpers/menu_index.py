@@ -0,0 +1,104 @@
+from bisect import bisect_left, bisect_right
+from .tag_template import TAG_PATTERN
+
+# Separates the labels in the search haystack, it can't appear inside a label.
+_SEPARATOR = "\n"
+
+class MenuIndex():
+    """
+    Search index over the labels of a menu, built once so type-to-filter stays interactive for lists
+    with tens of thousands of items. Labels are matched case-insensitively with their tags removed.
+
+    Substring search scans one joined string of every label with str.find (a C loop) and maps each hit
+    back to its item by bisecting the label start offsets, skipping to the next label after a hit. A
+    query that extends the previous one only rechecks the previous matches. Prefix search bisects a
+    sorted copy of the labels.
+    """
+
+    def __init__(self, item_list: list[str]):
+        """
+        Parameters:
+            item_list (list[str]): The menu items, tags allowed.
+        """
+        self.labels = [TAG_PATTERN.sub("", item).replace(_SEPARATOR, " ").lower() for item in item_list]
+
+        # Every label in one string, with the offset each label starts at.
+        self._haystack = _SEPARATOR.join(self.labels)
+        self._starts = []
+        offset = 0
+        for label in self.labels:
+            self._starts.append(offset)
+            offset += len(label) + len(_SEPARATOR)
+
+        # Sorted (label, position) pairs for prefix lookups, built on first use.
+        self._sorted = None
+        self._sorted_labels = None
+
+        # The last substring query and its matches, for incremental narrowing.
+        self._last_query = None
+        self._last_matches = None
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def search(self, text: str) -> list[int]:
+        """
+        Returns the items whose label contains text.
+
+        Parameters:
+            text (str): The text to look for (case-insensitive).
+
+        Returns:
+            list[int]: 0-based positions of the matching items, in menu order.
+        """
+        # Labels hold no separators, so a typed one can't be allowed to match across two labels.
+        query = text.replace(_SEPARATOR, " ").lower()
+        if not query:
+            return list(range(len(self.labels)))
+
+        # Typing one more character can only remove matches, so only the previous matches are rechecked.
+        if self._last_query and query.startswith(self._last_query):
+            labels = self.labels
+            matches = [position for position in self._last_matches if query in labels[position]]
+        else:
+            matches = self._scan(query)
+
+        self._last_query = query
+        self._last_matches = matches
+        return matches
+
+    def _scan(self, query: str) -> list[int]:
+        # Find every occurrence in the haystack, keeping the first one of each label.
+        matches = []
+        haystack = self._haystack
+        starts = self._starts
+        position = haystack.find(query)
+        while position != -1:
+            item = bisect_right(starts, position) - 1
+            matches.append(item)
+
+            # Continue after the end of this label.
+            if item + 1 >= len(starts):
+                break
+            position = haystack.find(query, starts[item + 1])
+        return matches
+
+    def prefix(self, text: str) -> list[int]:
+        """
+        Returns the items whose label starts with text.
+
+        Parameters:
+            text (str): The prefix (case-insensitive).
+
+        Returns:
+            list[int]: 0-based positions of the matching items, in menu order.
+        """
+        if self._sorted is None:
+            self._sorted = sorted(zip(self.labels, range(len(self.labels))))
+            self._sorted_labels = [label for label, _ in self._sorted]
+
+        # Labels with the prefix form one contiguous run of the sorted labels.
+        query = text.replace(_SEPARATOR, " ").lower()
+        first = bisect_left(self._sorted_labels, query)
+        last = bisect_left(self._sorted_labels, query + "\U0010ffff")
+        return sorted(position for _, position in self._sorted[first:last])
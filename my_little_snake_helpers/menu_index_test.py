@@ -0,0 +1,53 @@
+import random
+import unittest
+from my_little_snake_helpers.menu_index import MenuIndex
+
+
+class MenuIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.items = ["<MENU_ITEM>Load CSV</MENU_ITEM>", "unload csv", "<BAD>drop</BAD> columns", "Column summary", "csv\nstats", "quit"]
+        self.index = MenuIndex(self.items)
+
+    def test_labels_are_lowercase_without_tags(self):
+        self.assertEqual(self.index.labels, ["load csv", "unload csv", "drop columns", "column summary", "csv stats", "quit"])
+        self.assertEqual(len(self.index), 6)
+
+    def test_search(self):
+        self.assertEqual(self.index.search("CSV"), [0, 1, 4])
+        self.assertEqual(self.index.search("column"), [2, 3])
+        self.assertEqual(self.index.search("zzz"), [])
+        self.assertEqual(self.index.search(""), list(range(6)))
+
+    def test_tags_and_separators_never_match(self):
+        self.assertEqual(self.index.search("menu_item"), [])
+        self.assertEqual(self.index.search("csv\nunload"), [])
+        self.assertEqual(self.index.search("csv\nstats"), [4])
+        self.assertEqual(self.index.search("csv u"), [])
+
+    def test_narrowing_and_widening_queries(self):
+        self.assertEqual(self.index.search("c"), [0, 1, 2, 3, 4])
+        self.assertEqual(self.index.search("cs"), [0, 1, 4])
+        self.assertEqual(self.index.search("csv s"), [4])
+        self.assertEqual(self.index.search("co"), [2, 3])
+        self.assertEqual(self.index.search("q"), [5])
+
+    def test_prefix(self):
+        self.assertEqual(self.index.prefix("CO"), [3])
+        self.assertEqual(self.index.prefix("u"), [1])
+        self.assertEqual(self.index.prefix(""), list(range(6)))
+        self.assertEqual(self.index.prefix("zzz"), [])
+
+    def test_matches_a_plain_scan(self):
+        rng = random.Random(0)
+        words = ["alpha", "beta", "gamma", "delta", "csv", "json", "load", "save"]
+        items = [" ".join(rng.choice(words) for _ in range(3)) for _ in range(2_000)]
+        index = MenuIndex(items)
+        for query in ("a", "al", "alp", "ta g", "sv", "json load", "e", "save save", "q"):
+            with self.subTest(query = query):
+                self.assertEqual(index.search(query), [position for position, item in enumerate(items) if query in item])
+                self.assertEqual(index.prefix(query), [position for position, item in enumerate(items) if item.startswith(query)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+import shutil
+from .lazy_import import lazy_import
+from . import instrumentation
+
+# Heavy dependencies are imported on first use so importing this module stays cheap.
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Spaces between two columns of a page.
+_COLUMN_GAP = "  "
+
+# Shown in place of missing values, like DataFrame.to_string.
+_MISSING = "NaN"
+
+class PageFormatter():
+    """
+    Formats pages of a DataFrame (or a row source such as CsvRowIndex) as fixed-width text lines. Column
+    widths and number formats are worked out once, from the whole frame where it's cheap (min / max of
+    numeric columns, the categories of categoricals) and from a sample of rows otherwise, so every page
+    lines up with the others. Each page is formatted a column at a time with NumPy string operations into
+    a reused line buffer, and wide frames are split into column windows that each fit the terminal.
+
+    Attributes:
+        columns (list[str]): The column labels as text.
+        widths (list[int]): Width of each column.
+        windows (list[range]): Column positions of each column window, in order.
+        row_width (int): Width of the row number column.
+    """
+
+    def __init__(self, df, page_size: int = 10, sample_rows: int = 10_000, max_column_width: int = 40, line_width: int = None):
+        """
+        Parameters:
+            df (pd.DataFrame | CsvRowIndex): The frame, or any row source with __len__ and read_rows(start, stop).
+            page_size (int): Rows per page, the line buffer is allocated for this many.
+            sample_rows (int): Rows looked at to size text columns and pick float precision.
+            max_column_width (int): Longer values and labels are cut to this width and end with '…'.
+            line_width (int): Width the column windows must fit in. If None, uses the terminal width.
+        """
+        self.max_column_width = max_column_width
+        total_rows = len(df)
+        self._row_digits = len(str(max(total_rows - 1, 0)))
+        self.row_width = max(self._row_digits, len("Row"))
+
+        sample = self._sample(df, total_rows, sample_rows)
+        is_frame = not hasattr(df, 'read_rows')
+        self.columns = [str(column) for column in sample.columns]
+
+        # Work out the format and width of every column.
+        self._specs = []
+        self.widths = []
+        for position in range(len(self.columns)):
+            full = df.iloc[:, position] if is_frame else None
+            spec, width = self._column_spec(sample.iloc[:, position], full)
+            self._specs.append(spec)
+            self.widths.append(min(max(width, len(self.columns[position])), max_column_width))
+
+        if line_width is None: line_width = shutil.get_terminal_size().columns
+        self.windows = self._column_windows(line_width)
+
+        # One line buffer (header and page_size rows) and the header of each window, reused by every page.
+        self._buffer = [""] * (page_size + 1)
+        self._headers = {}
+
+    @staticmethod
+    def _sample(df, total_rows: int, sample_rows: int):
+        # Rows spread over the whole frame, so sizes aren't taken from the first rows only.
+        if total_rows <= sample_rows:
+            return df.iloc[:total_rows] if not hasattr(df, 'read_rows') else df.read_rows(0, total_rows)
+        if not hasattr(df, 'read_rows'):
+            return df.iloc[np.linspace(0, total_rows - 1, sample_rows).astype(np.int64)]
+
+        # Row sources are read in a few contiguous blocks, each one is a single seek and parse.
+        blocks = 4
+        block_rows = sample_rows // blocks
+        starts = np.linspace(0, total_rows - block_rows, blocks).astype(np.int64)
+        return pd.concat([df.read_rows(int(start), int(start) + block_rows) for start in starts], ignore_index = True)
+
+    def _column_spec(self, sample, full) -> tuple:
+        # Returns (spec, width). spec is ('int',), ('float', decimals) or ('text',).
+        dtype = sample.dtype
+        if pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype):
+            if full is not None and isinstance(full.dtype, pd.CategoricalDtype):
+                # Every category is known up front, so the width is exact.
+                lengths = [len(str(category)) for category in full.dtype.categories]
+                width = max(lengths, default = 0)
+                if full.hasnans: width = max(width, len(_MISSING))
+                return ('text',), width
+            text = self._as_text(sample)
+            return ('text',), int(np.char.str_len(text).max(initial = 0))
+
+        # Numeric columns are sized from the whole frame's extremes when the frame is in memory.
+        source = full if full is not None else sample
+        if pd.api.types.is_integer_dtype(dtype) and pd.api.types.is_integer_dtype(source.dtype):
+            if source.count() == 0:
+                return ('int',), len(_MISSING)
+            width = max(len(str(source.min())), len(str(source.max())))
+            return ('int',), max(width, len(_MISSING) if source.hasnans else 0)
+
+        values = source.to_numpy(dtype = np.float64, na_value = np.nan)
+        finite = values[np.isfinite(values)]
+        has_other = len(finite) < len(values)
+        low, high = (finite.min(), finite.max()) if len(finite) else (0.0, 0.0)
+
+        # Floats get the fewest decimals (up to 6) that show every sampled value exactly.
+        sampled = sample.to_numpy(dtype = np.float64, na_value = np.nan)
+        sampled = sampled[np.isfinite(sampled)]
+        decimals = 6
+        for candidate in range(7):
+            if np.allclose(np.round(sampled, candidate), sampled, rtol = 0, atol = 10.0 ** -7):
+                decimals = candidate
+                break
+        width = max(len(f"{low:.{decimals}f}"), len(f"{high:.{decimals}f}"))
+        if has_other: width = max(width, len("-inf"), len(_MISSING))
+        return ('float', decimals), width
+
+    def _column_windows(self, line_width: int) -> list:
+        # Greedily group columns into windows that fit line_width next to the row number column.
+        windows = []
+        first = 0
+        used = self.row_width
+        for position, width in enumerate(self.widths):
+            if position > first and used + len(_COLUMN_GAP) + width > line_width:
+                windows.append(range(first, position))
+                first = position
+                used = self.row_width
+            used += len(_COLUMN_GAP) + width
+        windows.append(range(first, len(self.widths)))
+        return windows
+
+    @staticmethod
+    def _as_text(values):
+        # Any column as a NumPy string array, missing values shown as NaN. The values go through object
+        # so NumPy sizes the array to the longest one (to_numpy(dtype = str) of a pandas string column
+        # can give a one character array).
+        text = values.astype(str).to_numpy(dtype = object).astype(str)
+        missing = values.isna().to_numpy()
+        if missing.any():
+            text = text.astype(f"<U{max(text.dtype.itemsize // 4, len(_MISSING))}")
+            text[missing] = _MISSING
+        return text
+
+    def _format_column(self, values, spec: tuple):
+        # Format one column of a page as a string array. A page whose values don't have the sampled type
+        # (row sources parse each page on its own) is shown as text.
+        kind = spec[0]
+        if kind != 'text' and pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+            missing = values.isna().to_numpy()
+            if kind == 'int':
+                # Integers are converted without going through floats, so large IDs keep every digit.
+                integers = values.fillna(0) if missing.any() else values
+                if not pd.api.types.is_integer_dtype(integers.dtype):
+                    numbers = integers.to_numpy(dtype = np.float64)
+                    if not (np.isfinite(numbers).all() and (numbers == np.round(numbers)).all()):
+                        return self._as_text(values)
+                    integers = integers.astype(np.int64)
+                text = integers.to_numpy().astype(str).astype("<U21")
+            else:
+                text = np.char.mod(f"%.{spec[1]}f", values.to_numpy(dtype = np.float64, na_value = np.nan))
+            text[missing] = _MISSING
+            return text
+        return self._as_text(values)
+
+    def _fit(self, text, width: int):
+        # Cut values longer than the column to width (ending with '…'), then right-align them.
+        too_long = np.char.str_len(text) > width
+        if too_long.any():
+            text = text.astype(f"<U{width}")
+            text[too_long] = np.char.add(text[too_long].astype(f"<U{max(width - 1, 0)}"), "…")
+        return np.char.rjust(text, width)
+
+    def header(self, window: int = 0) -> str:
+        """
+        Parameters:
+            window (int): The column window.
+
+        Returns:
+            str: The line of column labels of a window, aligned with format_page's lines.
+        """
+        if window not in self._headers:
+            labels = ["Row".rjust(self.row_width)]
+            for position in self.windows[window]:
+                label, width = self.columns[position], self.widths[position]
+                if len(label) > width: label = label[:width - 1] + "…"
+                labels.append(label.rjust(width))
+            self._headers[window] = _COLUMN_GAP.join(labels)
+        return self._headers[window]
+
+    @instrumentation.timed('PageFormatter.format_page', lambda lines, self, chunk, *args, **kwargs: {'rows': len(chunk)})
+    def format_page(self, chunk, start: int, window: int = 0) -> list[str]:
+        """
+        Formats the rows of one page, header line first.
+
+        Parameters:
+            chunk (pd.DataFrame): The rows of the page, with the same columns as the frame.
+            start (int): Row number of the first row.
+            window (int): The column window to show.
+
+        Returns:
+            list[str]: The header and one line per row. A full page is returned in the reused buffer, so it
+                is only valid until the next call.
+        """
+        rows = len(chunk)
+        if rows == 0:
+            return [self.header(window)]
+
+        # Row numbers, zero-padded like the rest of paginated_print.
+        line = np.char.rjust(np.char.zfill(np.arange(start, start + rows).astype(str), self._row_digits), self.row_width)
+
+        # Build the lines a column at a time, every operation covers the whole page.
+        for position in self.windows[window]:
+            text = self._format_column(chunk.iloc[:, position], self._specs[position])
+            line = np.char.add(np.char.add(line, _COLUMN_GAP), self._fit(text, self.widths[position]))
+
+        # Fill the buffer in place (it grows if a page is larger than page_size).
+        if len(self._buffer) < rows + 1:
+            self._buffer.extend([""] * (rows + 1 - len(self._buffer)))
+        self._buffer[0] = self.header(window)
+        self._buffer[1:rows + 1] = line.tolist()
+        return self._buffer if len(self._buffer) == rows + 1 else self._buffer[:rows + 1]
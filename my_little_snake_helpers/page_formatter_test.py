@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from my_little_snake_helpers.page_formatter import PageFormatter
+from my_little_snake_helpers.csv_row_index import CsvRowIndex
+
+
+class PageFormatterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'id': [9007199254740993, 2, 3, 4],
+            'price': [1.5, np.nan, 10.25, -3.0],
+            'count': pd.array([1, None, 3, 40], dtype = 'Int64'),
+            'region': pd.Categorical(["North", "South", None, "North"]),
+            'note': ["short", "a much longer note than the column allows", None, ""],
+        })
+
+    def test_lines_line_up(self):
+        formatter = PageFormatter(self.df, page_size = 4, max_column_width = 20, line_width = 200)
+        lines = formatter.format_page(self.df, 0)
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(len({len(line) for line in lines}), 1)
+        self.assertEqual(lines[0].split(), ["Row", "id", "price", "count", "region", "note"])
+
+    def test_values(self):
+        formatter = PageFormatter(self.df, page_size = 4, max_column_width = 20, line_width = 200)
+        lines = formatter.format_page(self.df, 0)
+        rows = [line.split() for line in lines[1:]]
+
+        # Large integers keep every digit, floats share the fewest exact decimals, missing values are NaN.
+        self.assertEqual(rows[0][:5], ["0", "9007199254740993", "1.50", "1", "North"])
+        self.assertEqual(rows[1][:4], ["1", "2", "NaN", "NaN"])
+        self.assertEqual(rows[2][4:], ["NaN", "NaN"])
+
+        # Text longer than max_column_width is cut and ends with '…'.
+        self.assertEqual(lines[2][-20:], "a much longer note …")
+
+    def test_row_numbers_are_zero_padded(self):
+        df = pd.DataFrame({'n': range(120)})
+        formatter = PageFormatter(df, page_size = 10, line_width = 80)
+        lines = formatter.format_page(df.iloc[100:110], 100)
+        self.assertEqual([line.split()[0] for line in lines[1:3]], ["100", "101"])
+        self.assertEqual(formatter.format_page(df.iloc[0:2], 0)[1].split()[0], "000")
+
+    def test_wide_frames_are_split_into_windows(self):
+        wide = pd.DataFrame({f"column_{number}": [number * 1000] for number in range(12)})
+        formatter = PageFormatter(wide, line_width = 40)
+        self.assertGreater(len(formatter.windows), 1)
+        self.assertEqual([position for window in formatter.windows for position in window], list(range(12)))
+        for window in range(len(formatter.windows)):
+            with self.subTest(window = window):
+                self.assertTrue(all(len(line) <= 40 for line in formatter.format_page(wide, 0, window)))
+
+    def test_header_is_built_once(self):
+        formatter = PageFormatter(self.df, line_width = 200)
+        self.assertIs(formatter.header(0), formatter.header(0))
+
+    def test_empty_and_oversized_pages(self):
+        formatter = PageFormatter(self.df, page_size = 2, line_width = 200)
+        self.assertEqual(formatter.format_page(self.df.iloc[0:0], 0), [formatter.header(0)])
+
+        # A page larger than page_size grows the buffer instead of failing.
+        self.assertEqual(len(formatter.format_page(self.df, 0)), 5)
+        self.assertEqual(len(formatter.format_page(self.df.iloc[:1], 0)), 2)
+
+    def test_row_source(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.csv')
+            pd.DataFrame({'id': range(50), 'value': [number / 4 for number in range(50)]}).to_csv(path, index = False)
+            index = CsvRowIndex.build(path)
+            formatter = PageFormatter(index, page_size = 10, sample_rows = 20, line_width = 80)
+            lines = formatter.format_page(index.read_rows(40, 50), 40)
+        self.assertEqual(lines[-1].split(), ["49", "49", "12.25"])
+        self.assertEqual(len({len(line) for line in lines}), 1)
+
+    def test_matches_the_frame_values(self):
+        df = pd.DataFrame({'a': np.arange(30) * 3, 'b': np.round(np.linspace(0, 1, 30), 3), 'c': [f"text {number}" for number in range(30)]})
+        formatter = PageFormatter(df, page_size = 30, line_width = 200)
+        rows = [line.split(None, 1)[1].split() for line in formatter.format_page(df, 0)[1:]]
+        expected = [[str(a), f"{b:.3f}", "text", str(number)] for number, (a, b) in enumerate(zip(df['a'], df['b']))]
+        self.assertEqual(rows, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
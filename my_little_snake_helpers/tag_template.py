@@ -0,0 +1,127 @@
+import re
+from collections import OrderedDict
+
+# Matches <TAG> and </TAG> style markup. Compiled once at import time and shared by every engine.
+TAG_PATTERN = re.compile(r'<(/?)(\w+)>')
+
+
+class CompiledTemplate():
+    """
+    A tagged string that has already been parsed into literal and ANSI segments.
+
+    Attributes:
+        source (str): The original tagged template string.
+        segments (list[tuple[str, str]]): Ordered ('literal' | 'ansi', text) pairs making up the template.
+        text (str): The fully styled string (segments joined, trailing reset appended).
+        has_fields (bool): True if the template contains braces ({} placeholders or {{ }} escapes), so
+            rendering it with arguments needs str.format.
+    """
+
+    __slots__ = ('source', 'segments', 'text', 'has_fields')
+
+    def __init__(self, source: str, segments: list[tuple[str, str]], reset: str):
+        self.source = source
+        self.segments = segments
+        self.text = "".join(segment for _, segment in segments) + reset
+        self.has_fields = any(kind == 'literal' and ('{' in segment or '}' in segment) for kind, segment in segments)
+
+    def render(self, *args, **kwargs) -> str:
+        """
+        Renders the template, substituting {}-style placeholders if arguments are given.
+
+        Placeholder values are inserted as-is; they are never scanned for tags, so changing
+        values never cause the markup to be re-parsed.
+
+        Parameters:
+            *args: Positional values for {} / {0} placeholders.
+            **kwargs: Keyword values for {name} placeholders.
+
+        Returns:
+            str: The styled string, ending with the reset code.
+        """
+        # Without arguments the template is rendered verbatim (braces are left alone, like the old behaviour),
+        # and a template without braces would come out of str.format unchanged.
+        if not (args or kwargs) or not self.has_fields:
+            return self.text
+        return self.text.format(*args, **kwargs)
+
+
+class TemplateEngine():
+    """
+    Compiles tagged strings into CompiledTemplate objects and keeps the most recently used
+    ones in a bounded LRU cache keyed by the template string.
+    """
+
+    def __init__(self, tag_map: dict[str, str], reset: str, max_templates: int = 512):
+        """
+        Parameters:
+            tag_map (dict[str, str]): Mapping of tag names (e.g., 'RED') to ANSI codes.
+            reset (str): The ANSI code emitted for closing tags and at the end of every template.
+            max_templates (int): Maximum number of compiled templates to keep cached.
+        """
+        self.tag_map = tag_map
+        self.reset = reset
+        self.max_templates = max_templates
+        self._cache = OrderedDict()
+
+    def compile(self, template: str) -> CompiledTemplate:
+        """
+        Returns the compiled form of a tagged string, parsing it only on a cache miss.
+
+        Parameters:
+            template (str): The string containing <TAG> and </TAG> formatting tags.
+
+        Returns:
+            CompiledTemplate: The compiled template.
+        """
+        cache = self._cache
+
+        # Cache hit, mark as most recently used.
+        compiled = cache.get(template)
+        if compiled is not None:
+            cache.move_to_end(template)
+            return compiled
+
+        # Cache miss, parse and store, evicting the least recently used entry if full.
+        compiled = CompiledTemplate(template, self._parse(template), self.reset)
+        cache[template] = compiled
+        if len(cache) > self.max_templates:
+            cache.popitem(last=False)
+        return compiled
+
+    def render(self, template: str, *args, **kwargs) -> str:
+        """
+        Compiles (or fetches from the cache) and renders a tagged string.
+
+        Parameters:
+            template (str): The string containing formatting tags and optional {} placeholders.
+            *args: Positional placeholder values.
+            **kwargs: Keyword placeholder values.
+
+        Returns:
+            str: The styled string, ending with the reset code.
+        """
+        return self.compile(template).render(*args, **kwargs)
+
+    def clear_cache(self) -> None:
+        """
+        Drops every cached template.
+        """
+        self._cache.clear()
+
+    def _parse(self, template: str) -> list[tuple[str, str]]:
+        # Split the string on tags, keeping literal text and the ANSI code for each tag.
+        # Closing tags always map to reset and unknown tags are dropped, same as the old regex replacer.
+        segments = []
+        position = 0
+        for match in TAG_PATTERN.finditer(template):
+            if match.start() > position:
+                segments.append(('literal', template[position:match.start()]))
+            closing, tag = match.group(1), match.group(2)
+            code = self.reset if closing else self.tag_map.get(tag, "")
+            if code:
+                segments.append(('ansi', code))
+            position = match.end()
+        if position < len(template):
+            segments.append(('literal', template[position:]))
+        return segments
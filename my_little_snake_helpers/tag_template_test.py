@@ -0,0 +1,68 @@
+import unittest
+from my_little_snake_helpers.tag_template import TemplateEngine
+
+RESET = "\033[0m"
+TAG_MAP = {'RED': "\033[31m", 'BOLD': "\033[1m"}
+
+
+class TemplateEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = TemplateEngine(TAG_MAP, RESET, max_templates = 3)
+
+    def test_tags_become_ansi_codes(self):
+        self.assertEqual(self.engine.render("<RED>error</RED> <BOLD>!</BOLD>"), "\033[31merror\033[0m \033[1m!\033[0m" + RESET)
+
+    def test_unknown_tags_are_dropped(self):
+        self.assertEqual(self.engine.render("<NOPE>text</NOPE>"), "text" + RESET + RESET)
+        self.assertEqual(self.engine.render("a < b > c"), "a < b > c" + RESET)
+
+    def test_segments(self):
+        compiled = self.engine.compile("x<RED>y</RED>")
+        self.assertEqual(compiled.segments, [('literal', "x"), ('ansi', TAG_MAP['RED']), ('literal', "y"), ('ansi', RESET)])
+
+    def test_placeholders(self):
+        compiled = self.engine.compile("<RED>{}</RED> of {total}")
+        self.assertTrue(compiled.has_fields)
+        self.assertEqual(compiled.render(3, total = 5), "\033[31m3\033[0m of 5" + RESET)
+
+    def test_values_are_not_scanned_for_tags(self):
+        self.assertEqual(self.engine.render("{}", "<RED>"), "<RED>" + RESET)
+
+    def test_templates_without_braces_skip_format(self):
+        compiled = self.engine.compile("<RED>plain</RED> text")
+        self.assertFalse(compiled.has_fields)
+        self.assertIs(compiled.render(1, extra = 2), compiled.text)
+
+        # Escaped braces still go through str.format when arguments are given.
+        escaped = self.engine.compile("{{literal}} {}")
+        self.assertTrue(escaped.has_fields)
+        self.assertEqual(escaped.render(7), "{literal} 7" + RESET)
+
+    def test_braces_kept_without_arguments(self):
+        compiled = self.engine.compile("{not a field}")
+        self.assertEqual(compiled.render(), "{not a field}" + RESET)
+
+    def test_cache_hit_returns_same_template(self):
+        self.assertIs(self.engine.compile("<RED>a</RED>"), self.engine.compile("<RED>a</RED>"))
+
+    def test_lru_eviction(self):
+        first = self.engine.compile("a")
+        self.engine.compile("b")
+        self.engine.compile("c")
+
+        # Using 'a' again makes 'b' the least recently used, so 'd' evicts it.
+        self.assertIs(self.engine.compile("a"), first)
+        self.engine.compile("d")
+        self.assertEqual(list(self.engine._cache), ["c", "a", "d"])
+        self.assertIs(self.engine.compile("a"), first)
+
+    def test_clear_cache(self):
+        first = self.engine.compile("a")
+        self.engine.clear_cache()
+        self.assertEqual(len(self.engine._cache), 0)
+        self.assertIsNot(self.engine.compile("a"), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,7 @@ from setuptools import setup, find_packages
 
 setup(
     name='my_little_snake_helpers',
-    version='0.1.20',
+    version='0.1.61',
     packages=find_packages(),
     install_requires=[],
     description='My toolkit of little python helpers.',